@@ -0,0 +1,323 @@
+"""
+Motor de analítica en memoria para los reportes ad hoc.
+
+Las tareas se cargan una vez en columnas de NumPy (códigos categóricos para
+proyecto, `estado`, `prioridad` y `usuario`; `datetime64[ms]` para las
+fechas) y los reportes se calculan con operaciones vectorizadas
+(`bincount`, `searchsorted`, `lexsort`) en lugar de recorrer los documentos
+en Python.
+
+`AnalyticsEngine` conserva la última carga hasta que supera una antigüedad
+máxima, que acota el desfase con las escrituras (de este worker o de otros).
+No se recarga con cada escritura de tareas: con escrituras constantes, cada
+reporte volvería a leer todas las tareas.
+"""
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, Iterable, Optional
+
+import numpy as np
+
+from rollups import UNASSIGNED
+
+# Campos de las tareas que se cargan en el motor
+ANALYTICS_FIELDS = {
+    "project_id": 1, "estado": 1, "prioridad": 1, "usuario": 1,
+    "completada": 1, "creada_en": 1, "completada_en": 1
+}
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+BUCKETS = (DAY, WEEK, MONTH)
+
+GROUP_BY = ("usuario", "prioridad", "project_id")
+
+# Máximo de intervalos de tiempo por serie, para que un rango absurdo no reserve memoria sin límite
+MAX_BUCKETS = 3660
+
+NAT = np.datetime64("NaT", "ms")
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+# Representación entera de NaT en datetime64
+NAT_MS = np.iinfo(np.int64).min
+
+def epoch_ms(value) -> int:
+    """Milisegundos desde 1970 (UTC) de una fecha y hora; NaT si falta.
+
+    Convertir enteros es varias veces más rápido que dejar que NumPy
+    convierta una lista de objetos `datetime`.
+    """
+    if not isinstance(value, datetime):
+        return NAT_MS
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // MILLISECOND
+
+class TaskFrameBuilder:
+    """Acumula documentos de tareas y los convierte en un `TaskFrame`"""
+
+    def __init__(self):
+        self._categories = {column: {} for column in ("project_id", "estado", "prioridad", "usuario")}
+        self._codes = {column: [] for column in self._categories}
+        self._completada = []
+        self._creada_en = []
+        self._completada_en = []
+
+    def add(self, task: dict) -> None:
+        values = {
+            "project_id": task.get("project_id") or "",
+            "estado": task.get("estado", "pendiente"),
+            "prioridad": task.get("prioridad", "media"),
+            "usuario": task.get("usuario") or UNASSIGNED,
+        }
+        for column, value in values.items():
+            categories = self._categories[column]
+            code = categories.get(value)
+            if code is None:
+                code = categories[value] = len(categories)
+            self._codes[column].append(code)
+        self._completada.append(bool(task.get("completada", False)))
+        self._creada_en.append(epoch_ms(task.get("creada_en")))
+        self._completada_en.append(epoch_ms(task.get("completada_en")))
+
+    def build(self) -> "TaskFrame":
+        return TaskFrame(
+            codes={column: np.array(codes, dtype=np.int32) for column, codes in self._codes.items()},
+            categories={column: list(categories) for column, categories in self._categories.items()},
+            completada=np.array(self._completada, dtype=bool),
+            creada_en=np.array(self._creada_en, dtype=np.int64).view("datetime64[ms]"),
+            completada_en=np.array(self._completada_en, dtype=np.int64).view("datetime64[ms]")
+        )
+
+def bucket_start(days: np.ndarray, bucket: str) -> np.ndarray:
+    """Primer día del intervalo (día, semana ISO desde el lunes o mes) de cada fecha"""
+    days = days.astype("datetime64[D]")
+    if bucket == WEEK:
+        # 1970-01-01 fue jueves: (día + 3) % 7 es el día de la semana con el lunes en 0
+        return days - (days.astype(np.int64) + 3) % 7
+    if bucket == MONTH:
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    return days
+
+def bucket_range(start: np.datetime64, end: np.datetime64, bucket: str) -> np.ndarray:
+    """Inicios de los intervalos entre `start` y `end` (ambos incluidos)"""
+    if bucket == MONTH:
+        months = np.arange(
+            start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1, dtype="datetime64[M]"
+        )
+        buckets = months.astype("datetime64[D]")
+    else:
+        step = 7 if bucket == WEEK else 1
+        first = bucket_start(np.array([start]), bucket)[0]
+        buckets = np.arange(first, end + 1, step, dtype="datetime64[D]")
+    if len(buckets) > MAX_BUCKETS:
+        raise ValueError(f"El rango abarca más de {MAX_BUCKETS} intervalos")
+    return buckets
+
+def day_labels(days: np.ndarray) -> list:
+    return np.datetime_as_string(days, unit="D").tolist()
+
+def to_day(value: Optional[date]) -> Optional[np.datetime64]:
+    return None if value is None else np.datetime64(value.isoformat(), "D")
+
+class TaskFrame:
+    """Tareas en columnas; cada posición de los arrays es una tarea"""
+
+    def __init__(self, codes: dict, categories: dict, completada: np.ndarray,
+                 creada_en: np.ndarray, completada_en: np.ndarray):
+        self.codes = codes
+        self.categories = categories
+        self.completada = completada
+        self.creada_en = creada_en
+        self.completada_en = completada_en
+
+    @classmethod
+    def from_documents(cls, tasks: Iterable[dict]) -> "TaskFrame":
+        builder = TaskFrameBuilder()
+        for task in tasks:
+            builder.add(task)
+        return builder.build()
+
+    @classmethod
+    async def load(cls, cursor) -> "TaskFrame":
+        builder = TaskFrameBuilder()
+        async for task in cursor:
+            builder.add(task)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.completada)
+
+    def mask(self, project_ids: Iterable[str]) -> np.ndarray:
+        """Tareas que pertenecen a alguno de los proyectos indicados"""
+        categories = self.categories["project_id"]
+        lookup = {project_id: code for code, project_id in enumerate(categories)}
+        codes = [lookup[project_id] for project_id in project_ids if project_id in lookup]
+        return np.isin(self.codes["project_id"], codes)
+
+    def completion_days(self) -> np.ndarray:
+        """Día de cierre de cada tarea completada (NaT si está abierta).
+
+        Las tareas completadas sin `completada_en` (anteriores a que se
+        registrara) se cuentan como cerradas el día en que se crearon.
+        """
+        completed = np.where(np.isnat(self.completada_en), self.creada_en, self.completada_en)
+        return np.where(self.completada, completed, NAT).astype("datetime64[D]")
+
+    def burndown(self, mask: np.ndarray, date_from: Optional[date] = None,
+                 date_to: Optional[date] = None) -> list:
+        """Tareas creadas, completadas y abiertas al final de cada día"""
+        created = self.creada_en[mask].astype("datetime64[D]")
+        created = created[~np.isnat(created)]
+        completed = self.completion_days()[mask]
+        completed = completed[~np.isnat(completed)]
+        events = np.concatenate([created, completed])
+        if not len(events) and (date_from is None or date_to is None):
+            return []
+
+        start = to_day(date_from) if date_from else events.min()
+        end = to_day(date_to) if date_to else events.max()
+        if end < start:
+            return []
+        days = bucket_range(start, end, DAY)
+        size = len(days)
+
+        def per_day(values):
+            offsets = (values - start).astype(np.int64)
+            in_range = (offsets >= 0) & (offsets < size)
+            return np.bincount(offsets[in_range], minlength=size), int((offsets < 0).sum())
+
+        created_per_day, created_before = per_day(created)
+        completed_per_day, completed_before = per_day(completed)
+        remaining = created_before - completed_before + np.cumsum(created_per_day - completed_per_day)
+
+        return [
+            {"date": day, "created": int(c), "completed": int(d), "remaining": int(r)}
+            for day, c, d, r in zip(day_labels(days), created_per_day, completed_per_day, remaining)
+        ]
+
+    def throughput(self, mask: np.ndarray, bucket: str = WEEK, date_from: Optional[date] = None,
+                   date_to: Optional[date] = None) -> dict:
+        """Tareas completadas por usuario en cada intervalo de tiempo"""
+        done = mask & self.completada & ~np.isnat(self.completada_en)
+        days = self.completada_en[done].astype("datetime64[D]")
+        users = self.codes["usuario"][done]
+        if date_from is not None:
+            keep = days >= to_day(date_from)
+            days, users = days[keep], users[keep]
+        if date_to is not None:
+            keep = days <= to_day(date_to)
+            days, users = days[keep], users[keep]
+        if not len(days):
+            return {"bucket": bucket, "buckets": [], "users": []}
+
+        start = to_day(date_from) if date_from else days.min()
+        end = to_day(date_to) if date_to else days.max()
+        buckets = bucket_range(start, end, bucket)
+        positions = np.searchsorted(buckets, bucket_start(days, bucket))
+
+        n_users = len(self.categories["usuario"])
+        counts = np.bincount(users * len(buckets) + positions, minlength=n_users * len(buckets))
+        counts = counts.reshape(n_users, len(buckets))
+        totals = counts.sum(axis=1)
+        order = np.argsort(-totals, kind="stable")
+
+        return {
+            "bucket": bucket,
+            "buckets": day_labels(buckets),
+            "users": [
+                {
+                    "usuario": self.categories["usuario"][code],
+                    "total": int(totals[code]),
+                    "counts": counts[code].tolist()
+                }
+                for code in order if totals[code]
+            ]
+        }
+
+    def cycle_time(self, mask: np.ndarray, group_by: str = "usuario", date_from: Optional[date] = None,
+                   date_to: Optional[date] = None) -> list:
+        """Horas entre `creada_en` y `completada_en` de las tareas completadas, por grupo"""
+        done = mask & self.completada & ~np.isnat(self.completada_en) & ~np.isnat(self.creada_en)
+        completed_days = self.completada_en.astype("datetime64[D]")
+        if date_from is not None:
+            done &= completed_days >= to_day(date_from)
+        if date_to is not None:
+            done &= completed_days <= to_day(date_to)
+
+        hours = (self.completada_en[done] - self.creada_en[done]).astype(np.int64) / 3_600_000
+        groups = self.codes[group_by][done]
+        if not len(hours):
+            return []
+
+        # Ordenar por grupo y, dentro de cada grupo, por duración: los percentiles salen por posición
+        order = np.lexsort((hours, groups))
+        hours, groups = hours[order], groups[order]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        counts = np.diff(np.r_[starts, len(hours)])
+        means = np.add.reduceat(hours, starts) / counts
+
+        def percentile(q):
+            position = starts + q * (counts - 1)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            return hours[low] + (hours[high] - hours[low]) * (position - low)
+
+        medians, p90s = percentile(0.5), percentile(0.9)
+        labels = self.categories[group_by]
+        return [
+            {
+                group_by: labels[groups[start]],
+                "count": int(count),
+                "mean_hours": round(float(mean), 2),
+                "median_hours": round(float(median), 2),
+                "p90_hours": round(float(p90), 2)
+            }
+            for start, count, mean, median, p90 in zip(starts, counts, means, medians, p90s)
+        ]
+
+class AnalyticsEngine:
+    """Mantiene un `TaskFrame` cargado mientras siga vigente"""
+
+    def __init__(self, max_age_seconds: float = 60):
+        self.max_age_seconds = max_age_seconds
+        self._frame = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.load_seconds = 0.0
+
+    def _is_fresh(self) -> bool:
+        return self._frame is not None and time.monotonic() - self._loaded_at < self.max_age_seconds
+
+    async def frame(self, load: Callable[[], Awaitable[TaskFrame]]) -> TaskFrame:
+        """Devuelve el frame cargado o lo recarga con `load` si caducó"""
+        if self._is_fresh():
+            return self._frame
+        async with self._lock:
+            # Otra petición pudo recargarlo mientras se esperaba el lock
+            if self._is_fresh():
+                return self._frame
+            started = time.monotonic()
+            frame = await load()
+            self.load_seconds = time.monotonic() - started
+            self.loads += 1
+            # La antigüedad cuenta desde el inicio de la carga, la primera lectura de las tareas
+            self._frame, self._loaded_at = frame, started
+            return frame
+
+    def invalidate(self) -> None:
+        self._frame = None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._frame is not None,
+            "tasks": len(self._frame) if self._frame is not None else 0,
+            "loads": self.loads,
+            "last_load_seconds": round(self.load_seconds, 3),
+            "max_age_seconds": self.max_age_seconds
+        }
@@ -0,0 +1,6 @@
+"""
+Benchmarks del backend.
+
+Se ejecutan contra un mongod local (por defecto `mongodb://localhost:27017`)
+y una base de datos dedicada, nunca contra la base de datos de la aplicación.
+"""
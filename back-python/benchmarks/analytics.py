@@ -0,0 +1,154 @@
+"""
+Reportes ad hoc (burn-down, throughput por usuario y tiempo de ciclo):
+recorrido documento a documento en Python frente al motor columnar de
+`analytics.py`. No necesita MongoDB: las tareas se generan en memoria con la
+misma forma que las de `init_db.py`, y cada tamaño comprueba que ambos
+cálculos devuelven lo mismo.
+
+    python -m benchmarks.analytics --sizes 10000,100000,1000000
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from analytics import TaskFrame
+from rollups import UNASSIGNED, day_key
+
+PROJECTS = 20
+USERS = ["Ana Martínez", "Carlos Ruiz", "Juan Pérez", "Lucía Gómez", "Marta Sanz", None]
+START = datetime(2023, 1, 1)
+DAYS = 365
+
+def generate_tasks(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(n):
+        created = START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+        completed = rng.random() < 0.6
+        task = {
+            "project_id": f"project-{i % PROJECTS}",
+            "estado": "completada" if completed else rng.choice(("pendiente", "en progreso")),
+            "prioridad": rng.choice(("baja", "media", "alta")),
+            "usuario": rng.choice(USERS),
+            "completada": completed,
+            "creada_en": created,
+        }
+        if completed:
+            task["completada_en"] = created + timedelta(minutes=rng.randrange(1, 30 * 24 * 60))
+        tasks.append(task)
+    return tasks
+
+def loop_burndown(tasks: list, project_ids: set) -> list:
+    created, completed = Counter(), Counter()
+    for task in tasks:
+        if task.get("project_id") not in project_ids:
+            continue
+        created[day_key(task["creada_en"])] += 1
+        if task.get("completada"):
+            completed[day_key(task.get("completada_en") or task["creada_en"])] += 1
+    first = datetime.strptime(min(created), "%Y-%m-%d").date()
+    last = datetime.strptime(max(set(created) | set(completed)), "%Y-%m-%d").date()
+    rows, remaining = [], 0
+    for offset in range((last - first).days + 1):
+        day = (first + timedelta(days=offset)).isoformat()
+        remaining += created[day] - completed[day]
+        rows.append({"date": day, "created": created[day], "completed": completed[day], "remaining": remaining})
+    return rows
+
+def loop_throughput(tasks: list, project_ids: set) -> dict:
+    counts = defaultdict(Counter)
+    for task in tasks:
+        if task.get("project_id") not in project_ids or not task.get("completada"):
+            continue
+        completed = task["completada_en"].date()
+        week = (completed - timedelta(days=completed.weekday())).isoformat()
+        counts[task.get("usuario") or UNASSIGNED][week] += 1
+    weeks = sorted({week for user_counts in counts.values() for week in user_counts})
+    return {user: [user_counts[week] for week in weeks] for user, user_counts in counts.items()}
+
+def loop_percentile(values: list, q: float) -> float:
+    position = q * (len(values) - 1)
+    low, high = int(position), min(int(position) + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+def loop_cycle_time(tasks: list, project_ids: set) -> dict:
+    hours = defaultdict(list)
+    for task in tasks:
+        if task.get("project_id") not in project_ids or not task.get("completada"):
+            continue
+        elapsed = task["completada_en"] - task["creada_en"]
+        hours[task.get("usuario") or UNASSIGNED].append(elapsed.total_seconds() / 3600)
+    stats = {}
+    for user, values in hours.items():
+        values.sort()
+        stats[user] = (
+            len(values),
+            round(sum(values) / len(values), 2),
+            round(loop_percentile(values, 0.5), 2),
+            round(loop_percentile(values, 0.9), 2)
+        )
+    return stats
+
+def timed(function) -> tuple:
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+def run_size(n: int) -> list:
+    tasks = generate_tasks(n)
+    # La mitad de los proyectos, como un reporte filtrado
+    project_ids = {f"project-{i}" for i in range(0, PROJECTS, 2)}
+
+    frame, load_seconds = timed(lambda: TaskFrame.from_documents(tasks))
+    mask = frame.mask(project_ids)
+    results = [{"report": "load", "mode": "columnar", "tasks": n, "seconds": round(load_seconds, 4)}]
+
+    reports = {
+        "burndown": (
+            lambda: loop_burndown(tasks, project_ids),
+            lambda: frame.burndown(mask),
+            lambda loop, columnar: loop == columnar
+        ),
+        "throughput": (
+            lambda: loop_throughput(tasks, project_ids),
+            lambda: frame.throughput(mask),
+            lambda loop, columnar: loop == {row["usuario"]: row["counts"] for row in columnar["users"]}
+        ),
+        "cycle_time": (
+            lambda: loop_cycle_time(tasks, project_ids),
+            lambda: frame.cycle_time(mask),
+            lambda loop, columnar: loop == {
+                row["usuario"]: (row["count"], row["mean_hours"], row["median_hours"], row["p90_hours"])
+                for row in columnar
+            }
+        ),
+    }
+    for report, (loop, columnar, same) in reports.items():
+        loop_result, loop_seconds = timed(loop)
+        columnar_result, columnar_seconds = timed(columnar)
+        results.append({
+            "report": report,
+            "tasks": n,
+            "loop_seconds": round(loop_seconds, 4),
+            "columnar_seconds": round(columnar_seconds, 4),
+            "speedup": round(loop_seconds / columnar_seconds, 1) if columnar_seconds else None,
+            "same_result": same(loop_result, columnar_result)
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Número de tareas separados por comas")
+    args = parser.parse_args()
+
+    results = []
+    for n in (int(size) for size in args.sizes.split(",")):
+        results.extend(run_size(n))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
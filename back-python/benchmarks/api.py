@@ -0,0 +1,440 @@
+"""
+Prueba de carga de todos los endpoints de la API sobre un conjunto de datos
+sintético reproducible (datasets.py: los mismos documentos que init_db.py, en
+el volumen pedido, cargados con bulk_load.py).
+
+Cada escenario lanza `--requests` peticiones con `--concurrency` clientes y
+mide p50/p95/p99, peticiones por segundo y errores; al final se informa del
+pico de memoria residente del servidor (tras cada escenario, para ver cuál lo
+hizo crecer). Primero se miden las lecturas y después las escrituras, que
+trabajan sobre documentos creados por el propio benchmark (los PUT, PATCH y
+DELETE usan los que crearon los POST), de modo que los datos sembrados no
+cambian entre lecturas. Los endpoints de la API que no tienen escenario se
+listan en `uncovered`.
+
+Contra un mongod local (por defecto) el servidor se arranca en un subproceso.
+Con `--stand-in` se usa mongomock en memoria y el servidor corre en este mismo
+proceso: no hace falta MongoDB, pero los clientes compiten con el servidor por
+el GIL, la búsqueda de texto no está soportada y la memoria incluye la del
+benchmark; sirve para comparar cambios del código de la API, no para medir
+capacidad.
+
+`--save-baseline` guarda el resultado y `--baseline` lo compara con uno
+guardado: un escenario empeora si su p95 sube o su throughput baja más que
+`--tolerance`.
+
+    python -m benchmarks.api --projects 50 --tasks 100000 --users 500 --save-baseline baseline.json
+    python -m benchmarks.api --projects 50 --tasks 100000 --users 500 --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from datetime import datetime
+from urllib.parse import urlencode
+
+from benchmarks.common import (
+    DEFAULT_DATABASE_NAME, DEFAULT_PORT, bench_database, latency_summary, peak_rss_kb, start_server, stop_server
+)
+from bulk_load import COLLECTIONS, seed_database
+
+# Nombre del escenario, método, plantilla de la ruta (como en la API) y función que
+# construye la petición `i`: `(path, payload)`. `stream` lee solo el primer fragmento.
+Scenario = namedtuple("Scenario", ["name", "method", "route", "build", "stream"], defaults=[False])
+
+BENCH_MARKER = "Benchmark"
+BULK_SIZE = 10
+# Si un POST falló y no hay documentos que modificar, las peticiones van a un id inexistente (404)
+MISSING_ID = "000000000000000000000000"
+
+def pick(values: list, i: int, default=MISSING_ID):
+    return values[i % len(values)] if values else default
+
+def pick_user(state: dict, i: int) -> tuple:
+    return pick(state["users"], i, (MISSING_ID, f"{MISSING_ID}@benchmark.local"))
+
+def task_payload(state: dict, i: int) -> dict:
+    return {
+        "descripcion": f"{BENCH_MARKER} tarea {i}",
+        "prioridad": ("alta", "media", "baja")[i % 3],
+        "project_id": pick(state["project_ids"], i)
+    }
+
+READ_SCENARIOS = [
+    Scenario("GET /", "GET", "/", lambda state, i: ("/", None)),
+    Scenario("GET /test", "GET", "/test", lambda state, i: ("/test", None)),
+    Scenario("GET /health", "GET", "/health", lambda state, i: ("/health", None)),
+    Scenario("GET /health/worker", "GET", "/health/worker", lambda state, i: ("/health/worker", None)),
+    Scenario("GET /health/pool", "GET", "/health/pool", lambda state, i: ("/health/pool", None)),
+    Scenario("GET /health/compression", "GET", "/health/compression", lambda state, i: ("/health/compression", None)),
+    Scenario("GET /health/cache", "GET", "/health/cache", lambda state, i: ("/health/cache", None)),
+    Scenario("GET /health/changes", "GET", "/health/changes", lambda state, i: ("/health/changes", None)),
+    Scenario("GET /health/events", "GET", "/health/events", lambda state, i: ("/health/events", None)),
+    Scenario("GET /health/analytics", "GET", "/health/analytics", lambda state, i: ("/health/analytics", None)),
+    Scenario("GET /metrics", "GET", "/metrics", lambda state, i: ("/metrics", None)),
+    Scenario("GET /api/projects", "GET", "/api/projects", lambda state, i: ("/api/projects", None)),
+    Scenario("GET /api/projects?view=summary", "GET", "/api/projects",
+             lambda state, i: ("/api/projects?view=summary", None)),
+    Scenario("GET /api/projects?limit=50", "GET", "/api/projects",
+             lambda state, i: ("/api/projects?limit=50", None)),
+    Scenario("GET /api/projects/{project_id}", "GET", "/api/projects/{project_id}",
+             lambda state, i: (f"/api/projects/{pick(state['project_ids'], i)}", None)),
+    Scenario("GET /api/projects/{project_id}/tasks", "GET", "/api/projects/{project_id}/tasks",
+             lambda state, i: (f"/api/projects/{pick(state['project_ids'], i)}/tasks", None)),
+    Scenario("GET /api/projects/{project_id}/tasks?limit=50", "GET", "/api/projects/{project_id}/tasks",
+             lambda state, i: (f"/api/projects/{pick(state['project_ids'], i)}/tasks?limit=50", None)),
+    Scenario("GET /api/users", "GET", "/api/users", lambda state, i: ("/api/users", None)),
+    Scenario("GET /api/users?limit=50", "GET", "/api/users", lambda state, i: ("/api/users?limit=50", None)),
+    Scenario("GET /api/users/simple", "GET", "/api/users/simple", lambda state, i: ("/api/users/simple", None)),
+    Scenario("GET /api/reports/project-stats", "GET", "/api/reports/project-stats",
+             lambda state, i: ("/api/reports/project-stats", None)),
+    Scenario("GET /api/reports/summary", "GET", "/api/reports/summary",
+             lambda state, i: ("/api/reports/summary", None)),
+    Scenario("GET /api/reports/summary?project_id", "GET", "/api/reports/summary",
+             lambda state, i: (f"/api/reports/summary?project_id={pick(state['project_ids'], i)}", None)),
+    Scenario("GET /api/reports/daily", "GET", "/api/reports/daily",
+             lambda state, i: ("/api/reports/daily", None)),
+    Scenario("GET /api/reports/burndown?project_id", "GET", "/api/reports/burndown",
+             lambda state, i: (f"/api/reports/burndown?project_id={pick(state['project_ids'], i)}", None)),
+    Scenario("GET /api/reports/throughput", "GET", "/api/reports/throughput",
+             lambda state, i: ("/api/reports/throughput", None)),
+    Scenario("GET /api/reports/cycle-time", "GET", "/api/reports/cycle-time",
+             lambda state, i: ("/api/reports/cycle-time", None)),
+    Scenario("GET /api/reports/task-timeline?limit=100", "GET", "/api/reports/task-timeline",
+             lambda state, i: ("/api/reports/task-timeline?limit=100", None)),
+    Scenario("GET /api/search?mode=text", "GET", "/api/search",
+             lambda state, i: ("/api/search?" + urlencode({"q": pick(["migración", "frontend", "pruebas"], i)}), None)),
+    Scenario("GET /api/search?mode=prefix", "GET", "/api/search",
+             lambda state, i: ("/api/search?" + urlencode({"mode": "prefix", "q": pick(["des", "impl", "ana"], i)}),
+                               None)),
+    Scenario("GET /api/export/projects", "GET", "/api/export/projects",
+             lambda state, i: ("/api/export/projects", None)),
+    Scenario("GET /api/export/projects/{project_id}/tasks", "GET", "/api/export/projects/{project_id}/tasks",
+             lambda state, i: (f"/api/export/projects/{pick(state['project_ids'], i)}/tasks", None)),
+    Scenario("GET /api/export/users", "GET", "/api/export/users",
+             lambda state, i: ("/api/export/users", None)),
+    Scenario("GET /api/export/task-timeline?project_id", "GET", "/api/export/task-timeline",
+             lambda state, i: (f"/api/export/task-timeline?project_id={pick(state['project_ids'], i)}", None)),
+    Scenario("GET /api/events", "GET", "/api/events", lambda state, i: ("/api/events", None), stream=True),
+]
+
+# Cada grupo empieza con el POST que crea los documentos; `collect` los recupera
+# de la base de datos (las respuestas de proyectos y usuarios no incluyen el `_id`)
+WRITE_SCENARIOS = [
+    Scenario("POST /api/projects", "POST", "/api/projects",
+             lambda state, i: ("/api/projects", {"name": f"{BENCH_MARKER} {i}", "description": "Proyecto de carga"})),
+    Scenario("PUT /api/projects/{project_id}", "PUT", "/api/projects/{project_id}",
+             lambda state, i: (f"/api/projects/{pick(state['projects'], i)}",
+                               {"name": f"{BENCH_MARKER} {i}", "description": "Proyecto reemplazado"})),
+    Scenario("PATCH /api/projects/{project_id}", "PATCH", "/api/projects/{project_id}",
+             lambda state, i: (f"/api/projects/{pick(state['projects'], i)}", {"description": f"Revisión {i}"})),
+    Scenario("POST /api/tasks", "POST", "/api/tasks",
+             lambda state, i: ("/api/tasks", task_payload(state, i))),
+    Scenario("PUT /api/tasks/{task_id}", "PUT", "/api/tasks/{task_id}",
+             lambda state, i: (f"/api/tasks/{pick(state['tasks'], i)}",
+                               {**task_payload(state, i), "estado": "en progreso"})),
+    Scenario("PATCH /api/tasks/{task_id}", "PATCH", "/api/tasks/{task_id}",
+             lambda state, i: (f"/api/tasks/{pick(state['tasks'], i)}",
+                               {"estado": "completada", "completada": True})),
+    Scenario("POST /api/tasks/bulk", "POST", "/api/tasks/bulk",
+             lambda state, i: ("/api/tasks/bulk", [task_payload(state, i * BULK_SIZE + j) for j in range(BULK_SIZE)])),
+    Scenario("PATCH /api/tasks/bulk", "PATCH", "/api/tasks/bulk",
+             lambda state, i: ("/api/tasks/bulk", [
+                 {"id": pick(state["tasks"], i * BULK_SIZE + j), "prioridad": "alta"} for j in range(BULK_SIZE)
+             ])),
+    Scenario("DELETE /api/tasks/{task_id}", "DELETE", "/api/tasks/{task_id}",
+             lambda state, i: (f"/api/tasks/{pick(state['tasks'], i)}", None)),
+    Scenario("POST /api/users", "POST", "/api/users",
+             lambda state, i: ("/api/users", {"name": f"{BENCH_MARKER} {i}",
+                                              "email": f"{state['run']}.{i}@benchmark.local"})),
+    Scenario("POST /api/users/bulk", "POST", "/api/users/bulk",
+             lambda state, i: ("/api/users/bulk", [
+                 {"name": f"{BENCH_MARKER} lote {i}", "email": f"{state['run']}.lote.{i}.{j}@benchmark.local"}
+                 for j in range(BULK_SIZE)
+             ])),
+    Scenario("PUT /api/users/{user_id}", "PUT", "/api/users/{user_id}",
+             lambda state, i: (f"/api/users/{pick_user(state, i)[0]}",
+                               {"name": f"{BENCH_MARKER} {i}", "email": pick_user(state, i)[1], "role": "developer"})),
+    Scenario("PATCH /api/users/{user_id}", "PATCH", "/api/users/{user_id}",
+             lambda state, i: (f"/api/users/{pick_user(state, i)[0]}", {"role": "manager"})),
+    Scenario("DELETE /api/users/{user_id}", "DELETE", "/api/users/{user_id}",
+             lambda state, i: (f"/api/users/{pick_user(state, i)[0]}", None)),
+    Scenario("DELETE /api/projects/{project_id}", "DELETE", "/api/projects/{project_id}",
+             lambda state, i: (f"/api/projects/{pick(state['projects'], i)}", None)),
+    Scenario("GET /api/jobs/{job_id}", "GET", "/api/jobs/{job_id}",
+             lambda state, i: (f"/api/jobs/{pick(state['jobs'], i)}", None)),
+]
+
+def collect(db, state: dict, scenario: Scenario) -> None:
+    """Documentos creados por un escenario de escritura, para los siguientes"""
+    marker = {"$regex": f"^{BENCH_MARKER} "}
+    if scenario.name == "POST /api/projects":
+        state["projects"] = [str(project["_id"]) for project in db.projects.find({"name": marker}, {"_id": 1})]
+    elif scenario.name == "POST /api/tasks":
+        state["tasks"] = [str(task["_id"]) for task in db.tasks.find({"descripcion": marker}, {"_id": 1})]
+    elif scenario.name == "POST /api/users":
+        state["users"] = [(str(user["_id"]), user["email"]) for user in db.users.find({"name": marker})]
+    elif scenario.name == "DELETE /api/projects/{project_id}":
+        state["jobs"] = [str(job["_id"]) for job in db.jobs.find({}, {"_id": 1})]
+
+def send(base: str, method: str, path: str, payload, stream: bool = False) -> int:
+    """Una petición completa (o hasta el primer fragmento si `stream`); devuelve el código de estado"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(
+        base + path, data=data, method=method,
+        headers={"Content-Type": "application/json"} if data is not None else {}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            if stream:
+                response.readline()
+            else:
+                response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+def run_scenario(base: str, scenario: Scenario, state: dict, requests: int, concurrency: int) -> dict:
+    """Lanza las peticiones `0..requests-1` del escenario repartidas entre `concurrency` clientes"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client():
+        local_latencies = []
+        local_statuses = {}
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            path, payload = scenario.build(state, i)
+            started = time.perf_counter()
+            try:
+                status = send(base, scenario.method, path, payload, scenario.stream)
+            except OSError:
+                status = "connection_error"
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client) for _ in range(min(concurrency, requests))]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    errors = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 400)
+    return {
+        "name": scenario.name,
+        "method": scenario.method,
+        "route": scenario.route,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(latencies)
+    }
+
+def api_operations(base: str) -> set:
+    """Métodos y rutas publicados en el esquema OpenAPI de la aplicación"""
+    with urllib.request.urlopen(f"{base}/openapi.json", timeout=30) as response:
+        schema = json.loads(response.read())
+    return {
+        (method.upper(), path)
+        for path, operations in schema["paths"].items()
+        for method in operations
+    }
+
+def scenario_requests(scenario: Scenario, requests: int) -> int:
+    """Los escenarios por lotes crean o modifican `BULK_SIZE` documentos por petición"""
+    if scenario.route == "/api/tasks/bulk" or scenario.route == "/api/users/bulk":
+        return max(1, requests // BULK_SIZE)
+    return requests
+
+def run_scenarios(base: str, db, state: dict, requests: int, concurrency: int, rss) -> list:
+    results = []
+    for scenario in [*READ_SCENARIOS, *WRITE_SCENARIOS]:
+        result = run_scenario(base, scenario, state, scenario_requests(scenario, requests), concurrency)
+        result["peak_rss_kb"] = rss()
+        results.append(result)
+        collect(db, state, scenario)
+    return results
+
+def stand_in_server(port: int, database_name: str):
+    """Servidor de la API en un hilo de este proceso, sobre mongomock; devuelve (cliente, servidor, hilo)"""
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit("--stand-in necesita mongomock: pip install mongomock")
+    import uvicorn
+
+    import main
+    from database import SyncDatabase
+
+    client = mongomock.MongoClient()
+
+    def connect():
+        main.database.client = client
+        main.database.db = SyncDatabase(client[database_name])
+
+    # mongomock no admite change streams: la invalidación es la local de cada escritura
+    main.settings.CHANGE_STREAMS_ENABLED = False
+    main.settings.DB_DRIVER = "pymongo"
+    main.database.connect = connect
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    return client, server, thread
+
+def wait_healthy(base: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/health", timeout=1) as response:
+                if json.loads(response.read()).get("status") == "healthy":
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a tiempo en /health")
+
+def run(n_projects: int, n_tasks: int, n_users: int, requests: int, concurrency: int, port: int,
+        stand_in: bool = False, seed: int = 42) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    state = {"run": datetime.utcnow().strftime("%Y%m%d%H%M%S"), "projects": [], "tasks": [], "users": [], "jobs": []}
+
+    if stand_in:
+        client, server, thread = stand_in_server(port, DEFAULT_DATABASE_NAME)
+        db = client[DEFAULT_DATABASE_NAME]
+        dataset = seed_database(db, n_projects, n_tasks, n_users, seed=seed)
+        thread.start()
+        try:
+            wait_healthy(base)
+            rss = lambda: peak_rss_kb(os.getpid())
+            state["project_ids"] = [str(project["_id"]) for project in db.projects.find({}, {"_id": 1})]
+            operations = api_operations(base)
+            results = run_scenarios(base, db, state, requests, concurrency, rss)
+        finally:
+            server.should_exit = True
+            thread.join(timeout=30)
+    else:
+        client, db = bench_database()
+        try:
+            dataset = seed_database(db, n_projects, n_tasks, n_users, seed=seed)
+            state["project_ids"] = [str(project["_id"]) for project in db.projects.find({}, {"_id": 1})]
+            process = start_server(port)
+            try:
+                rss = lambda: peak_rss_kb(process.pid)
+                operations = api_operations(base)
+                results = run_scenarios(base, db, state, requests, concurrency, rss)
+            finally:
+                stop_server(process)
+        finally:
+            for collection_name in COLLECTIONS:
+                db[collection_name].drop()
+            client.close()
+
+    covered = {(result["method"], result["route"]) for result in results}
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "backend": "mongomock" if stand_in else "mongod",
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "dataset": dataset,
+        "requests_per_scenario": requests,
+        "concurrency": concurrency,
+        "peak_rss_kb": max((result["peak_rss_kb"] for result in results), default=0),
+        "uncovered": sorted(f"{method} {path}" for method, path in operations - covered),
+        "results": results
+    }
+
+def percent_change(current: float, previous: float):
+    return round((current - previous) / previous * 100, 1) if previous else None
+
+def compare(report: dict, baseline: dict, tolerance: float) -> dict:
+    """Cambios de cada escenario respecto a `baseline`; regresión si empeora más que `tolerance`"""
+    previous = {result["name"]: result for result in baseline["results"]}
+    scenarios = []
+    for result in report["results"]:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        p95_change = percent_change(result["p95_ms"], before["p95_ms"])
+        rps_change = percent_change(result["requests_per_second"], before["requests_per_second"])
+        scenarios.append({
+            "name": result["name"],
+            "p95_ms": result["p95_ms"],
+            "baseline_p95_ms": before["p95_ms"],
+            "p95_change_pct": p95_change,
+            "requests_per_second": result["requests_per_second"],
+            "baseline_requests_per_second": before["requests_per_second"],
+            "rps_change_pct": rps_change,
+            "regression": (
+                (p95_change is not None and p95_change > tolerance * 100)
+                or (rps_change is not None and rps_change < -tolerance * 100)
+                or result["errors"] > before["errors"]
+            )
+        })
+    same_dataset = all(
+        report["dataset"].get(key) == baseline["dataset"].get(key) for key in ("projects", "tasks", "users", "seed")
+    ) and report["backend"] == baseline.get("backend")
+    return {
+        "baseline_created_at": baseline.get("created_at"),
+        "tolerance_pct": round(tolerance * 100, 1),
+        "peak_rss_change_pct": percent_change(report["peak_rss_kb"], baseline["peak_rss_kb"]),
+        "same_dataset": same_dataset,
+        "regressions": [scenario["name"] for scenario in scenarios if scenario["regression"]],
+        "scenarios": scenarios
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del conjunto de datos")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clientes concurrentes")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--stand-in", action="store_true", help="Usar mongomock en memoria en lugar de mongod")
+    parser.add_argument("--output", help="Escribir el resultado en este fichero además de mostrarlo")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Guardar el resultado como baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Comparar con una baseline guardada")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Empeoramiento tolerado de p95 y throughput (0.10 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Salir con código 1 si algún escenario empeora más que la tolerancia")
+    args = parser.parse_args()
+
+    report = run(args.projects, args.tasks, args.users, args.requests, args.concurrency, args.port,
+                 args.stand_in, args.seed)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["comparison"] = compare(report, json.load(baseline_file), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as output_file:
+                output_file.write(output + "\n")
+
+    if args.fail_on_regression and report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
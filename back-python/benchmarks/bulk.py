@@ -0,0 +1,103 @@
+"""
+Escritura de lotes: una petición por elemento (`POST /api/tasks`,
+`PUT /api/tasks/{id}`, `POST /api/users`) frente a los endpoints en lote
+(`POST /api/tasks/bulk`, `PATCH /api/tasks/bulk`, `POST /api/users/bulk`).
+
+No hay resultados de referencia registrados: todavía no se ha ejecutado
+contra un mongod.
+
+    python -m benchmarks.bulk --sizes 100,1000,5000
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.common import (
+    DEFAULT_PORT, bench_database, reset_database,
+    send_json, start_server, stop_server
+)
+
+def task_payloads(project_id: str, n: int) -> list:
+    return [
+        {
+            "descripcion": f"Tarea importada {i}",
+            "prioridad": ("baja", "media", "alta")[i % 3],
+            "project_id": project_id
+        }
+        for i in range(n)
+    ]
+
+def user_payloads(n: int, prefix: str) -> list:
+    return [{"name": f"Usuario {i}", "email": f"{prefix}{i}@bench.local"} for i in range(n)]
+
+def timed(function) -> tuple:
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+def measurement(operation: str, mode: str, n: int, seconds: float) -> dict:
+    return {
+        "operation": operation,
+        "mode": mode,
+        "items": n,
+        "seconds": round(seconds, 3),
+        "items_per_second": round(n / seconds, 1) if seconds else None
+    }
+
+def run_size(base: str, db, n: int) -> list:
+    reset_database(db)
+    project = send_json(f"{base}/api/projects", {"name": f"Bulk {n}", "description": "benchmark"})
+    project_id = str(db.projects.find_one({"name": project["name"]})["_id"])
+    results = []
+
+    tasks = task_payloads(project_id, n)
+    loop_ids, seconds = timed(lambda: [send_json(f"{base}/api/tasks", task)["_id"] for task in tasks])
+    results.append(measurement("create_tasks", "per_item", n, seconds))
+    bulk, seconds = timed(lambda: send_json(f"{base}/api/tasks/bulk", tasks))
+    results.append(measurement("create_tasks", "bulk", n, seconds))
+
+    _, seconds = timed(lambda: [
+        send_json(f"{base}/api/tasks/{task_id}", {**task, "completada": True}, method="PUT")
+        for task_id, task in zip(loop_ids, tasks)
+    ])
+    results.append(measurement("complete_tasks", "per_item", n, seconds))
+    _, seconds = timed(lambda: send_json(
+        f"{base}/api/tasks/bulk",
+        [{"id": task_id, "completada": True} for task_id in bulk["ids"]],
+        method="PATCH"
+    ))
+    results.append(measurement("complete_tasks", "bulk", n, seconds))
+
+    _, seconds = timed(lambda: [send_json(f"{base}/api/users", user) for user in user_payloads(n, "loop")])
+    results.append(measurement("create_users", "per_item", n, seconds))
+    _, seconds = timed(lambda: send_json(f"{base}/api/users/bulk", user_payloads(n, "bulk")))
+    results.append(measurement("create_users", "bulk", n, seconds))
+
+    return results
+
+def run(sizes: list, port: int) -> list:
+    client, db = bench_database()
+    results = []
+    server = start_server(port)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        for n in sizes:
+            results.extend(run_size(base, db, n))
+    finally:
+        stop_server(server)
+        reset_database(db)
+        client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,5000", help="Tamaños de lote separados por comas")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(json.dumps(run(sizes, args.port), indent=2))
+
+if __name__ == "__main__":
+    main()
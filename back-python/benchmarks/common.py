@@ -0,0 +1,184 @@
+"""
+Utilidades compartidas por los benchmarks: base de datos de pruebas,
+arranque del servidor en un subproceso y medición de memoria.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MONGODB_URI = os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017")
+DEFAULT_DATABASE_NAME = os.getenv("BENCH_DATABASE_NAME", "gestion_proyectos_bench")
+DEFAULT_PORT = 8765
+
+def bench_database(uri: str = DEFAULT_MONGODB_URI, name: str = DEFAULT_DATABASE_NAME):
+    client = MongoClient(uri)
+    return client, client[name]
+
+def reset_database(db) -> None:
+    for collection_name in ("projects", "tasks", "users"):
+        db[collection_name].drop()
+
+def seed_project_tasks(db, n_tasks: int, batch_size: int = 10000) -> str:
+    """Crea un proyecto con `n_tasks` tareas y devuelve su id."""
+    project_id = db.projects.insert_one({
+        "name": f"Proyecto benchmark {n_tasks}",
+        "description": "Proyecto generado para benchmarks",
+        "created_at": datetime.utcnow(),
+        "status": "Activo",
+        "users": 1,
+        "total": n_tasks,
+        "completadas": n_tasks // 2,
+        "pendientes": n_tasks - n_tasks // 2
+    }).inserted_id
+    project_id = str(project_id)
+
+    start = datetime(2023, 1, 1)
+    for offset in range(0, n_tasks, batch_size):
+        db.tasks.insert_many([
+            {
+                "descripcion": f"Tarea {i}",
+                "prioridad": ("baja", "media", "alta")[i % 3],
+                "estado": "completada" if i % 2 == 0 else "pendiente",
+                "completada": i % 2 == 0,
+                "creada_en": start + timedelta(minutes=i),
+                "usuario": None,
+                "project_id": project_id,
+                "fecha_limite": None
+            }
+            for i in range(offset, min(offset + batch_size, n_tasks))
+        ], ordered=False)
+    return project_id
+
+def start_server(port: int = DEFAULT_PORT, env: dict = None, args: list = None) -> subprocess.Popen:
+    """Arranca `uvicorn main:app` y espera a que /health responda."""
+    server_env = {
+        **os.environ,
+        "MONGODB_URI": DEFAULT_MONGODB_URI,
+        "DATABASE_NAME": DEFAULT_DATABASE_NAME,
+        **(env or {})
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning", *(args or [])],
+        cwd=BACKEND_DIR,
+        env=server_env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if json.loads(response.read()).get("status") == "healthy":
+                    return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("El servidor no respondió a tiempo en /health")
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def peak_rss_kb(pid: int) -> int:
+    """Pico de memoria residente (VmHWM) de un proceso, en KiB. Solo Linux."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+def timed_get(url: str, chunk_size: int = 65536) -> dict:
+    """GET completo midiendo el tiempo hasta el primer byte y el total."""
+    started = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        first = response.read(1)
+        ttfb = time.perf_counter() - started
+        size = len(first)
+        while chunk := response.read(chunk_size):
+            size += len(chunk)
+    return {
+        "ttfb_ms": round(ttfb * 1000, 2),
+        "total_ms": round((time.perf_counter() - started) * 1000, 2),
+        "bytes": size
+    }
+
+def percentile(values: list, q: float) -> float:
+    """Percentil `q` (0-1) con interpolación lineal; `values` debe estar ordenada"""
+    if not values:
+        return 0.0
+    position = q * (len(values) - 1)
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+def latency_summary(latencies: list) -> dict:
+    """p50, p95 y p99 de una lista de latencias en segundos, en milisegundos"""
+    ordered = sorted(latencies)
+    return {
+        f"p{int(q * 100)}_ms": round(percentile(ordered, q) * 1000, 2)
+        for q in (0.5, 0.95, 0.99)
+    }
+
+def send_json(url: str, payload, method: str = "POST"):
+    """Envía `payload` como JSON y devuelve la respuesta decodificada."""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method=method
+    )
+    with urllib.request.urlopen(request, timeout=300) as response:
+        return json.loads(response.read())
+
+def run_load(urls: list, concurrency: int, duration: float) -> dict:
+    """Lanza `concurrency` clientes que recorren `urls` en bucle durante `duration` segundos."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(worker: int):
+        nonlocal errors
+        position = worker
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            url = urls[position % len(urls)]
+            position += 1
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                local_latencies.append(time.perf_counter() - started)
+            except OSError:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    threads = [threading.Thread(target=client, args=(worker,)) for worker in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latencies": latencies
+    }
@@ -0,0 +1,135 @@
+"""
+Compresión de respuestas: bytes ahorrados y CPU del servidor por ruta y
+codificación.
+
+Siembra el conjunto sintético de datasets.py y pide cada ruta `--requests`
+veces sin comprimir (`identity`) y con cada codificación que ofrece el
+servidor (/health/compression). Para cada una informa del tamaño medio en la
+red, el porcentaje ahorrado frente a `identity`, la latencia p50/p95 y el CPU
+que el servidor dedicó a comprimir (diferencia de /health/compression antes y
+después). Las rutas en caché (/api/projects, /api/users) comprimen una vez por
+entrada y codificación y el resto de peticiones reutilizan esos bytes
+(`from_cache`); el timeline se comprime en cada petición y su exportación, en
+streaming, trozo a trozo.
+
+Como en benchmarks.api, contra un mongod local por defecto o con
+`--stand-in` sobre mongomock en este mismo proceso.
+
+    python -m benchmarks.compression --tasks 20000 --requests 50
+    python -m benchmarks.compression --stand-in --tasks 5000
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+
+from benchmarks.api import stand_in_server, wait_healthy
+from benchmarks.common import DEFAULT_DATABASE_NAME, DEFAULT_PORT, bench_database, latency_summary, start_server, stop_server
+from bulk_load import COLLECTIONS, seed_database
+
+IDENTITY = "identity"
+# (ruta de /health/compression, petición)
+ROUTES = [
+    ("GET /api/reports/task-timeline", "/api/reports/task-timeline"),
+    ("GET /api/projects", "/api/projects"),
+    ("GET /api/users", "/api/users"),
+    ("GET /api/export/task-timeline", "/api/export/task-timeline?format=ndjson"),
+]
+
+def get_json(url: str):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return json.loads(response.read())
+
+def fetch(url: str, encoding: str) -> tuple:
+    """Bytes recibidos tal cual (urllib no descomprime) y latencia en segundos"""
+    request = urllib.request.Request(url, headers={"Accept-Encoding": encoding})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        size = len(response.read())
+        received = response.headers.get("Content-Encoding", IDENTITY)
+    return size, time.perf_counter() - started, received
+
+def route_stats(base: str, route: str) -> dict:
+    return get_json(f"{base}/health/compression")["routes"].get(route, {})
+
+def measure_route(base: str, route: str, path: str, encodings: list, requests: int) -> dict:
+    results = {}
+    for encoding in [IDENTITY, *encodings]:
+        before = route_stats(base, route)
+        sizes, latencies, received = [], [], set()
+        for _ in range(requests):
+            size, latency, content_encoding = fetch(base + path, encoding)
+            sizes.append(size)
+            latencies.append(latency)
+            received.add(content_encoding)
+        after = route_stats(base, route)
+        delta = {key: after.get(key, 0) - before.get(key, 0) for key in ("compressed", "from_cache", "cpu_seconds")}
+        results[encoding] = {
+            "content_encoding": sorted(received),
+            "bytes": round(sum(sizes) / len(sizes)),
+            **latency_summary(latencies),
+            "compressions": delta["compressed"] - delta["from_cache"],
+            "from_cache": delta["from_cache"],
+            "server_cpu_ms_per_request": round(delta["cpu_seconds"] * 1000 / requests, 3)
+        }
+
+    identity_bytes = results[IDENTITY]["bytes"]
+    for encoding in encodings:
+        compressed = results[encoding]
+        compressed["saved_pct"] = round((1 - compressed["bytes"] / identity_bytes) * 100, 1) if identity_bytes else 0.0
+        compressed["bytes_saved_per_request"] = identity_bytes - compressed["bytes"]
+    return {"route": route, "uncompressed_bytes": identity_bytes, "encodings": results}
+
+def measure(base: str, requests: int) -> dict:
+    server = get_json(f"{base}/health/compression")
+    return {
+        "server_encodings": server["encodings"],
+        "min_size": server["min_size"],
+        "levels": server["levels"],
+        "routes": [measure_route(base, route, path, server["encodings"], requests) for route, path in ROUTES]
+    }
+
+def run(n_projects: int, n_tasks: int, n_users: int, requests: int, port: int, stand_in: bool, seed: int) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    if stand_in:
+        client, server, thread = stand_in_server(port, DEFAULT_DATABASE_NAME)
+        dataset = seed_database(client[DEFAULT_DATABASE_NAME], n_projects, n_tasks, n_users, seed=seed)
+        thread.start()
+        try:
+            wait_healthy(base)
+            report = measure(base, requests)
+        finally:
+            server.should_exit = True
+            thread.join(timeout=30)
+    else:
+        client, db = bench_database()
+        try:
+            dataset = seed_database(db, n_projects, n_tasks, n_users, seed=seed)
+            process = start_server(port)
+            try:
+                report = measure(base, requests)
+            finally:
+                stop_server(process)
+        finally:
+            for collection_name in COLLECTIONS:
+                db[collection_name].drop()
+            client.close()
+    return {"backend": "mongomock" if stand_in else "mongod", "dataset": dataset, "requests": requests, **report}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del conjunto de datos")
+    parser.add_argument("--requests", type=int, default=50, help="Peticiones por ruta y codificación")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--stand-in", action="store_true", help="Usar mongomock en memoria en lugar de mongod")
+    args = parser.parse_args()
+
+    report = run(args.projects, args.tasks, args.users, args.requests, args.port, args.stand_in, args.seed)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Peticiones por segundo con el driver asíncrono (Motor) frente al síncrono
+(PyMongo) a 1, 16 y 128 clientes concurrentes.
+
+No hay resultados de referencia registrados: todavía no se ha ejecutado
+contra un mongod.
+
+    python -m benchmarks.concurrency --duration 10
+"""
+
+import argparse
+import json
+
+from benchmarks.common import (
+    DEFAULT_PORT, bench_database, reset_database,
+    run_load, seed_project_tasks, start_server, stop_server
+)
+
+DRIVERS = ("pymongo", "motor")
+CONCURRENCY_LEVELS = (1, 16, 128)
+
+def endpoint_urls(port: int, project_ids: list) -> list:
+    base = f"http://127.0.0.1:{port}"
+    urls = [f"{base}/api/projects"]
+    for project_id in project_ids:
+        urls.append(f"{base}/api/projects/{project_id}")
+        urls.append(f"{base}/api/projects/{project_id}/tasks?limit=50")
+    return urls
+
+def run(projects: int, tasks_per_project: int, duration: float, port: int) -> list:
+    client, db = bench_database()
+    results = []
+    try:
+        reset_database(db)
+        project_ids = [seed_project_tasks(db, tasks_per_project) for _ in range(projects)]
+        for driver in DRIVERS:
+            server = start_server(port, env={"DB_DRIVER": driver})
+            try:
+                urls = endpoint_urls(port, project_ids)
+                for concurrency in CONCURRENCY_LEVELS:
+                    measurement = run_load(urls, concurrency, duration)
+                    measurement.pop("latencies")
+                    measurement["driver"] = driver
+                    results.append(measurement)
+            finally:
+                stop_server(server)
+    finally:
+        reset_database(db)
+        client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks-per-project", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por nivel de concurrencia")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.projects, args.tasks_per_project, args.duration, args.port), indent=2))
+
+if __name__ == "__main__":
+    main()
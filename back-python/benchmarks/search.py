@@ -0,0 +1,166 @@
+"""
+Latencia de `GET /api/search` sobre un corpus sintético (por defecto 1M de
+tareas, 200 proyectos y 1000 usuarios) y comprobación de los objetivos.
+
+Los índices se crean después de cargar el corpus, como en una importación.
+Cada consulta se repite `--repeat` veces (la primera se descarta para no
+medir la carga del índice en caché) y se informa de p50/p95/p99 y de si el
+p95 cumple el objetivo de su modo.
+
+    python -m benchmarks.search --tasks 1000000 --target-text-ms 300 --target-prefix-ms 50
+"""
+
+import argparse
+import json
+import random
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+from benchmarks.common import (
+    DEFAULT_PORT, bench_database, latency_summary, reset_database, start_server, stop_server
+)
+from indexes import ensure_indexes_sync
+
+VERBS = ["Revisar", "Preparar", "Actualizar", "Diseñar", "Corregir", "Migrar", "Documentar", "Probar",
+         "Configurar", "Optimizar", "Analizar", "Desplegar"]
+OBJECTS = ["informe", "presupuesto", "formulario", "servidor", "catálogo", "contrato", "panel",
+           "inventario", "pedido", "factura", "campaña", "integración"]
+QUALIFIERS = ["de ventas", "trimestral", "del cliente", "de producción", "de marketing", "anual",
+              "de proveedores", "interno", "móvil", "de soporte", "legal", "de nóminas"]
+NAMES = ["Ana", "Carlos", "Juan", "Lucía", "Marta", "Pedro", "Sofía", "Diego", "Elena", "Jorge"]
+SURNAMES = ["Martínez", "Ruiz", "Pérez", "Gómez", "Sanz", "López", "Díaz", "Moreno", "Álvarez", "Romero"]
+
+# Modo, consulta y parámetros extra de cada caso medido
+QUERIES = [
+    ("text", "informe", {}),
+    ("text", "presupuesto trimestral", {}),
+    ("text", "nóminas", {"types": "tasks"}),
+    ("text", "Martínez", {"types": "users"}),
+    ("text", "informe", {"page": 2}),
+    ("prefix", "rev", {}),
+    ("prefix", "Optimizar cat", {"types": "tasks"}),
+    ("prefix", "luc", {"types": "users"}),
+    ("prefix", "proyecto 1", {"types": "projects"}),
+]
+
+def seed_corpus(db, n_tasks: int, n_projects: int, n_users: int, batch_size: int = 10000, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    project_ids = [str(project_id) for project_id in db.projects.insert_many([
+        {
+            "name": f"Proyecto {i} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}",
+            "description": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}",
+            "created_at": datetime.utcnow(),
+            "status": "Activo",
+            "users": 0,
+            "total": 0,
+            "completadas": 0,
+            "pendientes": 0,
+            "version": 0
+        }
+        for i in range(n_projects)
+    ]).inserted_ids]
+    db.users.insert_many([
+        {
+            "name": f"{rng.choice(NAMES)} {rng.choice(SURNAMES)} {i}",
+            "email": f"usuario{i}@empresa.com",
+            "role": "user",
+            "created_at": datetime.utcnow(),
+            "version": 0
+        }
+        for i in range(n_users)
+    ])
+    start = datetime(2023, 1, 1)
+    for offset in range(0, n_tasks, batch_size):
+        db.tasks.insert_many([
+            {
+                "descripcion": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}",
+                "prioridad": rng.choice(("baja", "media", "alta")),
+                "estado": "pendiente",
+                "completada": False,
+                "creada_en": start + timedelta(minutes=i),
+                "usuario": None,
+                "project_id": project_ids[i % n_projects],
+                "fecha_limite": None,
+                "version": 0
+            }
+            for i in range(offset, min(offset + batch_size, n_tasks))
+        ], ordered=False)
+    loaded = time.perf_counter()
+    errors = ensure_indexes_sync(db)
+    return {
+        "tasks": n_tasks,
+        "projects": n_projects,
+        "users": n_users,
+        "load_seconds": round(loaded - started, 2),
+        "index_seconds": round(time.perf_counter() - loaded, 2),
+        "index_errors": errors
+    }
+
+def get_json(url: str) -> tuple:
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=60) as response:
+        body = json.loads(response.read())
+    return body, time.perf_counter() - started
+
+def search_url(base: str, mode: str, q: str, params: dict, after: str = None) -> str:
+    query = {"q": q, "mode": mode, **{key: value for key, value in params.items() if key != "page"}}
+    if after:
+        query["after"] = after
+    return f"{base}/api/search?{urllib.parse.urlencode(query)}"
+
+def measure(base: str, mode: str, q: str, params: dict, repeat: int, targets: dict) -> dict:
+    after = None
+    if params.get("page", 1) > 1:
+        # Cursor de la página anterior: se mide solo la página pedida
+        for _ in range(params["page"] - 1):
+            body, _ = get_json(search_url(base, mode, q, params, after))
+            after = body["next_cursor"]
+    url = search_url(base, mode, q, params, after)
+    body, _ = get_json(url)
+    latencies = [get_json(url)[1] for _ in range(repeat)]
+    summary = latency_summary(latencies)
+    return {
+        "mode": mode,
+        "q": q,
+        **params,
+        "results": len(body["items"]),
+        **summary,
+        "target_p95_ms": targets[mode],
+        "meets_target": summary["p95_ms"] <= targets[mode]
+    }
+
+def run(n_tasks: int, n_projects: int, n_users: int, repeat: int, targets: dict, port: int) -> dict:
+    client, db = bench_database()
+    try:
+        reset_database(db)
+        corpus = seed_corpus(db, n_tasks, n_projects, n_users)
+        server = start_server(port)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            results = [measure(base, mode, q, params, repeat, targets) for mode, q, params in QUERIES]
+        finally:
+            stop_server(server)
+    finally:
+        reset_database(db)
+        client.close()
+    return {"corpus": corpus, "results": results, "all_targets_met": all(r["meets_target"] for r in results)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50, help="Repeticiones de cada consulta")
+    parser.add_argument("--target-text-ms", type=float, default=300, help="Objetivo de p95 de la búsqueda de texto")
+    parser.add_argument("--target-prefix-ms", type=float, default=50, help="Objetivo de p95 del autocompletado")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    targets = {"text": args.target_text_ms, "prefix": args.target_prefix_ms}
+    print(json.dumps(run(args.tasks, args.projects, args.users, args.repeat, targets, args.port), indent=2))
+
+if __name__ == "__main__":
+    main()
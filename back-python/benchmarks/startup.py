@@ -0,0 +1,164 @@
+"""
+Arranque en frío, memoria por worker y apagado ordenado del servidor de
+producción (server.py).
+
+Para cada número de workers de `--workers` se arranca `python server.py` y se
+mide:
+
+- `cold_start_ms`: desde que se lanza el proceso hasta que /health responde.
+- Por worker (identificado por su pid en /health/worker): tiempo de import de
+  la aplicación, duración del lifespan y del calentamiento de MongoDB, y
+  memoria residente en reposo y tras `--duration` segundos de carga.
+- `drain_ms`: desde el SIGTERM hasta que el supervisor termina, con un stream
+  SSE abierto; `sse_closed` indica si el servidor cerró el stream.
+
+Con `--unreachable` el servidor apunta a un MongoDB inexistente: el arranque
+no debe pasar de `STARTUP_WARMUP_SECONDS` (se toma del entorno), /health debe
+responder `warming_up` y la API 503 (cuentan como `errors` en la carga).
+
+    python -m benchmarks.startup --workers 1,2,4
+    python -m benchmarks.startup --workers 2 --unreachable
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from benchmarks.common import (
+    BACKEND_DIR, DEFAULT_DATABASE_NAME, DEFAULT_MONGODB_URI, DEFAULT_PORT, latency_summary, run_load
+)
+
+UNREACHABLE_URI = "mongodb://127.0.0.1:1/"
+LOAD_PATHS = ["/health", "/api/projects", "/api/users"]
+
+def get_json(url: str, timeout: float = 2):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+def wait_responding(base: str, started: float, timeout: float = 60) -> float:
+    """Milisegundos desde `started` hasta la primera respuesta de /health, sana o no"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            get_json(f"{base}/health", timeout=1)
+            return (time.perf_counter() - started) * 1000
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError("El servidor no respondió a tiempo en /health")
+
+def worker_reports(base: str, workers: int, attempts: int = 200) -> dict:
+    """/health/worker de cada worker: el socket es compartido, así que se pregunta hasta ver todos los pids"""
+    reports = {}
+    for _ in range(attempts):
+        if len(reports) == workers:
+            break
+        try:
+            report = get_json(f"{base}/health/worker")
+            reports[report["pid"]] = report
+        except OSError:
+            time.sleep(0.05)
+    return reports
+
+def open_event_stream(base: str) -> dict:
+    """Abre /api/events en un hilo y anota si el servidor cierra el stream"""
+    state = {"opened": threading.Event(), "closed": False}
+
+    def listen():
+        try:
+            with urllib.request.urlopen(f"{base}/api/events", timeout=60) as response:
+                state["opened"].set()
+                while response.readline():
+                    pass
+            state["closed"] = True
+        except OSError:
+            pass
+        finally:
+            state["opened"].set()
+
+    state["thread"] = threading.Thread(target=listen, daemon=True)
+    state["thread"].start()
+    state["opened"].wait(5)
+    return state
+
+def measure(workers: int, port: int, duration: float, concurrency: int, unreachable: bool) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "MONGODB_URI": UNREACHABLE_URI if unreachable else DEFAULT_MONGODB_URI,
+        "DATABASE_NAME": DEFAULT_DATABASE_NAME,
+        "WORKERS": str(workers),
+        "PORT": str(port),
+        "HOST": "127.0.0.1",
+        "SERVER_ACCESS_LOG": "false"
+    }
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "server.py"], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        cold_start_ms = wait_responding(base, started)
+        health = get_json(f"{base}/health")
+        idle = worker_reports(base, workers)
+
+        load = run_load([base + path for path in LOAD_PATHS], concurrency, duration)
+        latencies = load.pop("latencies")
+        load.update(latency_summary(latencies))
+        loaded = worker_reports(base, workers)
+
+        stream = open_event_stream(base)
+        drain_started = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=120)
+        drain_ms = (time.perf_counter() - drain_started) * 1000
+        stream["thread"].join(5)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    return {
+        "workers": workers,
+        "unreachable_database": unreachable,
+        "cold_start_ms": round(cold_start_ms, 1),
+        "health": health,
+        "per_worker": [
+            {
+                "pid": pid,
+                "import_ms": report["import_ms"],
+                "startup_ms": report["startup_ms"],
+                "warm_up_ms": report["warm_up_ms"],
+                "database_ready": report["database_ready"],
+                "idle_rss_kb": report["memory"].get("rss_kb"),
+                "loaded_rss_kb": loaded.get(pid, {}).get("memory", {}).get("rss_kb"),
+                "peak_rss_kb": loaded.get(pid, {}).get("memory", {}).get("peak_rss_kb")
+            }
+            for pid, report in sorted(idle.items())
+        ],
+        "workers_seen": len(idle),
+        "load": load,
+        "drain_ms": round(drain_ms, 1),
+        "sse_closed": stream["closed"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Número de workers a probar, separados por comas")
+    parser.add_argument("--duration", type=float, default=5, help="Segundos de carga antes de medir la memoria")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unreachable", action="store_true", help="Arrancar contra un MongoDB inexistente")
+    args = parser.parse_args()
+
+    results = [
+        measure(int(workers), args.port, args.duration, args.concurrency, args.unreachable)
+        for workers in args.workers.split(",")
+    ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compara el listado de tareas tradicional con la exportación en streaming.
+
+Para cada tamaño de proyecto se arranca un servidor nuevo por modo, de modo
+que el pico de RSS medido corresponde solo a esa petición.
+
+No hay resultados de referencia registrados: todavía no se ha ejecutado
+contra un mongod.
+
+    python -m benchmarks.streaming --sizes 100,10000,100000,1000000
+"""
+
+import argparse
+import json
+
+from benchmarks.common import (
+    DEFAULT_PORT, bench_database, peak_rss_kb, reset_database,
+    seed_project_tasks, start_server, stop_server, timed_get
+)
+
+MODES = {
+    "list": "/api/projects/{project_id}/tasks",
+    "ndjson": "/api/export/projects/{project_id}/tasks?format=ndjson",
+    "json-stream": "/api/export/projects/{project_id}/tasks?format=json",
+}
+
+def run(sizes: list, port: int) -> list:
+    client, db = bench_database()
+    results = []
+    try:
+        for size in sizes:
+            reset_database(db)
+            project_id = seed_project_tasks(db, size)
+            for mode, path in MODES.items():
+                server = start_server(port)
+                try:
+                    baseline_rss = peak_rss_kb(server.pid)
+                    measurement = timed_get(f"http://127.0.0.1:{port}{path.format(project_id=project_id)}")
+                    measurement.update({
+                        "tasks": size,
+                        "mode": mode,
+                        "peak_rss_kb": peak_rss_kb(server.pid),
+                        "rss_growth_kb": peak_rss_kb(server.pid) - baseline_rss
+                    })
+                    results.append(measurement)
+                finally:
+                    stop_server(server)
+    finally:
+        reset_database(db)
+        client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,10000,100000,1000000",
+                        help="Número de tareas del proyecto, separados por comas")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(json.dumps(run(sizes, args.port), indent=2))
+
+if __name__ == "__main__":
+    main()
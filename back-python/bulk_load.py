@@ -0,0 +1,408 @@
+"""
+Carga masiva de tareas: generadas (datasets.py) o importadas desde CSV/NDJSON.
+
+Las tareas se insertan por lotes con `insert_many` y, con `workers > 1`, en
+varios procesos escritores, cada uno con su propio cliente. El proceso
+principal solo lee el origen y reparte lotes por una cola acotada (dos lotes
+por escritor), así que la memoria no depende del tamaño del fichero.
+
+Los contadores de los proyectos y los agregados de reportes no se recalculan
+recorriendo la colección: cada escritor acumula los deltas de las tareas que
+insertó (los mismos que aplican las escrituras de la API) y el proceso
+principal los suma y los escribe con `$inc` al terminar, de modo que una
+importación sobre datos existentes los deja correctos.
+
+`seed_database` (init_db.py --generate-tasks y los benchmarks) vacía la base
+de datos y crea los índices después de la carga.
+"""
+
+import csv
+import multiprocessing
+import queue
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from bson import json_util
+from pymongo.errors import BulkWriteError
+
+from config import settings
+from counters import counter_updates, empty_counters, tasks_counter_delta
+from database import create_sync_client
+from datasets import batches, project_documents, task_documents, user_documents
+from indexes import ensure_indexes_sync
+from repositories import new_document, stamp_completion, utc_now
+from rollups import count_tasks, rollup_updates
+
+COLLECTIONS = ("projects", "tasks", "users", "jobs", "task_rollups")
+FORMATS = ("csv", "ndjson")
+
+DEFAULT_BATCH_SIZE = 5000
+PROGRESS_INTERVAL_SECONDS = 2
+MAX_REPORTED_ERRORS = 20
+
+# Elementos de trabajo de los escritores
+GENERATE = "generate"
+ROWS = "rows"
+
+# Mensajes de los escritores al proceso principal
+PROGRESS = "progress"
+DONE = "done"
+FAILED = "failed"
+
+TRUE_VALUES = ("true", "1", "si", "sí", "yes")
+FALSE_VALUES = ("false", "0", "no", "")
+
+class DerivedCounts:
+    """Contadores de proyecto y agregados de reportes de las tareas cargadas"""
+
+    def __init__(self):
+        self.counters = defaultdict(Counter)
+        self.rollups = Counter()
+
+    def add(self, tasks: list) -> None:
+        for project_id, delta in tasks_counter_delta((None, task) for task in tasks).items():
+            self.counters[project_id].update(delta)
+        self.rollups.update(count_tasks(tasks))
+
+    def merge(self, other: "DerivedCounts") -> None:
+        for project_id, delta in other.counters.items():
+            self.counters[project_id].update(delta)
+        self.rollups.update(other.rollups)
+
+    def write(self, db, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        counters = {project_id: dict(delta) for project_id, delta in self.counters.items()}
+        for updates in batches(counter_updates(counters), batch_size):
+            db.projects.bulk_write(updates, ordered=False)
+        for updates in batches(rollup_updates(self.rollups), batch_size):
+            db.task_rollups.bulk_write(updates, ordered=False)
+
+def insert_tasks(db, tasks: list) -> Tuple[list, list]:
+    """Inserta un lote sin detenerse en los errores; devuelve las tareas insertadas y los errores"""
+    if not tasks:
+        return [], []
+    try:
+        db.tasks.insert_many(tasks, ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        inserted = [task for index, task in enumerate(tasks) if index not in failed]
+        return inserted, [error.get("errmsg", "Error de escritura") for error in failed.values()]
+    return tasks, []
+
+def parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Valor booleano inválido: {value!r}")
+
+def parse_datetime(value) -> Optional[datetime]:
+    """Fecha ISO 8601 (o ya convertida por json_util) como datetime UTC sin zona, como las guarda la API"""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Fecha inválida: {value!r}")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def optional_text(value) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+def task_from_row(row, project_ids: frozenset, created_at: datetime) -> dict:
+    """Documento de tarea a partir de una fila importada, con los valores por defecto de la API.
+
+    `row` es un diccionario (CSV) o una línea de NDJSON sin decodificar. Lanza
+    `ValueError` si falta la descripción, el proyecto no existe o un valor no es válido.
+    """
+    if isinstance(row, str):
+        try:
+            row = json_util.loads(row)
+        except ValueError as e:
+            raise ValueError(f"JSON inválido: {e}")
+    if not isinstance(row, dict):
+        raise ValueError("La fila no es un objeto")
+    descripcion = optional_text(row.get("descripcion"))
+    if descripcion is None:
+        raise ValueError("Falta la descripción")
+    project_id = optional_text(row.get("project_id"))
+    if project_id is None:
+        raise ValueError("Falta el project_id")
+    if project_id not in project_ids:
+        raise ValueError(f"Proyecto no encontrado: {project_id}")
+
+    estado = optional_text(row.get("estado")) or "pendiente"
+    completada = row.get("completada")
+    task = {
+        "descripcion": descripcion,
+        "prioridad": optional_text(row.get("prioridad")) or "media",
+        "estado": estado,
+        "completada": estado == "completada" if completada in (None, "") else parse_bool(completada),
+        "creada_en": parse_datetime(row.get("creada_en")) or created_at,
+        "usuario": optional_text(row.get("usuario")),
+        "project_id": project_id,
+        "fecha_limite": optional_text(row.get("fecha_limite")),
+    }
+    completada_en = parse_datetime(row.get("completada_en"))
+    if completada_en is not None and task["completada"]:
+        task["completada_en"] = completada_en
+    return new_document(stamp_completion(task))
+
+def detect_format(path: str) -> str:
+    if path.lower().endswith(".csv"):
+        return "csv"
+    if path.lower().endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    raise ValueError(f"No se reconoce el formato de {path}: indica csv o ndjson")
+
+def read_rows(path: str, file_format: Optional[str] = None) -> Iterator[tuple]:
+    """Filas del fichero con su número de línea, leídas de una en una.
+
+    Las líneas de NDJSON se devuelven sin decodificar: las decodifican los
+    escritores, en paralelo. Admiten JSON extendido de MongoDB (`{"$date": ...}`,
+    `{"$oid": ...}`), como el que produce `mongoexport`.
+    """
+    file_format = file_format or detect_format(path)
+    if file_format not in FORMATS:
+        raise ValueError(f"Formato desconocido: {file_format}")
+    with open(path, encoding="utf-8-sig", newline="") as source:
+        if file_format == "csv":
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(source, start=1):
+            if line.strip():
+                yield line_number, line
+
+def row_items(rows: Iterable[Tuple[int, dict]], batch_size: int) -> Iterator[tuple]:
+    for batch in batches(rows, batch_size):
+        yield (ROWS, batch)
+
+def generate_items(n_tasks: int, batch_size: int) -> Iterator[tuple]:
+    """Rangos de tareas generadas; cada uno tiene su propia semilla, así el resultado no depende de los escritores"""
+    for start in range(0, n_tasks, batch_size):
+        yield (GENERATE, start, min(start + batch_size, n_tasks))
+
+def build_tasks(item: tuple, context: dict) -> Tuple[list, list]:
+    """Tareas de un elemento de trabajo y los errores de las filas rechazadas"""
+    if item[0] == GENERATE:
+        _, start, end = item
+        tasks = list(task_documents(end, context["project_ids"], context["user_names"], context["seed"], start))
+        return tasks, []
+
+    tasks = []
+    errors = []
+    created_at = utc_now()
+    for line_number, row in item[1]:
+        try:
+            tasks.append(task_from_row(row, context["project_ids"], created_at))
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append({"line": line_number, "error": str(e)})
+    return tasks, errors
+
+class LoadResult:
+    def __init__(self):
+        self.inserted = 0
+        self.rejected = 0
+        self.errors = []
+        self.derived = DerivedCounts()
+
+    def add_errors(self, errors: list) -> None:
+        self.rejected += len(errors)
+        self.errors.extend(errors[:MAX_REPORTED_ERRORS - len(self.errors)])
+
+    def merge(self, other: "LoadResult") -> None:
+        self.inserted += other.inserted
+        self.rejected += other.rejected
+        self.errors.extend(other.errors[:MAX_REPORTED_ERRORS - len(self.errors)])
+        self.derived.merge(other.derived)
+
+    def load_batch(self, db, item: tuple, context: dict) -> int:
+        """Construye e inserta un elemento de trabajo; devuelve las filas procesadas"""
+        tasks, errors = build_tasks(item, context)
+        inserted, write_errors = insert_tasks(db, tasks)
+        self.inserted += len(inserted)
+        self.add_errors(errors + [{"line": None, "error": error} for error in write_errors])
+        self.derived.add(inserted)
+        return len(tasks) + len(errors)
+
+def connect_from_settings():
+    """Cliente y base de datos de la configuración (config.py), para los procesos escritores"""
+    client = create_sync_client(settings)
+    return client, client[settings.get_database_name()]
+
+def writer(connect: Callable, context: dict, items, results) -> None:
+    """Proceso escritor: inserta los lotes de `items` hasta recibir None y envía sus totales"""
+    try:
+        client, db = connect()
+        try:
+            result = LoadResult()
+            while (item := items.get()) is not None:
+                results.put((PROGRESS, result.load_batch(db, item, context)))
+        finally:
+            client.close()
+        results.put((DONE, result))
+    except Exception as e:
+        results.put((FAILED, str(e)))
+
+class ProgressMeter:
+    def __init__(self, on_progress: Optional[Callable]):
+        self.on_progress = on_progress
+        self.started = time.perf_counter()
+        self.reported = self.started
+        self.processed = 0
+
+    def add(self, rows: int) -> None:
+        self.processed += rows
+        now = time.perf_counter()
+        if self.on_progress and now - self.reported >= PROGRESS_INTERVAL_SECONDS:
+            self.reported = now
+            self.on_progress(self.processed, self.rows_per_second())
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed()
+        return self.processed / elapsed if elapsed else 0.0
+
+def load_tasks(db, items: Iterable[tuple], context: dict, workers: int = 1, connect: Optional[Callable] = None,
+               on_progress: Optional[Callable] = None) -> dict:
+    """Inserta las tareas de `items` en `db` o, con `workers > 1`, en procesos que abren su conexión con `connect`.
+
+    `on_progress(filas, filas_por_segundo)` se llama cada pocos segundos.
+    Devuelve los totales y los contadores derivados (`derived`), sin escribir estos últimos.
+    """
+    meter = ProgressMeter(on_progress)
+    if workers <= 1:
+        result = LoadResult()
+        for item in items:
+            meter.add(result.load_batch(db, item, context))
+    else:
+        if connect is None:
+            raise ValueError("Con varios escritores hace falta `connect` para abrir una conexión en cada proceso")
+        result = load_in_processes(items, context, workers, connect, meter)
+
+    return {
+        "inserted": result.inserted,
+        "rejected": result.rejected,
+        "errors": result.errors,
+        "seconds": round(meter.elapsed(), 2),
+        "rows_per_second": round(meter.rows_per_second(), 1),
+        "derived": result.derived
+    }
+
+def load_in_processes(items: Iterable[tuple], context: dict, workers: int, connect: Callable,
+                      meter: ProgressMeter) -> LoadResult:
+    # spawn: un hijo creado con fork heredaría el cliente de MongoDB del proceso principal
+    mp = multiprocessing.get_context("spawn")
+    pending = mp.Queue(maxsize=workers * 2)
+    results = mp.Queue()
+    processes = [mp.Process(target=writer, args=(connect, context, pending, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    result = LoadResult()
+    finished = 0
+
+    def receive(timeout: float) -> None:
+        nonlocal finished
+        try:
+            message = results.get(timeout=timeout)
+        except queue.Empty:
+            if finished < workers and not any(process.is_alive() for process in processes):
+                raise RuntimeError("Los procesos escritores terminaron sin enviar su resultado")
+            return
+        if message[0] == PROGRESS:
+            meter.add(message[1])
+        elif message[0] == DONE:
+            result.merge(message[1])
+            finished += 1
+        else:
+            raise RuntimeError(f"Error en un proceso escritor: {message[1]}")
+
+    def put(item) -> None:
+        while True:
+            try:
+                pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                receive(timeout=0.1)
+
+    try:
+        for item in items:
+            put(item)
+            while not results.empty():
+                receive(timeout=0)
+        for _ in processes:
+            put(None)
+        while finished < workers:
+            receive(timeout=1)
+    finally:
+        for process in processes:
+            if finished < workers:
+                process.terminate()
+            process.join()
+    return result
+
+def seed_database(db, n_projects: int, n_tasks: int, n_users: int, batch_size: int = DEFAULT_BATCH_SIZE,
+                  seed: int = 42, workers: int = 1, connect: Optional[Callable] = None,
+                  on_progress: Optional[Callable] = None) -> dict:
+    """Vacía la base de datos y la carga con el conjunto sintético de datasets.py; devuelve tamaños y tiempos"""
+    if n_projects < 1 and n_tasks > 0:
+        raise ValueError("Hacen falta proyectos para repartir las tareas")
+    for collection_name in COLLECTIONS:
+        db[collection_name].drop()
+
+    started = time.perf_counter()
+    user_names = []
+    for batch in batches(user_documents(n_users, seed), batch_size):
+        db.users.insert_many(batch, ordered=False)
+        user_names.extend(user["name"] for user in batch)
+    project_ids = []
+    for batch in batches(project_documents(n_projects, n_users, seed), batch_size):
+        batch = [{**project, **empty_counters()} for project in batch]
+        project_ids.extend(str(project_id) for project_id in db.projects.insert_many(batch).inserted_ids)
+
+    context = {"project_ids": project_ids, "user_names": user_names, "seed": seed}
+    loaded = load_tasks(db, generate_items(n_tasks, batch_size), context, workers, connect, on_progress)
+    load_seconds = time.perf_counter() - started
+
+    loaded.pop("derived").write(db, batch_size)
+    derived_seconds = time.perf_counter() - started - load_seconds
+    index_errors = ensure_indexes_sync(db)
+
+    return {
+        "projects": n_projects,
+        "tasks": loaded["inserted"],
+        "users": n_users,
+        "seed": seed,
+        "workers": workers,
+        "rows_per_second": loaded["rows_per_second"],
+        "load_seconds": round(load_seconds, 2),
+        "derived_seconds": round(derived_seconds, 2),
+        "index_seconds": round(time.perf_counter() - started - load_seconds - derived_seconds, 2),
+        "index_errors": index_errors
+    }
+
+def import_tasks(db, path: str, file_format: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = 1, connect: Optional[Callable] = None,
+                 on_progress: Optional[Callable] = None) -> dict:
+    """Añade las tareas del fichero a las existentes y actualiza contadores, agregados e índices"""
+    project_ids = frozenset(str(project["_id"]) for project in db.projects.find({}, {"_id": 1}))
+    rows = read_rows(path, file_format)
+    loaded = load_tasks(db, row_items(rows, batch_size), {"project_ids": project_ids}, workers, connect, on_progress)
+    loaded.pop("derived").write(db, batch_size)
+    loaded["index_errors"] = ensure_indexes_sync(db)
+    return loaded
@@ -0,0 +1,125 @@
+"""
+Caché en memoria de respuestas para los endpoints de lectura más consultados.
+
+Tamaño acotado con expulsión LRU, TTL por ruta e invalidación por etiquetas:
+cada entrada declara los ámbitos de datos de los que depende (por ejemplo
+"projects" o "tasks:<project_id>") y los handlers de escritura invalidan
+exactamente esos ámbitos.
+"""
+
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Hashable, Iterable
+
+MISSING = object()
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, ttls: dict = None, default_ttl: float = 10.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._keys_by_tag = defaultdict(set)
+        # Número de invalidaciones: permite descartar lecturas que empezaron antes de una escritura
+        self._generation = 0
+        self._invalidated_at = {}
+        self._cleared_at = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value, tags = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def ttl(self, route: str) -> float:
+        return self.ttls.get(route, self.default_ttl)
+
+    def token(self) -> int:
+        return self._generation
+
+    def set(self, route: str, key: Hashable, value, tags: Iterable[str], token: int = None) -> None:
+        tags = tuple(tags)
+        # Una escritura invalidó alguno de los ámbitos mientras se leía: el valor puede estar obsoleto
+        if token is not None and (
+            self._cleared_at > token or any(self._invalidated_at.get(tag, 0) > token for tag in tags)
+        ):
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl(route), value, tags)
+        for tag in tags:
+            self._keys_by_tag[tag].add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    async def get_or_load(self, route: str, key: Hashable, tags: Iterable[str], loader: Callable[[], Awaitable]):
+        if not self.enabled:
+            return await loader()
+
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        token = self.token()
+        value = await loader()
+        self.set(route, key, value, tags, token)
+        return value
+
+    def invalidate(self, *tags: str) -> None:
+        self._generation += 1
+        for tag in tags:
+            self._invalidated_at[tag] = self._generation
+            for key in list(self._keys_by_tag.pop(tag, ())):
+                if key in self._entries:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._cleared_at = self._generation
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
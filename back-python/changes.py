@@ -0,0 +1,223 @@
+"""
+Invalidación entre workers a partir de los change streams de MongoDB.
+
+Con varios workers de uvicorn, la caché de respuestas, los sellos de versión
+y las tareas cargadas para analítica de cada proceso solo se enteran de las
+escrituras que atiende ese mismo proceso. `ChangeListener` sigue en segundo
+plano los cambios de `projects`, `tasks` y `users` y los traduce a los mismos
+ámbitos que registran los handlers de escritura ("projects", "project:<id>",
+"tasks:<id>", "users"), de modo que todos los workers invalidan lo mismo.
+
+Si tras una desconexión no se puede retomar el stream desde el último resume
+token, se han podido perder cambios y se descarta todo el estado derivado.
+Los change streams requieren un replica set (basta uno de un solo nodo);
+contra un servidor standalone el listener queda en estado `unavailable`, lo
+reintenta periódicamente y mientras tanto solo los TTL de la caché acotan el
+desfase entre workers.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Iterable, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from versions import task_scopes
+
+WATCHED_COLLECTIONS = ("projects", "tasks", "users")
+
+STARTING = "starting"
+LISTENING = "listening"
+RECONNECTING = "reconnecting"
+UNAVAILABLE = "unavailable"
+STOPPED = "stopped"
+
+# Errores de servidor que indican que los change streams no se pueden usar aquí
+# 40573: el servidor no es un replica set; 115: comando no soportado
+UNSUPPORTED_CODES = {40573, 115}
+# El resume token ya no está en el oplog: hay que empezar de cero
+HISTORY_LOST_CODES = {286, 280}
+# Opción desconocida para el servidor (fullDocumentBeforeChange antes de MongoDB 6.0)
+UNKNOWN_FIELD_CODE = 40415
+
+logger = logging.getLogger(__name__)
+
+def change_scopes(change: dict) -> Optional[list]:
+    """Ámbitos afectados por un evento del change stream.
+
+    Devuelve `None` si no se pueden saber (por ejemplo, el borrado de una
+    tarea sin la imagen previa del documento, de la que sale su proyecto).
+    """
+    operation = change.get("operationType")
+    collection = change.get("ns", {}).get("coll")
+    if operation not in ("insert", "update", "replace", "delete"):
+        # drop, rename, dropDatabase o invalidate
+        return None
+
+    if collection == "users":
+        return ["users"]
+
+    document_id = str(change["documentKey"]["_id"])
+    if collection == "projects":
+        scopes = ["projects", f"project:{document_id}"]
+        if operation == "delete":
+            scopes.append(f"tasks:{document_id}")
+        return scopes
+
+    if collection == "tasks":
+        before = change.get("fullDocumentBeforeChange")
+        after = change.get("fullDocument")
+        if before is not None or operation == "insert":
+            return task_scopes(before, after)
+        updated = change.get("updateDescription", {}).get("updatedFields", {})
+        if operation == "update" and after is not None and "project_id" not in updated:
+            # La tarea sigue en el mismo proyecto: basta con la imagen actual
+            return task_scopes(after)
+        return None
+
+    return None
+
+class ChangeListener:
+    def __init__(
+        self,
+        db,
+        on_change: Callable[..., None],
+        on_reset: Callable[[], None],
+        on_event: Optional[Callable[[dict], None]] = None,
+        collections: Iterable[str] = WATCHED_COLLECTIONS,
+        retry_seconds: float = 30,
+        reconnect_seconds: float = 1,
+        max_await_ms: int = 1000
+    ):
+        self.db = db
+        self.on_change = on_change
+        self.on_reset = on_reset
+        self.on_event = on_event
+        self.collections = list(collections)
+        self.retry_seconds = retry_seconds
+        self.reconnect_seconds = reconnect_seconds
+        self.max_await_ms = max_await_ms
+        self.resume_token = None
+        self.pre_images = True
+        self.state = STOPPED
+        self.last_error = None
+        self.events = 0
+        self.resets = 0
+        self._task = None
+
+    def start(self) -> None:
+        self.state = STARTING
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.state = STOPPED
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "collections": self.collections,
+            "pre_images": self.pre_images,
+            "resumable": self.resume_token is not None,
+            "events": self.events,
+            "resets": self.resets,
+            "last_error": self.last_error,
+        }
+
+    def apply(self, change: dict) -> None:
+        self.events += 1
+        scopes = change_scopes(change)
+        if scopes is None:
+            self.reset()
+        else:
+            self.on_change(*scopes)
+        if self.on_event is not None:
+            self.on_event(change)
+
+    def reset(self) -> None:
+        self.resets += 1
+        self.on_reset()
+
+    def _pipeline(self) -> list:
+        return [{"$match": {"ns.coll": {"$in": self.collections}}}]
+
+    def _open(self):
+        options = {
+            "full_document": "updateLookup",
+            "max_await_time_ms": self.max_await_ms,
+        }
+        if self.pre_images:
+            options["full_document_before_change"] = "whenAvailable"
+        if self.resume_token is not None:
+            options["resume_after"] = self.resume_token
+        return self.db.watch(self._pipeline(), **options)
+
+    async def _enable_pre_images(self) -> None:
+        """Guardar la imagen previa de las tareas (MongoDB 6.0+) para saber de qué proyecto era una tarea borrada"""
+        try:
+            await self.db.command("collMod", "tasks", changeStreamPreAndPostImages={"enabled": True})
+        except PyMongoError as e:
+            logger.info("Sin imágenes previas en el change stream de tareas: %s", e)
+            self.pre_images = False
+
+    async def _run(self) -> None:
+        first = True
+        while True:
+            try:
+                if first:
+                    await self._enable_pre_images()
+                await self._listen(resync=not first)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.last_error = str(e)
+                if e.code in HISTORY_LOST_CODES:
+                    logger.warning("El resume token ya no está en el oplog; se descarta el estado derivado")
+                    self.resume_token = None
+                elif e.code == UNKNOWN_FIELD_CODE and self.pre_images:
+                    # Servidores anteriores a 6.0 no aceptan fullDocumentBeforeChange
+                    self.pre_images = False
+                elif e.code in UNSUPPORTED_CODES:
+                    self._unavailable(e)
+                else:
+                    logger.warning("Error en el change stream: %s", e)
+                    self.state = RECONNECTING
+            except PyMongoError as e:
+                self.last_error = str(e)
+                logger.warning("Change stream interrumpido: %s", e)
+                self.state = RECONNECTING
+            except Exception as e:
+                # Drivers o servidores de prueba sin soporte de change streams (p. ej. mongomock)
+                self.last_error = str(e)
+                self._unavailable(e)
+            first = False
+            await asyncio.sleep(self.retry_seconds if self.state == UNAVAILABLE else self.reconnect_seconds)
+
+    def _unavailable(self, error: Exception) -> None:
+        if self.state != UNAVAILABLE:
+            logger.warning("Change streams no disponibles (%s); la invalidación queda limitada a este worker", error)
+        self.state = UNAVAILABLE
+
+    async def _listen(self, resync: bool) -> None:
+        stream = self._open()
+        try:
+            change = await stream.try_next()
+            if resync and self.resume_token is None:
+                # Se reabre sin poder retomar: los cambios intermedios se han perdido
+                self.reset()
+            self.state = LISTENING
+            self.last_error = None
+            while True:
+                if change is not None:
+                    self.apply(change)
+                    if change["operationType"] == "invalidate":
+                        # El stream se cierra y su token no sirve para retomarlo
+                        self.resume_token = None
+                        return
+                self.resume_token = stream.resume_token
+                change = await stream.try_next()
+        finally:
+            await stream.close()
@@ -0,0 +1,298 @@
+"""
+Compresión de respuestas negociada con Accept-Encoding: zstd, br y gzip.
+
+`CompressionMiddleware` comprime las respuestas de tipos de texto (JSON,
+NDJSON, texto plano, HTML) a partir de `min_size` bytes. Una respuesta de un
+solo mensaje se comprime entera; una en streaming se comprime trozo a trozo
+con un flush tras cada uno, así que cada trozo sale en cuanto el handler lo
+produce y la memoria no crece con el tamaño de la respuesta. Los Server-Sent
+Events no se comprimen.
+
+Las respuestas de la caché (`ResponseCache`) guardan un `Payload`: el cuerpo
+JSON y sus versiones comprimidas, que se calculan la primera vez que un
+cliente pide cada codificación. Las respuestas calientes no se recomprimen en
+cada petición; llegan al middleware con `Content-Encoding` y este las deja
+pasar.
+
+brotli y zstd son opcionales (`pip install brotli zstandard`); sin ellos solo
+se ofrece gzip. El ETag de una respuesta comprimida pasa a débil (`W/`), como
+en nginx: cambian los bytes pero no el recurso, y If-None-Match usa la
+comparación débil.
+"""
+
+import time
+import zlib
+from collections import defaultdict
+from typing import Iterable, Mapping, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+
+from metrics import route_template
+from serialization import encoded_response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP, BROTLI, ZSTD = "gzip", "br", "zstd"
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson", "text/plain", "text/html", "text/csv"}
+DEFAULT_LEVELS = {GZIP: 6, BROTLI: 5, ZSTD: 3}
+
+class GzipStream:
+    def __init__(self, level: int):
+        # wbits 16 + MAX_WBITS: formato gzip (cabecera y CRC), no zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        data = self._compressor.process(chunk)
+        return data + (self._compressor.finish() if final else self._compressor.flush())
+
+class ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        data = self._compressor.compress(chunk)
+        mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return data + self._compressor.flush(mode)
+
+STREAMS = {GZIP: GzipStream, BROTLI: BrotliStream, ZSTD: ZstdStream}
+INSTALLED = {GZIP: True, BROTLI: brotli is not None, ZSTD: zstandard is not None}
+
+def parse_accept_encoding(header: Optional[str]) -> dict:
+    """Codificaciones aceptadas con su peso `q` (`gzip;q=0.5` -> {"gzip": 0.5})"""
+    accepted = {}
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def route_key(scope) -> str:
+    return f"{scope['method']} {route_template(scope)}"
+
+def weak_etag(etag: str) -> str:
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+class Payload:
+    """Cuerpo JSON ya codificado de una respuesta en caché y sus versiones comprimidas"""
+    __slots__ = ("body", "variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.variants = {}
+
+class Compressor:
+    """Negociación, compresión y estadísticas por ruta; lo comparten el middleware y las respuestas en caché"""
+
+    def __init__(self, encodings: Iterable[str] = (ZSTD, BROTLI, GZIP), min_size: int = 1024,
+                 levels: Mapping[str, int] = None, enabled: bool = True):
+        # Orden de preferencia del servidor, sin las codificaciones cuyo paquete no está instalado
+        self.encodings = tuple(encoding for encoding in encodings if INSTALLED.get(encoding))
+        self.min_size = min_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.enabled = enabled and bool(self.encodings)
+        self._routes = defaultdict(lambda: {
+            "responses": 0,
+            "compressed": 0,
+            "from_cache": 0,
+            "below_min_size": 0,
+            "not_accepted": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "cpu_seconds": 0.0,
+            "encodings": defaultdict(int)
+        })
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Codificación con mayor `q` del cliente; a igual peso decide el orden del servidor"""
+        accepted = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def stream(self, encoding: str):
+        return STREAMS[encoding](self.levels[encoding])
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        return self.stream(encoding).compress(body, final=True)
+
+    def compressible(self, method: str, status: int, headers: Headers) -> bool:
+        if not self.enabled or method == "HEAD" or status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return media_type in COMPRESSIBLE_TYPES
+
+    def record(self, route: str, encoding: Optional[str], bytes_in: int, bytes_out: int,
+               cpu_seconds: float = 0.0, from_cache: bool = False, skipped: str = None) -> None:
+        stats = self._routes[route]
+        stats["responses"] += 1
+        stats["bytes_in"] += bytes_in
+        stats["bytes_out"] += bytes_out
+        if skipped:
+            stats[skipped] += 1
+            return
+        stats["compressed"] += 1
+        stats["from_cache"] += from_cache
+        stats["cpu_seconds"] += cpu_seconds
+        stats["encodings"][encoding] += 1
+
+    def response(self, payload: Payload, request: Request, headers: Mapping[str, str] = None) -> Response:
+        """Respuesta de un `Payload` de la caché, con la versión comprimida guardada si ya existe"""
+        headers = dict(headers or {})
+        encoding = self.negotiate(request.headers.get("accept-encoding")) if self.enabled else None
+        if encoding is None or len(payload.body) < self.min_size:
+            # Sin comprimir: el middleware decide igual, añade Vary y lo anota en las estadísticas
+            return encoded_response(payload.body, headers)
+
+        body = payload.variants.get(encoding)
+        from_cache = body is not None
+        cpu_seconds = 0.0
+        if body is None:
+            started = time.thread_time()
+            body = payload.variants[encoding] = self.compress(encoding, payload.body)
+            cpu_seconds = time.thread_time() - started
+        self.record(route_key(request.scope), encoding, len(payload.body), len(body), cpu_seconds, from_cache)
+
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+        for name in ("etag", "ETag"):
+            if name in headers:
+                headers[name] = weak_etag(headers[name])
+        return encoded_response(body, headers)
+
+    def stats(self) -> dict:
+        routes = {}
+        for route, stats in sorted(self._routes.items()):
+            saved = stats["bytes_in"] - stats["bytes_out"]
+            compressed = stats["compressed"] - stats["from_cache"]
+            routes[route] = {
+                **stats,
+                "encodings": dict(stats["encodings"]),
+                "cpu_seconds": round(stats["cpu_seconds"], 6),
+                "bytes_saved": saved,
+                "saved_ratio": round(saved / stats["bytes_in"], 4) if stats["bytes_in"] else 0.0,
+                # CPU de compresión por respuesta comprimida de verdad (sin las servidas de la caché)
+                "cpu_ms_per_compression": round(stats["cpu_seconds"] * 1000 / compressed, 3) if compressed else 0.0
+            }
+        return {
+            "enabled": self.enabled,
+            "encodings": list(self.encodings),
+            "min_size": self.min_size,
+            "levels": {encoding: self.levels[encoding] for encoding in self.encodings},
+            "routes": routes
+        }
+
+class CompressionMiddleware:
+    """Middleware ASGI: retiene solo el mensaje de inicio hasta ver el primer trozo del cuerpo"""
+
+    def __init__(self, app, compressor: Compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.compressor.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        compressor = self.compressor
+        encoding = compressor.negotiate(Headers(scope=scope).get("accept-encoding"))
+        start = None
+        # Estado de la respuesta tras ver el primer trozo: `passthrough` o un stream de compresión
+        passthrough = False
+        stream = None
+        bytes_in = bytes_out = 0
+        cpu_seconds = 0.0
+
+        def compress(body: bytes, more_body: bool) -> bytes:
+            nonlocal bytes_in, bytes_out, cpu_seconds
+            started = time.thread_time()
+            # Un trozo vacío intermedio no se comprime: el flush solo añadiría un marcador
+            data = stream.compress(body, final=not more_body) if body or not more_body else b""
+            cpu_seconds += time.thread_time() - started
+            bytes_in += len(body)
+            bytes_out += len(data)
+            return data
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not compressor.compressible(scope["method"], start["status"], headers):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    length = int(headers["content-length"]) if "content-length" in headers else None
+                else:
+                    length = len(body)
+                small = length is not None and length < compressor.min_size
+                if small or encoding is None:
+                    passthrough = True
+                    compressor.record(route_key(scope), None, length or 0, length or 0,
+                                      skipped="below_min_size" if small else "not_accepted")
+                    await send(start)
+                    await send(message)
+                    return
+
+                stream = compressor.stream(encoding)
+                data = compress(body, more_body)
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = weak_etag(headers["etag"])
+                if more_body:
+                    # El tamaño final no se conoce: se envía por trozos
+                    del headers["content-length"]
+                else:
+                    headers["Content-Length"] = str(len(data))
+                await send(start)
+            else:
+                data = compress(body, more_body)
+
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            if not more_body:
+                compressor.record(route_key(scope), encoding, bytes_in, bytes_out, cpu_seconds)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,16 +1,100 @@
 import os
 from typing import Optional
 
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
 class Settings:
     # MongoDB Configuration
-    MONGODB_URI: str = "mongodb+srv://keirmauz:<db_password>@cluster0.yvdjajg.mongodb.net/?retryWrites=true&w=majority&appName=Cluster0"
-    DATABASE_NAME: str = "gestion_proyectos"
-    
+    # Las credenciales (p. ej. de MongoDB Atlas) solo se leen del entorno, nunca del código
+    MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+    DATABASE_NAME: str = os.getenv("DATABASE_NAME", "gestion_proyectos")
+    # "motor" (asíncrono) o "pymongo" (síncrono, bloquea el event loop; solo para comparar)
+    DB_DRIVER: str = os.getenv("DB_DRIVER", "motor")
+
+    # MongoDB Connection Pool
+    MONGO_MAX_POOL_SIZE: int = _env_int("MONGO_MAX_POOL_SIZE", 100)
+    MONGO_MIN_POOL_SIZE: int = _env_int("MONGO_MIN_POOL_SIZE", 0)
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = _env_int("MONGO_MAX_IDLE_TIME_MS", None)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", None)
+    MONGO_CONNECT_TIMEOUT_MS: int = _env_int("MONGO_CONNECT_TIMEOUT_MS", 20000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000)
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = _env_int("MONGO_SOCKET_TIMEOUT_MS", None)
+    # primary, primaryPreferred, secondary, secondaryPreferred o nearest
+    MONGO_READ_PREFERENCE: str = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    # Lista separada por comas, por ejemplo "zstd,snappy,zlib"
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "")
+    # Ejecutar explain() sobre las consultas calientes al arrancar y fallar si alguna hace COLLSCAN
+    CHECK_QUERY_PLANS: bool = os.getenv("CHECK_QUERY_PLANS", "").lower() in ("1", "true", "yes")
+
+    # Response Cache
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    CACHE_MAX_ENTRIES: int = _env_int("CACHE_MAX_ENTRIES", 1024)
+    CACHE_DEFAULT_TTL_SECONDS: int = _env_int("CACHE_DEFAULT_TTL_SECONDS", 10)
+    # TTL por ruta en segundos; las escrituras invalidan antes de que expiren
+    CACHE_TTLS: dict = {
+        "projects": 5,
+        "project": 10,
+        "project_tasks": 10,
+        "users": 30,
+        "users_simple": 30,
+        "project_stats": 10,
+        "report_summary": 10,
+        "report_daily": 10,
+    }
+
+    # Response Compression
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Cuerpos más pequeños se envían sin comprimir: la ganancia no compensa la cabecera ni el CPU
+    COMPRESSION_MIN_SIZE: int = _env_int("COMPRESSION_MIN_SIZE", 1024)
+    # Por orden de preferencia ante clientes que aceptan varias; br y zstd solo si brotli y zstandard están instalados
+    COMPRESSION_ENCODINGS: str = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    # Niveles pensados para respuestas dinámicas: la mayor parte del ahorro con poco CPU
+    COMPRESSION_LEVELS: dict = {
+        "gzip": _env_int("COMPRESSION_GZIP_LEVEL", 6),
+        "br": _env_int("COMPRESSION_BROTLI_QUALITY", 5),
+        "zstd": _env_int("COMPRESSION_ZSTD_LEVEL", 3),
+    }
+
+    # Bulk Endpoints
+    BULK_MAX_ITEMS: int = _env_int("BULK_MAX_ITEMS", 10000)
+
+    # Background Jobs
+    # Tareas borradas por lote en el borrado en cascada de un proyecto
+    DELETE_CHUNK_SIZE: int = _env_int("DELETE_CHUNK_SIZE", 1000)
+    # Segundos sin progreso tras los que otro worker puede retomar un trabajo
+    JOB_LEASE_SECONDS: int = _env_int("JOB_LEASE_SECONDS", 60)
+
+    # Change Streams
+    # Invalidar la caché de cada worker con las escrituras de los demás (requiere replica set)
+    CHANGE_STREAMS_ENABLED: bool = os.getenv("CHANGE_STREAMS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Segundos entre reintentos cuando el servidor no admite change streams
+    CHANGE_STREAM_RETRY_SECONDS: int = _env_int("CHANGE_STREAM_RETRY_SECONDS", 30)
+
+    # Server-Sent Events
+    # Eventos pendientes por cliente antes de pedirle que resincronice
+    EVENTS_QUEUE_SIZE: int = _env_int("EVENTS_QUEUE_SIZE", 100)
+    EVENTS_MAX_SUBSCRIBERS: int = _env_int("EVENTS_MAX_SUBSCRIBERS", 10000)
+    EVENTS_HEARTBEAT_SECONDS: int = _env_int("EVENTS_HEARTBEAT_SECONDS", 15)
+
+    # Analytics
+    # Segundos que se reutilizan las tareas cargadas en memoria para los reportes ad hoc
+    ANALYTICS_MAX_AGE_SECONDS: int = _env_int("ANALYTICS_MAX_AGE_SECONDS", 60)
+
+    # Metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Una petición es sospechosa de N+1 con al menos estos comandos y pocos documentos por comando
+    METRICS_N_PLUS_ONE_MIN_COMMANDS: int = _env_int("METRICS_N_PLUS_ONE_MIN_COMMANDS", 10)
+    METRICS_N_PLUS_ONE_DOCS_PER_COMMAND: int = _env_int("METRICS_N_PLUS_ONE_DOCS_PER_COMMAND", 5)
+
     # API Configuration
     API_V1_STR: str = "/api"
     PROJECT_NAME: str = "Gestión de Proyectos API"
     VERSION: str = "1.0.0"
-    
+
     # CORS Configuration
     BACKEND_CORS_ORIGINS: list = [
         "http://localhost:5173",  # Vite dev server
@@ -18,22 +102,50 @@ class Settings:
         "http://localhost:3000",  # React dev server
         "http://127.0.0.1:3000",
     ]
-    
+
     # Server Configuration
-    HOST: str = "0.0.0.0"
-    PORT: int = 8000
-    
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = _env_int("PORT", 8000)
+    # Modo producción (server.py): número de workers, 0 = uno por núcleo
+    WORKERS: int = _env_int("WORKERS", 0)
+    # Event loop y parser HTTP de uvicorn: "auto" usa uvloop y httptools si están instalados
+    SERVER_LOOP: str = os.getenv("SERVER_LOOP", "auto")
+    SERVER_HTTP: str = os.getenv("SERVER_HTTP", "auto")
+    SERVER_BACKLOG: int = _env_int("SERVER_BACKLOG", 2048)
+    SERVER_KEEP_ALIVE_SECONDS: int = _env_int("SERVER_KEEP_ALIVE_SECONDS", 5)
+    SERVER_ACCESS_LOG: bool = os.getenv("SERVER_ACCESS_LOG", "true").lower() in ("1", "true", "yes")
+    # Segundos que un worker espera a las peticiones en curso al apagarse (SIGTERM)
+    GRACEFUL_SHUTDOWN_SECONDS: int = _env_int("GRACEFUL_SHUTDOWN_SECONDS", 30)
+    # Segundos que el arranque espera a MongoDB; después el worker atiende y sigue reintentando
+    STARTUP_WARMUP_SECONDS: int = _env_int("STARTUP_WARMUP_SECONDS", 5)
+    WARMUP_RETRY_SECONDS: int = _env_int("WARMUP_RETRY_SECONDS", 10)
+
     @classmethod
     def get_mongodb_uri(cls) -> str:
-        """Obtener la URI de MongoDB con la contraseña configurada"""
-        # Aquí puedes implementar lógica para obtener la contraseña de variables de entorno
-        # Por ahora, se mantiene como está en el código
+        """Obtener la URI de MongoDB (variable de entorno MONGODB_URI o valor por defecto)"""
         return cls.MONGODB_URI
-    
+
     @classmethod
     def get_database_name(cls) -> str:
         """Obtener el nombre de la base de datos"""
         return cls.DATABASE_NAME
 
+    @classmethod
+    def get_mongo_client_options(cls) -> dict:
+        """Opciones del pool de conexiones para MongoClient / AsyncIOMotorClient"""
+        options = {
+            "maxPoolSize": cls.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": cls.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": cls.MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": cls.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "connectTimeoutMS": cls.MONGO_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": cls.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "socketTimeoutMS": cls.MONGO_SOCKET_TIMEOUT_MS,
+            "readPreference": cls.MONGO_READ_PREFERENCE,
+        }
+        if cls.MONGO_COMPRESSORS:
+            options["compressors"] = cls.MONGO_COMPRESSORS
+        return {key: value for key, value in options.items() if value is not None}
+
 # Instancia global de configuración
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
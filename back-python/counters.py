@@ -0,0 +1,142 @@
+"""
+Contadores de tareas materializados en cada documento de proyecto.
+
+Los handlers de escritura de tareas mantienen `total`, `completadas` y
+`pendientes` con `$inc` atómicos, de modo que las lecturas de proyectos no
+necesitan tocar la colección de tareas. `rebuild_project_counters` recalcula
+los contadores desde cero para reparar datos existentes.
+
+`apply_task_changes` se usa desde la API y recibe la base de datos asíncrona;
+las funciones de recuento y reparación son síncronas y se ejecutan desde
+`init_db.py` con un cliente de PyMongo.
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+COUNTER_FIELDS = ("total", "completadas", "pendientes")
+
+def empty_counters() -> dict:
+    return {field: 0 for field in COUNTER_FIELDS}
+
+def task_counts_pipeline(match: Optional[dict] = None) -> list:
+    """Pipeline que agrupa las tareas por proyecto con sus contadores.
+
+    El conteo se resuelve en el servidor con un único `$group`, de modo que
+    ningún documento de tarea viaja a Python solo para ser contado.
+    """
+    pipeline = []
+    if match:
+        pipeline.append({"$match": match})
+    pipeline.append({"$group": {
+        "_id": "$project_id",
+        "total": {"$sum": 1},
+        "completadas": {"$sum": {"$cond": [{"$eq": ["$completada", True]}, 1, 0]}}
+    }})
+    return pipeline
+
+def row_counters(row: dict) -> dict:
+    """Contadores de un proyecto a partir de una fila de `task_counts_pipeline`"""
+    return {
+        "total": row["total"],
+        "completadas": row["completadas"],
+        "pendientes": row["total"] - row["completadas"]
+    }
+
+def tasks_counter_delta(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> dict:
+    """Suma en un único delta por proyecto los cambios `(before, after)` de un lote de tareas.
+
+    `before` y `after` son el documento de la tarea antes y después de la
+    escritura (`None` para una creación o un borrado).
+    """
+    delta = defaultdict(empty_counters)
+
+    for before, after in changes:
+        for task, sign in ((before, -1), (after, 1)):
+            if not task or not task.get("project_id"):
+                continue
+            counters = delta[task["project_id"]]
+            counters["total"] += sign
+            if task.get("completada", False):
+                counters["completadas"] += sign
+            else:
+                counters["pendientes"] += sign
+
+    return {
+        project_id: {field: value for field, value in counters.items() if value}
+        for project_id, counters in delta.items()
+        if any(counters.values())
+    }
+
+def counter_updates(delta: dict) -> list:
+    """Convierte un delta de contadores en operaciones `$inc` sobre proyectos."""
+    updates = []
+    for project_id, inc in delta.items():
+        if not ObjectId.is_valid(project_id):
+            continue
+        updates.append(UpdateOne({"_id": ObjectId(project_id)}, {"$inc": inc}))
+    return updates
+
+async def apply_task_changes(db, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> None:
+    """Aplica el delta de un lote de tareas con un `$inc` por proyecto afectado."""
+    updates = counter_updates(tasks_counter_delta(changes))
+    if updates:
+        await db.projects.bulk_write(updates, ordered=False)
+
+async def resync_project_counters(db, project_ids: Iterable[str]) -> None:
+    """Recalcula desde las tareas los contadores de los proyectos indicados.
+
+    Se usa cuando una escritura en lote no puede saber con certeza qué
+    documentos modificó (por ejemplo, si otra petición los cambió a la vez).
+    """
+    counts = {project_id: empty_counters() for project_id in project_ids if ObjectId.is_valid(project_id)}
+    if not counts:
+        return
+
+    async for row in db.tasks.aggregate(task_counts_pipeline({"project_id": {"$in": list(counts)}})):
+        counts[row["_id"]] = row_counters(row)
+
+    await db.projects.bulk_write([
+        UpdateOne({"_id": ObjectId(project_id)}, {"$set": project_counts})
+        for project_id, project_counts in counts.items()
+    ], ordered=False)
+
+def recount_projects(db) -> dict:
+    """Recuento completo de los contadores de cada proyecto a partir de las tareas."""
+    counts = {row["_id"]: row_counters(row) for row in db.tasks.aggregate(task_counts_pipeline())}
+    return {
+        project["_id"]: counts.get(str(project["_id"]), empty_counters())
+        for project in db.projects.find({}, {"_id": 1})
+    }
+
+def verify_project_counters(db) -> list:
+    """Devuelve los proyectos cuyos contadores no coinciden con un recuento completo."""
+    recount = recount_projects(db)
+    mismatches = []
+    for project in db.projects.find({}, {field: 1 for field in COUNTER_FIELDS}):
+        stored = {field: project.get(field, 0) for field in COUNTER_FIELDS}
+        expected = recount.get(project["_id"], empty_counters())
+        if stored != expected:
+            mismatches.append({
+                "project_id": str(project["_id"]),
+                "stored": stored,
+                "expected": expected
+            })
+    return mismatches
+
+def rebuild_project_counters(db) -> int:
+    """Recalcula y guarda los contadores de todos los proyectos.
+
+    Devuelve el número de proyectos actualizados.
+    """
+    updates = [
+        UpdateOne({"_id": project_id}, {"$set": counters})
+        for project_id, counters in recount_projects(db).items()
+    ]
+    if not updates:
+        return 0
+    result = db.projects.bulk_write(updates, ordered=False)
+    return result.matched_count
@@ -0,0 +1,235 @@
+"""
+Acceso a MongoDB con driver asíncrono o síncrono.
+
+Por defecto se usa Motor, cuyas operaciones se esperan con `await` sin bloquear
+el event loop. El driver síncrono (`DB_DRIVER=pymongo`) se conserva para poder
+comparar: se envuelve con la misma interfaz awaitable, pero cada operación se
+ejecuta directamente en el event loop y lo bloquea, igual que antes.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Iterable, Tuple
+
+from pymongo import MongoClient, monitoring
+
+DRIVERS = ("motor", "pymongo")
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Contadores del pool de conexiones por servidor, para dimensionar el pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = defaultdict(lambda: defaultdict(int))
+
+    def _count(self, event, **changes):
+        address = "%s:%s" % event.address
+        with self._lock:
+            for field, change in changes.items():
+                self._servers[address][field] += change
+
+    def pool_created(self, event):
+        self._count(event, pools_created=1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count(event, pools_cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._count(event, connections_created=1, open_connections=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count(event, connections_closed=1, open_connections=-1)
+
+    def connection_check_out_started(self, event):
+        self._count(event, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._count(event, waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._count(event, waiting=-1, checkouts=1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._count(event, in_use=-1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {address: dict(counters) for address, counters in self._servers.items()}
+
+class SyncCursor:
+    """Cursor de PyMongo con la interfaz asíncrona de los cursores de Motor."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, *args, **kwargs):
+        self._cursor.limit(*args, **kwargs)
+        return self
+
+    def batch_size(self, *args, **kwargs):
+        self._cursor.batch_size(*args, **kwargs)
+        return self
+
+    async def to_list(self, length=None):
+        documents = []
+        for document in self._cursor:
+            documents.append(document)
+            if length is not None and len(documents) >= length:
+                break
+        return documents
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+class SyncChangeStream:
+    """Change stream de PyMongo con la interfaz de Motor.
+
+    La espera de cada evento (hasta `max_await_time_ms`) se hace en un hilo:
+    en el event loop lo bloquearía mientras no haya cambios.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    @property
+    def resume_token(self):
+        return self._stream.resume_token
+
+    async def try_next(self):
+        return await asyncio.to_thread(self._stream.try_next)
+
+    async def close(self):
+        self._stream.close()
+
+class SyncCollection:
+    """Colección de PyMongo cuyas operaciones se pueden esperar con `await`."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return SyncCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, *args, **kwargs):
+        return SyncCursor(self._collection.aggregate(*args, **kwargs))
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args, **kwargs):
+            return attribute(*args, **kwargs)
+
+        return call
+
+class SyncDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return SyncCollection(self._database[name])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return SyncCollection(self._database[name])
+
+    async def command(self, *args, **kwargs):
+        return self._database.command(*args, **kwargs)
+
+    def watch(self, *args, **kwargs):
+        return SyncChangeStream(self._database.watch(*args, **kwargs))
+
+def create_client(
+    uri: str,
+    database_name: str,
+    driver: str = "motor",
+    **options
+) -> Tuple[object, object]:
+    """Crea el cliente y la base de datos para el driver indicado.
+
+    No realiza ninguna operación de red: la conexión se establece en la primera
+    petición o en el arranque de la aplicación.
+    """
+    if driver not in DRIVERS:
+        raise ValueError(f"Driver de base de datos desconocido: {driver}")
+
+    if driver == "motor":
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(uri, **options)
+        return client, client[database_name]
+
+    client = MongoClient(uri, **options)
+    return client, SyncDatabase(client[database_name])
+
+def create_sync_client(settings) -> MongoClient:
+    """Cliente de PyMongo con la configuración del pool, para scripts como init_db.py"""
+    return MongoClient(settings.get_mongodb_uri(), **settings.get_mongo_client_options())
+
+class DatabaseManager:
+    """Dueño del único cliente de MongoDB de la aplicación.
+
+    El cliente se crea en el arranque (lifespan de FastAPI) sin esperar a la
+    red y se cierra al apagar. `ready` indica que MongoDB ya respondió al
+    calentamiento del worker (ping e índices).
+    """
+
+    def __init__(self, settings, event_listeners: Iterable = ()):
+        self.settings = settings
+        self.pool_stats = PoolStats()
+        self.event_listeners = list(event_listeners)
+        self.client = None
+        self.db = None
+        self.ready = False
+
+    @property
+    def connected(self) -> bool:
+        return self.db is not None
+
+    def connect(self) -> None:
+        self.client, self.db = create_client(
+            self.settings.get_mongodb_uri(),
+            self.settings.get_database_name(),
+            self.settings.DB_DRIVER,
+            event_listeners=[self.pool_stats, *self.event_listeners],
+            **self.settings.get_mongo_client_options()
+        )
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.db = None
+        self.ready = False
+
+    async def ping(self) -> None:
+        await self.db.command("ping")
+
+    def pool_info(self) -> dict:
+        return {
+            "driver": self.settings.DB_DRIVER,
+            "options": self.settings.get_mongo_client_options(),
+            "servers": self.pool_stats.snapshot()
+        }
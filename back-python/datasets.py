@@ -0,0 +1,89 @@
+"""
+Datos sintéticos con la forma de los documentos de init_db.py.
+
+Usuarios, proyectos y tareas se generan de forma perezosa y reproducible (la
+misma semilla da los mismos datos) para poder cargar volúmenes grandes sin
+tenerlos en memoria. Las tareas de cada tramo `start..n_tasks` tienen su propia
+semilla, así que varios procesos pueden generar tramos distintos y el
+resultado es el mismo que en uno solo. `bulk_load.seed_database` los carga.
+"""
+
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+NAMES = ["Ana", "Carlos", "Juan", "Lucía", "Marta", "Pedro", "Sofía", "Diego", "Elena", "Jorge"]
+SURNAMES = ["Martínez", "Ruiz", "Pérez", "Gómez", "Sanz", "López", "Díaz", "Moreno", "Álvarez", "Romero"]
+ROLES = ["developer", "developer", "developer", "designer", "manager"]
+
+PROJECT_AREAS = ["Sistema de Gestión", "Portal de Clientes", "Migración de Datos", "Aplicación Móvil",
+                 "Intranet", "Facturación", "Inventario", "Análisis de Ventas"]
+PROJECT_STATUSES = ["Activo", "Activo", "Activo", "Completado"]
+
+VERBS = ["Diseño", "Desarrollo", "Implementación", "Pruebas", "Configuración", "Documentación",
+         "Análisis", "Migración", "Validación", "Optimización", "Revisión", "Despliegue"]
+OBJECTS = ["de la base de datos", "de la API", "del frontend", "de integración", "del servidor",
+           "de la interfaz", "de autenticación", "de los informes", "de consultas", "de datos migrados"]
+
+PRIORIDADES = ["alta", "media", "baja"]
+ESTADOS = ["pendiente", "en progreso", "completada"]
+
+START = datetime(2023, 1, 1)
+
+def batches(documents: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(documents)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def user_name(index: int) -> str:
+    return f"{NAMES[index % len(NAMES)]} {SURNAMES[index // len(NAMES) % len(SURNAMES)]} {index}"
+
+def user_documents(n_users: int, seed: int = 42) -> Iterator[dict]:
+    rng = random.Random(seed)
+    for index in range(n_users):
+        yield {
+            "name": user_name(index),
+            "email": f"usuario{index}@empresa.com",
+            "role": rng.choice(ROLES),
+            "created_at": START + timedelta(hours=index)
+        }
+
+def project_documents(n_projects: int, n_users: int, seed: int = 42) -> Iterator[dict]:
+    rng = random.Random(seed + 1)
+    for index in range(n_projects):
+        area = PROJECT_AREAS[index % len(PROJECT_AREAS)]
+        yield {
+            "name": f"{area} {index}",
+            "description": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} del proyecto {area.lower()}",
+            "created_at": START + timedelta(days=index % 365),
+            "status": rng.choice(PROJECT_STATUSES),
+            "users": rng.randint(1, max(1, min(n_users, 10)))
+        }
+
+def task_document(index: int, rng: random.Random, project_id: str, usuario) -> dict:
+    estado = rng.choice(ESTADOS)
+    creada_en = START + timedelta(minutes=index)
+    task = {
+        "descripcion": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}",
+        "prioridad": rng.choice(PRIORIDADES),
+        "estado": estado,
+        "completada": estado == "completada",
+        "creada_en": creada_en,
+        "usuario": usuario,
+        "project_id": project_id,
+        "fecha_limite": None
+    }
+    if task["completada"]:
+        task["completada_en"] = creada_en + timedelta(days=rng.randint(1, 10))
+    elif rng.random() < 0.5:
+        task["fecha_limite"] = (creada_en + timedelta(days=rng.randint(1, 30))).strftime("%Y-%m-%d")
+    return task
+
+def task_documents(n_tasks: int, project_ids: List[str], user_names: List[str], seed: int = 42,
+                   start: int = 0) -> Iterator[dict]:
+    """Tareas `start` a `n_tasks - 1`, repartidas entre los proyectos; un cuarto sin asignar"""
+    rng = random.Random(seed + 2 + start)
+    for index in range(start, n_tasks):
+        usuario = rng.choice(user_names) if user_names and rng.random() >= 0.25 else None
+        yield task_document(index, rng, project_ids[index % len(project_ids)], usuario)
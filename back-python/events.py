@@ -0,0 +1,238 @@
+"""
+Canal de eventos (Server-Sent Events) para que el frontend reciba los cambios
+en lugar de volver a pedir los listados completos.
+
+Cada suscriptor tiene una cola acotada. Publicar nunca espera: el mensaje se
+codifica una sola vez y se encola en los suscriptores del proyecto. Si la
+cola de un cliente lento se llena, se vacía y se sustituye por un único
+evento `resync`, con el que el cliente vuelve a pedir el listado. Los clientes
+inactivos solo cuestan una cola vacía; cada `heartbeat_seconds` un único
+temporizador les envía un comentario SSE que mantiene viva la conexión a
+través de proxies.
+
+Al apagar el worker, `close` termina todos los streams: así el servidor solo
+espera a las peticiones en curso y los navegadores se reconectan (pasados
+`retry` ms) a otro worker.
+"""
+
+import asyncio
+import itertools
+from collections import defaultdict
+from typing import AsyncIterator, Optional
+
+from counters import COUNTER_FIELDS
+from metrics import create_background_task
+from serialization import encode_json
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+TASKS_CHANGED = "tasks.changed"
+PROJECT_COUNTERS = "project.counters"
+PROJECT_DELETED = "project.deleted"
+RESYNC = "resync"
+
+HEARTBEAT = b": ping\n\n"
+# Marca en la cola de un suscriptor que termina su stream
+CLOSE = None
+
+# Clave de los suscriptores a todos los proyectos
+ALL_PROJECTS = None
+
+class TooManySubscribers(Exception):
+    pass
+
+class BrokerClosed(Exception):
+    pass
+
+def encode_event(event_id: int, event_type: str, data: dict) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event_type.encode(), encode_json(data))
+
+def task_event_data(task: dict) -> dict:
+    task_id = str(task["_id"])
+    return {**task, "_id": task_id}
+
+def deleted_task_event_data(task: dict) -> dict:
+    task_id = str(task["_id"])
+    return {"_id": task_id, "project_id": task.get("project_id")}
+
+def counters_event_data(project: dict) -> dict:
+    return {"project_id": str(project["_id"]), **{field: project.get(field, 0) for field in COUNTER_FIELDS}}
+
+def change_events(change: dict) -> list:
+    """Eventos `(tipo, datos, proyecto)` que corresponden a un evento del change stream.
+
+    Los cambios cuyo proyecto no se conoce (el borrado de una tarea sin imagen
+    previa) no producen eventos: el listener los trata como un reinicio y los
+    suscriptores reciben `resync`.
+    """
+    operation = change.get("operationType")
+    collection = change.get("ns", {}).get("coll")
+    before = change.get("fullDocumentBeforeChange")
+    after = change.get("fullDocument")
+    updated = change.get("updateDescription", {}).get("updatedFields", {})
+    events = []
+
+    if collection == "tasks":
+        if before is not None and (operation == "delete" or (
+            after is not None and before.get("project_id") != after.get("project_id")
+        )):
+            events.append((TASK_DELETED, deleted_task_event_data(before), before.get("project_id")))
+        if after is not None and operation in ("insert", "update", "replace"):
+            event_type = TASK_CREATED if operation == "insert" else TASK_UPDATED
+            events.append((event_type, task_event_data(after), after.get("project_id")))
+
+    elif collection == "projects":
+        project_id = str(change["documentKey"]["_id"])
+        if operation == "delete" or "deleting" in updated:
+            events.append((PROJECT_DELETED, {"project_id": project_id}, project_id))
+        elif after is not None and (operation == "replace" or set(updated) & set(COUNTER_FIELDS)):
+            events.append((PROJECT_COUNTERS, counters_event_data(after), project_id))
+
+    return events
+
+class Subscriber:
+    __slots__ = ("project_id", "queue", "overflows")
+
+    def __init__(self, project_id: Optional[str], queue_size: int):
+        self.project_id = project_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflows = 0
+
+    def offer(self, message: bytes) -> bool:
+        """Encola sin esperar; devuelve False si la cola del cliente está llena"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def resync(self, message: bytes) -> None:
+        """Descarta lo pendiente y deja solo la orden de resincronizar"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+        self.overflows += 1
+
+    def close(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(CLOSE)
+
+class EventBroker:
+    def __init__(self, queue_size: int = 100, max_subscribers: int = 10000, heartbeat_seconds: float = 15,
+                 resync_delay_seconds: float = 0.5):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat_seconds = heartbeat_seconds
+        self.resync_delay_seconds = resync_delay_seconds
+        self._resync_pending = False
+        self._heartbeat = None
+        self._subscribers = defaultdict(set)
+        self._count = 0
+        self._closed = False
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, project_id: Optional[str] = ALL_PROJECTS) -> Subscriber:
+        if self._closed:
+            raise BrokerClosed()
+        if self._count >= self.max_subscribers:
+            raise TooManySubscribers()
+        subscriber = Subscriber(project_id, self.queue_size)
+        self._subscribers[project_id].add(subscriber)
+        self._count += 1
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = create_background_task(self._send_heartbeats())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.project_id)
+        if subscribers is not None and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[subscriber.project_id]
+
+    def has_subscribers(self, project_id: Optional[str]) -> bool:
+        return bool(self._subscribers.get(project_id) or self._subscribers.get(ALL_PROJECTS))
+
+    def publish(self, event_type: str, data: dict, project_id: Optional[str]) -> int:
+        """Envía un evento a los suscriptores del proyecto y a los de todos los proyectos"""
+        if self._closed or not self.has_subscribers(project_id):
+            return 0
+        event_id = next(self._ids)
+        message = encode_event(event_id, event_type, data)
+        resync = None
+        self.published += 1
+        delivered = 0
+        for key in {project_id, ALL_PROJECTS}:
+            for subscriber in self._subscribers.get(key, ()):
+                if subscriber.offer(message):
+                    delivered += 1
+                else:
+                    resync = resync or encode_event(event_id, RESYNC, {"project_id": project_id})
+                    subscriber.resync(resync)
+                    self.overflows += 1
+        self.delivered += delivered
+        return delivered
+
+    def request_resync(self) -> None:
+        """Pide a todos los suscriptores que vuelvan a leer los listados.
+
+        Las peticiones se agrupan durante `resync_delay_seconds`: una ráfaga de
+        cambios desconocidos (un borrado masivo) produce un solo evento.
+        """
+        if self._resync_pending or not self._count:
+            return
+        self._resync_pending = True
+        asyncio.get_running_loop().call_later(self.resync_delay_seconds, self._broadcast_resync)
+
+    def _broadcast_resync(self) -> None:
+        self._resync_pending = False
+        if self._closed:
+            return
+        message = encode_event(next(self._ids), RESYNC, {"project_id": None})
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                if not subscriber.offer(message):
+                    subscriber.resync(message)
+
+    def close(self) -> None:
+        """Termina los streams abiertos y rechaza las suscripciones nuevas (apagado del worker)"""
+        self._closed = True
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                subscriber.close()
+
+    async def _send_heartbeats(self) -> None:
+        """Un solo temporizador para todos los suscriptores: cada uno en espera solo cuesta su cola"""
+        while self._count:
+            await asyncio.sleep(self.heartbeat_seconds)
+            for subscribers in list(self._subscribers.values()):
+                for subscriber in subscribers:
+                    if subscriber.queue.empty():
+                        subscriber.offer(HEARTBEAT)
+
+    async def stream(self, subscriber: Subscriber) -> AsyncIterator[bytes]:
+        """Mensajes SSE de un suscriptor hasta que el cliente se desconecta o se cierra el canal"""
+        try:
+            # El primer mensaje fija el intervalo de reconexión del EventSource del navegador
+            yield b"retry: 3000\n\n"
+            while (message := await subscriber.queue.get()) is not CLOSE:
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self._count,
+            "projects": len([key for key in self._subscribers if key is not ALL_PROJECTS]),
+            "max_subscribers": self.max_subscribers,
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
@@ -0,0 +1,114 @@
+"""
+Índices declarados de la base de datos y verificación de planes de consulta.
+
+`ensure_indexes` crea los índices de forma idempotente al arrancar la API y
+desde init_db.py. `check_query_plans` ejecuta `explain` sobre las consultas
+calientes y devuelve las que recorren la colección completa (COLLSCAN).
+"""
+
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.collation import Collation
+from pymongo.errors import PyMongoError
+
+# Autocompletado sin distinguir mayúsculas ni acentos; las consultas deben usar la misma collation
+SEARCH_COLLATION = Collation(locale="es", strength=1)
+SEARCH_LANGUAGE = "spanish"
+
+INDEXES = {
+    "tasks": [
+        # Prefijo `project_id` para los listados, el borrado en cascada y los conteos;
+        # `creada_en, _id` da el orden estable de la paginación por proyecto
+        IndexModel([("project_id", ASCENDING), ("creada_en", ASCENDING), ("_id", ASCENDING)],
+                   name="project_id_creada_en"),
+        IndexModel([("project_id", ASCENDING), ("completada", ASCENDING)],
+                   name="project_id_completada"),
+        # Orden del timeline paginado sin filtro de proyecto
+        IndexModel([("creada_en", ASCENDING), ("_id", ASCENDING)], name="creada_en"),
+        # Búsqueda (search.py): texto completo y autocompletado por prefijo
+        IndexModel([("descripcion", TEXT)], name="descripcion_text", default_language=SEARCH_LANGUAGE),
+        IndexModel([("descripcion", ASCENDING)], name="descripcion_prefix", collation=SEARCH_COLLATION),
+    ],
+    "projects": [
+        IndexModel([("name", TEXT), ("description", TEXT)], name="name_description_text",
+                   weights={"name": 10, "description": 1}, default_language=SEARCH_LANGUAGE),
+        IndexModel([("name", ASCENDING)], name="name_prefix", collation=SEARCH_COLLATION),
+    ],
+    "task_rollups": [
+        # Un documento por proyecto, dimensión y valor; los reportes leen por proyecto y dimensión
+        IndexModel([("project_id", ASCENDING), ("dimension", ASCENDING), ("key", ASCENDING)],
+                   name="project_dimension_key", unique=True),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("name", TEXT), ("email", TEXT)], name="name_email_text",
+                   weights={"name": 10, "email": 5}, default_language=SEARCH_LANGUAGE),
+        IndexModel([("name", ASCENDING)], name="name_prefix", collation=SEARCH_COLLATION),
+        IndexModel([("email", ASCENDING)], name="email_prefix", collation=SEARCH_COLLATION),
+    ],
+}
+
+# Consultas calientes de la API: nombre, colección, filtro y orden
+_SAMPLE_PROJECT_ID = "000000000000000000000000"
+HOT_QUERIES = [
+    ("tareas_por_proyecto", "tasks", {"project_id": _SAMPLE_PROJECT_ID}, None),
+    ("tareas_por_proyecto_paginadas", "tasks", {"project_id": _SAMPLE_PROJECT_ID},
+     {"creada_en": ASCENDING, "_id": ASCENDING}),
+    ("tareas_completadas_por_proyecto", "tasks", {"project_id": _SAMPLE_PROJECT_ID, "completada": True}, None),
+    ("timeline_paginado", "tasks", {}, {"creada_en": ASCENDING, "_id": ASCENDING}),
+    ("usuario_por_email", "users", {"email": "usuario@empresa.com"}, None),
+    ("agregados_por_proyecto", "task_rollups", {"project_id": _SAMPLE_PROJECT_ID, "dimension": "estado"}, None),
+]
+
+async def ensure_indexes(db) -> list:
+    """Crea los índices declarados y devuelve los errores por colección (si los hay)."""
+    errors = []
+    for collection_name, indexes in INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except PyMongoError as e:
+            errors.append(f"{collection_name}: {e}")
+    return errors
+
+def ensure_indexes_sync(db) -> list:
+    errors = []
+    for collection_name, indexes in INDEXES.items():
+        try:
+            db[collection_name].create_indexes(indexes)
+        except PyMongoError as e:
+            errors.append(f"{collection_name}: {e}")
+    return errors
+
+def explain_command(collection_name: str, query: dict, sort) -> dict:
+    command = {"find": collection_name, "filter": query}
+    if sort:
+        command["sort"] = sort
+    return {"explain": command, "verbosity": "queryPlanner"}
+
+def plan_stages(plan: dict):
+    """Recorre un plan de ejecución y devuelve todas sus etapas."""
+    # Con el motor SBE el plan ganador envuelve el árbol en `queryPlan`
+    stages = [plan["stage"]] if "stage" in plan else []
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages.extend(plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
+
+def collscan_report(name: str, explain: dict) -> dict:
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    return {"query": name, "stages": stages, "collscan": "COLLSCAN" in stages}
+
+async def check_query_plans(db) -> list:
+    reports = []
+    for name, collection_name, query, sort in HOT_QUERIES:
+        explain = await db.command(explain_command(collection_name, query, sort))
+        reports.append(collscan_report(name, explain))
+    return reports
+
+def check_query_plans_sync(db) -> list:
+    reports = []
+    for name, collection_name, query, sort in HOT_QUERIES:
+        explain = db.command(explain_command(collection_name, query, sort))
+        reports.append(collscan_report(name, explain))
+    return reports
@@ -0,0 +1,137 @@
+"""
+Trabajos en segundo plano persistidos en la colección `jobs`.
+
+El borrado en cascada de un proyecto no se hace en la petición: el handler
+marca el proyecto como `deleting` (deja de aparecer en los listados), registra
+un trabajo y responde de inmediato con su id. El trabajo borra las tareas en
+lotes acotados y, al final, el propio proyecto. Cada paso es idempotente, así
+que un trabajo interrumpido (reinicio, caída del worker) se retoma desde donde
+quedó cuando vence su lease.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from bson import ObjectId
+
+from metrics import create_background_task
+
+DELETE_PROJECT = "delete_project"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+class JobRunner:
+    def __init__(
+        self,
+        repositories,
+        chunk_size: int = 1000,
+        lease_seconds: int = 60,
+        on_progress: Optional[Callable[[dict], None]] = None
+    ):
+        self.repositories = repositories
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+        self.on_progress = on_progress
+        self._tasks = set()
+        self._watcher = None
+
+    def start(self) -> None:
+        """Retoma periódicamente los trabajos pendientes o abandonados por otro worker"""
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        tasks = [task for task in (self._watcher, *self._tasks) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._watcher = None
+
+    async def delete_project(self, project_id: str) -> Optional[dict]:
+        """Inicia (o devuelve, si ya existe) el borrado en cascada de un proyecto.
+
+        Devuelve `None` si el proyecto no existe.
+        """
+        jobs = self.repositories.jobs
+        projects = self.repositories.projects
+        job = await jobs.create(DELETE_PROJECT, project_id)
+
+        if not await projects.mark_deleting(ObjectId(project_id), job["_id"]):
+            await jobs.discard(job["_id"])
+            project = await projects.get(ObjectId(project_id), include_deleting=True)
+            if project is None:
+                return None
+            # Ya había un borrado en curso: se reutiliza su trabajo (y se reintenta si falló)
+            job = await jobs.requeue(project["deletion_job_id"])
+            if job is None:
+                job = await jobs.create(DELETE_PROJECT, project_id, project["deletion_job_id"])
+
+        self.schedule(job["_id"])
+        return job
+
+    def schedule(self, job_id: ObjectId) -> None:
+        task = create_background_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def resume_pending(self) -> int:
+        job_ids = await self.repositories.jobs.resumable()
+        for job_id in job_ids:
+            self.schedule(job_id)
+        return len(job_ids)
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                resumed = await self.resume_pending()
+                if resumed:
+                    logger.info("Retomados %d trabajos en segundo plano", resumed)
+            except Exception as e:
+                logger.warning("No se pudieron retomar los trabajos pendientes: %s", e)
+            await asyncio.sleep(self.lease_seconds)
+
+    async def _run(self, job_id: ObjectId) -> None:
+        jobs = self.repositories.jobs
+        job = await jobs.claim(job_id, self.lease_seconds)
+        if job is None:
+            # Terminado o en manos de otro worker con el lease vigente
+            return
+
+        try:
+            await self._delete_project(job)
+            job = await jobs.finish(job_id, DONE)
+        except asyncio.CancelledError:
+            await jobs.release(job_id)
+            raise
+        except Exception as e:
+            logger.exception("Falló el trabajo %s", job_id)
+            job = await jobs.finish(job_id, FAILED, str(e))
+
+        if self.on_progress is not None and job is not None:
+            self.on_progress(job)
+
+    async def _delete_project(self, job: dict) -> None:
+        project_id = job["project_id"]
+        await self._delete_tasks(job)
+        await self.repositories.projects.remove(ObjectId(project_id))
+        # Una escritura que comprobó el proyecto justo antes de que se marcara
+        # pudo insertar su tarea después del último lote: se barre otra vez
+        if await self._delete_tasks(job):
+            await self.repositories.projects.remove(ObjectId(project_id))
+
+    async def _delete_tasks(self, job: dict) -> int:
+        """Borrar por lotes las tareas del proyecto; devuelve cuántas se borraron"""
+        total = 0
+        while True:
+            deleted = await self.repositories.tasks.delete_chunk(job["project_id"], self.chunk_size)
+            if not deleted:
+                return total
+            total += deleted
+            await self.repositories.jobs.progress(job["_id"], deleted, self.lease_seconds)
+            if self.on_progress is not None:
+                self.on_progress(job)
@@ -0,0 +1,287 @@
+"""
+Métricas por ruta y por comando de MongoDB, en formato de texto de Prometheus.
+
+`MetricsMiddleware` mide cada petición: latencia, bytes del cuerpo enviado y,
+con ayuda de `CommandMetrics` (un `CommandListener` de PyMongo registrado en
+el cliente), cuántos comandos lanzó a MongoDB y cuántos documentos le
+devolvieron. La petición en curso se guarda en una `ContextVar`: PyMongo
+llama al listener desde la propia petición y Motor copia el contexto al hilo
+en el que ejecuta cada operación, así que ambos drivers la ven. Las tareas en
+segundo plano que lanza una petición (el borrado de un proyecto, el latido
+de SSE) se crean con `create_background_task`, que no hereda esa petición.
+
+Detección de N+1: una petición con al menos `n_plus_one_min_commands`
+comandos que devuelven de media `n_plus_one_docs_per_command` documentos o
+menos es el patrón de una consulta por elemento del resultado (el número de
+comandos crece con el tamaño de la respuesta). Se cuenta en
+`http_requests_n_plus_one_total` y se registra un aviso con la ruta.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "<unmatched>"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COMMAND_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+DOCUMENT_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+BYTES_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+DB_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+logger = logging.getLogger(__name__)
+
+class RequestStats:
+    __slots__ = ("commands", "documents", "db_seconds")
+
+    def __init__(self):
+        self.commands = 0
+        self.documents = 0
+        self.db_seconds = 0.0
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def create_background_task(coro) -> asyncio.Task:
+    """`asyncio.create_task` sin la petición en curso.
+
+    La tarea copia el contexto en el momento de crearla, así que se crea con
+    la petición vaciada: si no, sus comandos de MongoDB se sumarían a la
+    petición que la lanzó, incluso después de que esta haya respondido.
+    """
+    token = _current_request.set(None)
+    try:
+        return asyncio.create_task(coro)
+    finally:
+        _current_request.reset(token)
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = defaultdict(float)
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self._values[label_values] += amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, label_values)} {format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # Por etiquetas: conteo de cada cubeta (no acumulado), suma y total
+        self._series = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (bucket_counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = format_labels((*self.labels, "le"), (*label_values, format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels((*self.labels, "le"), (*label_values, "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+def reply_documents(command_name: str, reply: dict) -> int:
+    """Documentos devueltos por un comando (lotes de cursor o el documento de findAndModify)"""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    return 0
+
+class Metrics:
+    def __init__(self, n_plus_one_min_commands: int = 10, n_plus_one_docs_per_command: float = 5):
+        self.n_plus_one_min_commands = n_plus_one_min_commands
+        self.n_plus_one_docs_per_command = n_plus_one_docs_per_command
+        # El listener se ejecuta en los hilos de Motor además de en el event loop
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "http_requests_total", "Peticiones atendidas", ("method", "route", "status")
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Latencia de las peticiones", LATENCY_BUCKETS, ("method", "route")
+        )
+        self.db_commands = Histogram(
+            "http_request_db_commands", "Comandos de MongoDB por petición", COMMAND_BUCKETS, ("method", "route")
+        )
+        self.db_documents = Histogram(
+            "http_request_db_documents", "Documentos devueltos por MongoDB por petición", DOCUMENT_BUCKETS,
+            ("method", "route")
+        )
+        self.db_seconds = Histogram(
+            "http_request_db_seconds", "Tiempo en comandos de MongoDB por petición", LATENCY_BUCKETS,
+            ("method", "route")
+        )
+        self.response_bytes = Histogram(
+            "http_response_bytes", "Bytes del cuerpo de la respuesta", BYTES_BUCKETS, ("method", "route")
+        )
+        self.n_plus_one = Counter(
+            "http_requests_n_plus_one_total",
+            "Peticiones cuyo número de comandos crece con el tamaño del resultado (N+1)",
+            ("method", "route")
+        )
+        self.commands = Histogram(
+            "mongodb_command_duration_seconds", "Duración de los comandos de MongoDB", DB_LATENCY_BUCKETS,
+            ("command",)
+        )
+        self.command_failures = Counter(
+            "mongodb_command_failures_total", "Comandos de MongoDB fallidos", ("command",)
+        )
+        self.command_listener = CommandMetrics(self)
+
+    def record_command(self, command_name: str, seconds: float, documents: int, failed: bool = False) -> None:
+        stats = _current_request.get()
+        with self._lock:
+            self.commands.observe(seconds, command_name)
+            if failed:
+                self.command_failures.inc(command_name)
+            if stats is not None:
+                stats.commands += 1
+                stats.documents += documents
+                stats.db_seconds += seconds
+
+    def is_n_plus_one(self, stats: RequestStats) -> bool:
+        return (
+            stats.commands >= self.n_plus_one_min_commands
+            and stats.documents <= stats.commands * self.n_plus_one_docs_per_command
+        )
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats,
+                       body_bytes: int) -> None:
+        with self._lock:
+            self.requests.inc(method, route, str(status))
+            self.latency.observe(seconds, method, route)
+            self.db_commands.observe(stats.commands, method, route)
+            self.db_documents.observe(stats.documents, method, route)
+            self.db_seconds.observe(stats.db_seconds, method, route)
+            self.response_bytes.observe(body_bytes, method, route)
+            n_plus_one = self.is_n_plus_one(stats)
+            if n_plus_one:
+                self.n_plus_one.inc(method, route)
+        if n_plus_one:
+            logger.warning(
+                "Posible N+1 en %s %s: %d comandos para %d documentos",
+                method, route, stats.commands, stats.documents
+            )
+
+    def render(self) -> str:
+        metrics = (
+            self.requests, self.latency, self.db_commands, self.db_documents, self.db_seconds,
+            self.response_bytes, self.n_plus_one, self.commands, self.command_failures
+        )
+        with self._lock:
+            lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+class CommandMetrics(monitoring.CommandListener):
+    """Duración de cada comando y su cuenta en la petición en curso (si la hay)"""
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.metrics.record_command(
+            event.command_name, event.duration_micros / 1e6, reply_documents(event.command_name, event.reply)
+        )
+
+    def failed(self, event):
+        self.metrics.record_command(event.command_name, event.duration_micros / 1e6, 0, failed=True)
+
+def route_template(scope) -> str:
+    """Plantilla de la ruta (`/api/projects/{project_id}`), para no crear una serie por cada id"""
+    app = scope.get("app")
+    if app is None:
+        return UNMATCHED_ROUTE
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """Middleware ASGI: no almacena el cuerpo, así que no altera las respuestas en streaming"""
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            self.metrics.record_request(
+                scope["method"], route_template(scope), status, time.perf_counter() - started, stats, body_bytes
+            )
@@ -0,0 +1,80 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+
+En lugar de `skip`, cada página continúa a partir de los valores de ordenación
+del último documento devuelto, de modo que el coste de una página no depende de
+su posición y la memoria por petición queda acotada por `limit`.
+"""
+
+import base64
+from typing import Optional, Tuple
+
+from bson import json_util
+from fastapi import HTTPException
+from pymongo import ASCENDING
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(values: list) -> str:
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(token: str, size: int) -> list:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    return values
+
+def keyset_filter(sort_keys: list, values: list) -> dict:
+    """Condición "posterior a `values`" para un orden ascendente por `sort_keys`.
+
+    Para (a, b) produce: a > va  OR  (a == va AND b > vb).
+
+    Un valor nulo (o un campo ausente, como el `creada_en` de tareas
+    importadas) ordena antes que cualquier otro, pero `$gt: null` no
+    coincide con nada: "posterior a null" se expresa como `$ne: null`.
+    """
+    clauses = []
+    for position, key in enumerate(sort_keys):
+        clause = {previous: values[i] for i, previous in enumerate(sort_keys[:position])}
+        clause[key] = {"$ne": None} if values[position] is None else {"$gt": values[position]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+def is_paginated(limit: Optional[int], after: Optional[str]) -> bool:
+    return limit is not None or after is not None
+
+async def paginate(
+    collection,
+    query: dict,
+    limit: Optional[int],
+    after: Optional[str],
+    sort_keys: Tuple[str, ...] = ("_id",),
+    projection: Optional[dict] = None
+) -> Tuple[list, Optional[str]]:
+    """Devuelve una página de documentos y el cursor de la siguiente (o None)."""
+    sort_keys = list(sort_keys)
+    limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    if projection:
+        # El cursor de la página siguiente se construye con las claves de ordenación
+        projection = {**projection, **{key: 1 for key in sort_keys}}
+
+    if after:
+        query = {"$and": [query, keyset_filter(sort_keys, decode_cursor(after, len(sort_keys)))]}
+
+    cursor = collection.find(query, projection)
+    cursor = cursor.sort([(key, ASCENDING) for key in sort_keys]).limit(limit + 1)
+    documents = await cursor.to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor([last.get(key) for key in sort_keys])
+
+    return documents, next_cursor
@@ -0,0 +1,81 @@
+"""
+Proyecciones de lectura.
+
+Los endpoints de lectura aceptan `fields=` (lista de campos separados por
+comas) o una vista con nombre (`view=summary` o `view=full`). Ambas se
+traducen a una proyección de MongoDB, de modo que los campos que no se piden
+no salen de la base de datos. `_id` se devuelve siempre. Sin parámetros se
+usa la vista `full`, que equivale a la respuesta de siempre.
+
+Las vistas `summary` son las formas compactas de los listados del frontend:
+la tarjeta de proyecto, la lista de tareas de un proyecto y la tabla de
+usuarios. El frontend edita a partir de ellas y mezcla en el mismo estado las
+tareas completas que llegan por SSE, así que las de proyectos y tareas
+conservan la `version` (que se envía en las escrituras) y los campos que
+usan esas pantallas; solo dejan fuera los que no se muestran.
+"""
+
+import zlib
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+
+SUMMARY = "summary"
+FULL = "full"
+VIEW_PATTERN = f"^({SUMMARY}|{FULL})$"
+
+PROJECT_FIELDS = (
+    "name", "description", "status", "users", "created_at", "total", "completadas", "pendientes", "version"
+)
+TASK_FIELDS = (
+    "descripcion", "prioridad", "estado", "completada", "usuario", "project_id", "fecha_limite",
+    "creada_en", "completada_en", "version"
+)
+USER_FIELDS = ("name", "email", "role", "created_at", "version")
+
+VIEWS = {
+    "projects": {
+        FULL: PROJECT_FIELDS,
+        # ProjectCard y ProjectDetail
+        SUMMARY: (
+            "name", "description", "status", "users", "created_at", "total", "completadas", "pendientes", "version"
+        ),
+    },
+    "tasks": {
+        FULL: TASK_FIELDS,
+        # TaskList y ProjectDetail (la versión se envía en los PATCH)
+        SUMMARY: (
+            "descripcion", "prioridad", "estado", "completada", "usuario", "project_id", "fecha_limite",
+            "creada_en", "version"
+        ),
+    },
+    "users": {
+        FULL: USER_FIELDS,
+        # UserManagement
+        SUMMARY: ("name", "email", "role"),
+    },
+}
+
+def projection_of(fields: Iterable[str]) -> dict:
+    return {field: 1 for field in fields}
+
+def resolve_projection(collection: str, fields: Optional[str] = None, view: Optional[str] = None) -> dict:
+    """Proyección de MongoDB para los parámetros `fields` y `view` de una petición"""
+    views = VIEWS[collection]
+    if fields is not None and view is not None:
+        raise HTTPException(status_code=400, detail="Indica `fields` o `view`, no ambos")
+    if fields is None:
+        return projection_of(views[view or FULL])
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="`fields` no puede estar vacío")
+    unknown = [field for field in requested if field != "_id" and field not in views[FULL]]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(unknown)}")
+    # Solo `_id`: una proyección vacía devolvería el documento completo
+    return projection_of(field for field in requested if field != "_id") or {"_id": 1}
+
+def projection_key(projection: dict) -> str:
+    """Identificador corto y estable de una proyección (clave de caché y variante del ETag)"""
+    return format(zlib.crc32(",".join(sorted(projection)).encode("utf-8")), "08x")
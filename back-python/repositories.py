@@ -0,0 +1,488 @@
+"""
+Capa de acceso a datos.
+
+Cada repositorio encapsula las consultas de una colección; los handlers de
+main.py solo validan la petición y dan forma a la respuesta. Todos comparten
+la base de datos del `DatabaseManager` de la aplicación.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from counters import apply_task_changes, empty_counters, resync_project_counters
+from jobs import FAILED, PENDING, RUNNING
+from rollups import ROLLUP_FIELDS, apply_rollup_changes, delete_project_rollups, resync_project_rollups
+from pagination import paginate
+from streaming import EXPORT_BATCH_SIZE
+
+# Los proyectos con un borrado en cascada en curso no se muestran
+VISIBLE_PROJECTS = {"deleting": {"$ne": True}}
+
+# Campos de una tarea de los que dependen los contadores del proyecto y los agregados de reportes
+TRACKED_TASK_FIELDS = ROLLUP_FIELDS
+
+class VersionConflict(Exception):
+    """El documento existe, pero su `version` ya no es la que espera el cliente."""
+
+def version_filter(document_id: ObjectId, version: Optional[int] = None) -> dict:
+    """Filtro por `_id` y, si se indica, por la versión esperada (control de concurrencia optimista).
+
+    Los documentos anteriores al campo `version` cuentan como versión 0.
+    """
+    query = {"_id": document_id}
+    if version is not None:
+        query["version"] = {"$in": [0, None]} if version == 0 else version
+    return query
+
+def patch_update(fields: dict) -> dict:
+    """`$set` de los campos enviados; cada escritura incrementa `version`"""
+    update = {"$inc": {"version": 1}}
+    if fields:
+        update["$set"] = fields
+    return update
+
+async def find_and_patch(collection, document_id: ObjectId, update: dict, version: Optional[int],
+                         return_document=ReturnDocument.AFTER, scope: Optional[dict] = None) -> Optional[dict]:
+    """Actualización parcial en un solo viaje con `find_one_and_update`.
+
+    Devuelve `None` si el documento no existe (o queda fuera de `scope`) y
+    lanza `VersionConflict` si existe con otra versión.
+    """
+    scope = scope or {}
+    document = await collection.find_one_and_update(
+        {**version_filter(document_id, version), **scope},
+        update,
+        return_document=return_document
+    )
+    if document is None and version is not None:
+        if await collection.count_documents({"_id": document_id, **scope}, limit=1):
+            raise VersionConflict()
+    return document
+
+def merge_patch(previous: dict, fields: dict) -> dict:
+    """Documento resultante de aplicar `patch_update(fields)` sobre `previous`"""
+    return {**previous, **fields, "version": (previous.get("version") or 0) + 1}
+
+def new_document(document: dict) -> dict:
+    """Documento a insertar, con `version` 0 explícita para que los listados lo puedan devolver tal cual"""
+    document.setdefault("version", 0)
+    return document
+
+def utc_now() -> datetime:
+    """Hora UTC con la precisión de milisegundos con la que la guarda MongoDB"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def stamp_completion(task: dict) -> dict:
+    """`completada_en` de una tarea nueva que se crea ya completada"""
+    if task.get("completada") and not task.get("completada_en"):
+        task["completada_en"] = task.get("creada_en") or utc_now()
+    return task
+
+def task_update(fields: dict, now: datetime) -> dict:
+    """`patch_update` de una tarea: al completarla guarda `completada_en` (la primera vez) y al reabrirla lo quita"""
+    update = patch_update(fields)
+    if fields.get("completada") is True:
+        update["$min"] = {"completada_en": now}
+    elif fields.get("completada") is False:
+        update["$unset"] = {"completada_en": ""}
+    return update
+
+def merge_task_patch(previous: dict, fields: dict, now: datetime) -> dict:
+    """Documento resultante de aplicar `task_update(fields, now)` sobre `previous`"""
+    task = merge_patch(previous, fields)
+    if fields.get("completada") is True:
+        task["completada_en"] = min(previous.get("completada_en") or now, now)
+    elif fields.get("completada") is False:
+        task.pop("completada_en", None)
+    return task
+
+async def record_task_changes(db, changes) -> None:
+    """Aplicar los cambios `(antes, después)` de tareas a los contadores y a los agregados de reportes"""
+    changes = list(changes)
+    await apply_task_changes(db, changes)
+    await apply_rollup_changes(db, changes)
+
+async def insert_unordered(collection, documents: list) -> Dict[int, dict]:
+    """`insert_many` sin orden: los documentos válidos se insertan aunque otros fallen.
+
+    Devuelve los errores de escritura indexados por la posición del documento
+    en `documents`; los insertados reciben su `_id` en el propio diccionario.
+    """
+    if not documents:
+        return {}
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        return {error["index"]: error for error in e.details.get("writeErrors", [])}
+    return {}
+
+class ProjectRepository:
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.projects
+
+    async def list(self, projection: Optional[dict] = None) -> list:
+        return await self.collection.find(VISIBLE_PROJECTS, projection).to_list(None)
+
+    async def page(self, limit: Optional[int], after: Optional[str], projection: Optional[dict] = None):
+        return await paginate(self.collection, VISIBLE_PROJECTS, limit, after, projection=projection)
+
+    def iterate(self, projection: Optional[dict] = None):
+        return self.collection.find(VISIBLE_PROJECTS, projection).batch_size(EXPORT_BATCH_SIZE)
+
+    async def get(self, project_id: ObjectId, include_deleting: bool = False,
+                  projection: Optional[dict] = None) -> Optional[dict]:
+        query = {"_id": project_id} if include_deleting else {"_id": project_id, **VISIBLE_PROJECTS}
+        return await self.collection.find_one(query, projection)
+
+    async def visible_ids(self) -> list:
+        return [str(project["_id"]) async for project in self.collection.find(VISIBLE_PROJECTS, {"_id": 1})]
+
+    async def visible(self, project_ids) -> set:
+        """Los proyectos de `project_ids` que existen y no se están borrando, resueltos con un único $in"""
+        object_ids = [ObjectId(pid) for pid in set(project_ids) if pid and ObjectId.is_valid(pid)]
+        if not object_ids:
+            return set()
+        return {
+            str(project["_id"])
+            async for project in self.collection.find({"_id": {"$in": object_ids}, **VISIBLE_PROJECTS}, {"_id": 1})
+        }
+
+    async def names_by_id(self, project_ids) -> dict:
+        """Nombre de cada proyecto, resuelto con un único $in"""
+        object_ids = [ObjectId(pid) for pid in project_ids if pid and ObjectId.is_valid(pid)]
+        return {
+            str(project["_id"]): project.get("name", "")
+            async for project in self.collection.find({"_id": {"$in": object_ids}, **VISIBLE_PROJECTS}, {"name": 1})
+        }
+
+    async def create(self, project_data: dict) -> ObjectId:
+        project_data.update(empty_counters())
+        result = await self.collection.insert_one(new_document(project_data))
+        return result.inserted_id
+
+    async def update(self, project_id: ObjectId, project_data: dict) -> Optional[dict]:
+        result = await self.collection.update_one({"_id": project_id, **VISIBLE_PROJECTS}, patch_update(project_data))
+        if result.matched_count == 0:
+            return None
+        return await self.collection.find_one({"_id": project_id})
+
+    async def patch(self, project_id: ObjectId, fields: dict, version: Optional[int] = None) -> Optional[dict]:
+        return await find_and_patch(self.collection, project_id, patch_update(fields), version, scope=VISIBLE_PROJECTS)
+
+    async def mark_deleting(self, project_id: ObjectId, job_id: ObjectId) -> bool:
+        """Ocultar el proyecto y asociarle el trabajo de borrado; `False` si no existe o ya se está borrando"""
+        result = await self.collection.update_one(
+            {"_id": project_id, **VISIBLE_PROJECTS},
+            {"$set": {"deleting": True, "deletion_job_id": job_id}}
+        )
+        return result.modified_count > 0
+
+    async def remove(self, project_id: ObjectId) -> None:
+        await delete_project_rollups(self.db, str(project_id))
+        await self.collection.delete_one({"_id": project_id})
+
+class TaskRepository:
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.tasks
+
+    async def list(self, query: dict, projection: Optional[dict] = None) -> list:
+        return await self.collection.find(query, projection).to_list(None)
+
+    async def page(self, query: dict, limit: Optional[int], after: Optional[str], projection: Optional[dict] = None):
+        return await paginate(
+            self.collection, query, limit, after,
+            sort_keys=("creada_en", "_id"), projection=projection
+        )
+
+    def iterate(self, query: dict, projection: Optional[dict] = None):
+        return self.collection.find(query, projection).batch_size(EXPORT_BATCH_SIZE)
+
+    async def create(self, task_data: dict) -> ObjectId:
+        result = await self.collection.insert_one(new_document(stamp_completion(task_data)))
+        await record_task_changes(self.db, [(None, task_data)])
+        return result.inserted_id
+
+    async def create_many(self, tasks: list) -> Dict[int, dict]:
+        """Inserta un lote con un único `insert_many` y un `$inc` por proyecto afectado"""
+        failed = await insert_unordered(self.collection, [new_document(stamp_completion(task)) for task in tasks])
+        await record_task_changes(self.db, [
+            (None, task) for index, task in enumerate(tasks) if index not in failed
+        ])
+        return failed
+
+    async def replace(self, task_id: ObjectId, task_data: dict) -> Tuple[Optional[dict], Optional[dict]]:
+        """Sobrescribir los campos de una tarea; devuelve el documento anterior y el resultante"""
+        now = utc_now()
+        previous_task = await self.collection.find_one_and_update(
+            {"_id": task_id},
+            task_update(task_data, now),
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous_task is None:
+            return None, None
+
+        updated_task = merge_task_patch(previous_task, task_data, now)
+        await record_task_changes(self.db, [(previous_task, updated_task)])
+        return previous_task, updated_task
+
+    async def patch(self, task_id: ObjectId, fields: dict,
+                    version: Optional[int] = None) -> Tuple[Optional[dict], Optional[dict]]:
+        """Actualización parcial en un solo viaje; devuelve el documento anterior (si se necesita) y el resultante.
+
+        Si cambian campos de los que dependen los contadores o los agregados
+        se pide el documento anterior y el resultante se compone localmente;
+        si no, basta con `ReturnDocument.AFTER`.
+        """
+        now = utc_now()
+        update = task_update(fields, now)
+        if not any(field in fields for field in TRACKED_TASK_FIELDS):
+            return None, await find_and_patch(self.collection, task_id, update, version)
+
+        previous_task = await find_and_patch(self.collection, task_id, update, version, ReturnDocument.BEFORE)
+        if previous_task is None:
+            return None, None
+
+        updated_task = merge_task_patch(previous_task, fields, now)
+        await record_task_changes(self.db, [(previous_task, updated_task)])
+        return previous_task, updated_task
+
+    async def update_many(self, changes: List[Tuple[ObjectId, dict, Optional[int]]]) -> Tuple[Dict[int, tuple], Dict[int, str]]:
+        """Actualizaciones parciales `(id, campos, versión esperada)` de un lote con un único `bulk_write` sin orden.
+
+        Devuelve, por posición en el lote, los pares (anterior, resultante) de
+        las tareas modificadas y los mensajes de las que no se pudieron aplicar.
+        """
+        previous_by_id = {
+            task["_id"]: task
+            async for task in self.collection.find({"_id": {"$in": [task_id for task_id, _, _ in changes]}})
+        }
+
+        now = utc_now()
+        updated = {}
+        failed = {}
+        operations = []
+        seen = set()
+        for index, (task_id, fields, version) in enumerate(changes):
+            previous_task = previous_by_id.get(task_id)
+            if previous_task is None:
+                failed[index] = "Tarea no encontrada"
+                continue
+            if task_id in seen:
+                failed[index] = "Tarea repetida en el lote"
+                continue
+            seen.add(task_id)
+            if version is not None and (previous_task.get("version") or 0) != version:
+                failed[index] = "La tarea fue modificada por otro usuario"
+                continue
+            # Solo coincide si los campos de los contadores y agregados siguen como se leyeron
+            guard = version_filter(task_id, version)
+            guard.update({field: previous_task.get(field) for field in TRACKED_TASK_FIELDS})
+            operations.append(UpdateOne(guard, task_update(fields, now)))
+            updated[index] = (previous_task, merge_task_patch(previous_task, fields, now))
+
+        if not operations:
+            return updated, failed
+
+        result = await self.collection.bulk_write(operations, ordered=False)
+        if result.matched_count == len(operations):
+            await record_task_changes(self.db, updated.values())
+            return updated, failed
+
+        # Otra petición cambió alguna tarea entre la lectura y el lote: se confirma
+        # cuáles quedaron con los valores pedidos y se recalculan sus proyectos
+        current_by_id = {
+            task["_id"]: task
+            async for task in self.collection.find({"_id": {"$in": [before["_id"] for before, _ in updated.values()]}})
+        }
+        for index in list(updated):
+            task_id, fields, _ = changes[index]
+            current_task = current_by_id.get(task_id)
+            if current_task is None or any(current_task.get(field) != value for field, value in fields.items()):
+                del updated[index]
+                failed[index] = "La tarea cambió durante la actualización; vuelva a intentarlo"
+
+        affected_projects = {
+            task["project_id"]
+            for pair in updated.values() for task in pair
+            if task.get("project_id")
+        }
+        await resync_project_counters(self.db, affected_projects)
+        await resync_project_rollups(self.db, affected_projects)
+        return updated, failed
+
+    async def delete_chunk(self, project_id: str, limit: int) -> int:
+        """Borrar como máximo `limit` tareas de un proyecto; devuelve cuántas se borraron"""
+        task_ids = [
+            task["_id"]
+            async for task in self.collection.find({"project_id": project_id}, {"_id": 1}).limit(limit)
+        ]
+        if not task_ids:
+            return 0
+        result = await self.collection.delete_many({"_id": {"$in": task_ids}})
+        return result.deleted_count
+
+    async def delete(self, task_id: ObjectId) -> Optional[dict]:
+        deleted_task = await self.collection.find_one_and_delete({"_id": task_id})
+        if deleted_task is not None:
+            await record_task_changes(self.db, [(deleted_task, None)])
+        return deleted_task
+
+class UserRepository:
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.users
+
+    async def list(self, projection: Optional[dict] = None) -> list:
+        return await self.collection.find({}, projection).to_list(None)
+
+    async def page(self, limit: Optional[int], after: Optional[str], projection: Optional[dict] = None):
+        return await paginate(self.collection, {}, limit, after, projection=projection)
+
+    def iterate(self, projection: Optional[dict] = None):
+        return self.collection.find({}, projection).batch_size(EXPORT_BATCH_SIZE)
+
+    async def create(self, user_data: dict) -> ObjectId:
+        result = await self.collection.insert_one(new_document(user_data))
+        return result.inserted_id
+
+    async def create_many(self, users: list) -> Dict[int, dict]:
+        return await insert_unordered(self.collection, [new_document(user) for user in users])
+
+    async def update(self, user_id: ObjectId, user_data: dict) -> Optional[dict]:
+        result = await self.collection.update_one({"_id": user_id}, patch_update(user_data))
+        if result.matched_count == 0:
+            return None
+        return await self.collection.find_one({"_id": user_id})
+
+    async def patch(self, user_id: ObjectId, fields: dict, version: Optional[int] = None) -> Optional[dict]:
+        return await find_and_patch(self.collection, user_id, patch_update(fields), version)
+
+    async def delete(self, user_id: ObjectId) -> bool:
+        result = await self.collection.delete_one({"_id": user_id})
+        return result.deleted_count > 0
+
+class JobRepository:
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.jobs
+
+    async def create(self, job_type: str, project_id: str, job_id: Optional[ObjectId] = None) -> dict:
+        now = datetime.utcnow()
+        job = {
+            "_id": job_id or ObjectId(),
+            "type": job_type,
+            "project_id": project_id,
+            "status": PENDING,
+            "deleted_tasks": 0,
+            "error": None,
+            "lease_expires_at": None,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None
+        }
+        await self.collection.insert_one(job)
+        return job
+
+    async def get(self, job_id: ObjectId) -> Optional[dict]:
+        return await self.collection.find_one({"_id": job_id})
+
+    async def discard(self, job_id: ObjectId) -> None:
+        await self.collection.delete_one({"_id": job_id, "status": PENDING})
+
+    async def resumable(self) -> list:
+        """Trabajos sin terminar cuyo lease venció (o que nunca se reclamaron)"""
+        query = {
+            "status": {"$in": [PENDING, RUNNING]},
+            "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": datetime.utcnow()}}]
+        }
+        return [job["_id"] async for job in self.collection.find(query, {"_id": 1})]
+
+    async def claim(self, job_id: ObjectId, lease_seconds: int) -> Optional[dict]:
+        """Reclamar el trabajo para este worker; `None` si terminó o lo tiene otro con el lease vigente"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "_id": job_id,
+                "status": {"$in": [PENDING, RUNNING]},
+                "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}]
+            },
+            {"$set": {
+                "status": RUNNING,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "updated_at": now
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def progress(self, job_id: ObjectId, deleted: int, lease_seconds: int) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id},
+            {
+                "$inc": {"deleted_tasks": deleted},
+                "$set": {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}
+            }
+        )
+
+    async def release(self, job_id: ObjectId) -> None:
+        await self.collection.update_one(
+            {"_id": job_id, "status": RUNNING},
+            {"$set": {"lease_expires_at": None, "updated_at": datetime.utcnow()}}
+        )
+
+    async def finish(self, job_id: ObjectId, status: str, error: Optional[str] = None) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"_id": job_id},
+            {"$set": {
+                "status": status,
+                "error": error,
+                "lease_expires_at": None,
+                "updated_at": now,
+                "finished_at": now
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def requeue(self, job_id: ObjectId) -> Optional[dict]:
+        """Volver a poner en cola un trabajo fallido; devuelve el trabajo en su estado actual"""
+        await self.collection.update_one(
+            {"_id": job_id, "status": FAILED},
+            {"$set": {"status": PENDING, "error": None, "finished_at": None, "updated_at": datetime.utcnow()}}
+        )
+        return await self.get(job_id)
+
+class ReportRepository:
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.task_rollups
+
+    async def rollups(self, project_ids: list, dimensions=None,
+                      key_from: Optional[str] = None, key_to: Optional[str] = None) -> list:
+        """Agregados de los proyectos indicados, opcionalmente de algunas dimensiones y un rango de claves"""
+        query = {"project_id": {"$in": project_ids}}
+        if dimensions:
+            query["dimension"] = {"$in": list(dimensions)}
+        if key_from or key_to:
+            query["key"] = {}
+            if key_from:
+                query["key"]["$gte"] = key_from
+            if key_to:
+                query["key"]["$lte"] = key_to
+        return await self.collection.find(query, {"_id": 0}).to_list(None)
+
+class Repositories:
+    def __init__(self, db):
+        self.db = db
+        self.projects = ProjectRepository(db)
+        self.tasks = TaskRepository(db)
+        self.users = UserRepository(db)
+        self.jobs = JobRepository(db)
+        self.reports = ReportRepository(db)
@@ -0,0 +1,180 @@
+"""
+Agregados de reportes mantenidos de forma incremental.
+
+Cada documento de `task_rollups` cuenta las tareas de un proyecto para una
+dimensión y un valor: por `estado`, `prioridad` y `usuario`, tareas creadas y
+completadas por día, y tareas abiertas por día de `fecha_limite` (de donde
+sale el número de tareas vencidas sin recorrer las tareas). Las escrituras de
+tareas aplican `$inc` sobre las claves que cambian, igual que los contadores
+de `counters.py`.
+
+`apply_rollup_changes` y `resync_project_rollups` se usan desde la API con la
+base de datos asíncrona; `verify_rollups` y `rebuild_rollups` son síncronas y
+se ejecutan desde `init_db.py`.
+"""
+
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Iterable, Optional, Tuple
+
+from pymongo import UpdateOne
+
+ESTADO = "estado"
+PRIORIDAD = "prioridad"
+USUARIO = "usuario"
+CREATED = "created"
+COMPLETED = "completed"
+OPEN_DUE = "open_due"
+
+DIMENSIONS = (ESTADO, PRIORIDAD, USUARIO, CREATED, COMPLETED, OPEN_DUE)
+
+# Campos de una tarea de los que dependen los agregados
+ROLLUP_FIELDS = ("project_id", "estado", "prioridad", "usuario", "completada",
+                 "creada_en", "completada_en", "fecha_limite")
+
+UNASSIGNED = ""
+
+def day_key(value) -> Optional[str]:
+    """Día UTC (`YYYY-MM-DD`) de una fecha, fecha y hora o texto ISO"""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str) and len(value) >= 10:
+        return value[:10]
+    return None
+
+def rollup_keys(task: dict) -> list:
+    """Claves `(dimensión, valor)` en las que cuenta una tarea"""
+    keys = [
+        (ESTADO, task.get("estado", "pendiente")),
+        (PRIORIDAD, task.get("prioridad", "media")),
+        (USUARIO, task.get("usuario") or UNASSIGNED),
+    ]
+    created = day_key(task.get("creada_en"))
+    if created:
+        keys.append((CREATED, created))
+    if task.get("completada", False):
+        completed = day_key(task.get("completada_en"))
+        if completed:
+            keys.append((COMPLETED, completed))
+    else:
+        due = day_key(task.get("fecha_limite"))
+        if due:
+            keys.append((OPEN_DUE, due))
+    return keys
+
+def rollup_delta(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> dict:
+    """Suma los cambios `(before, after)` de un lote en incrementos por `(proyecto, dimensión, valor)`"""
+    delta = Counter()
+    for before, after in changes:
+        for task, sign in ((before, -1), (after, 1)):
+            if not task or not task.get("project_id"):
+                continue
+            for dimension, key in rollup_keys(task):
+                delta[(task["project_id"], dimension, key)] += sign
+    return {rollup_key: count for rollup_key, count in delta.items() if count}
+
+def rollup_filter(project_id: str, dimension: str, key: str) -> dict:
+    return {"project_id": project_id, "dimension": dimension, "key": key}
+
+def rollup_updates(delta: dict) -> list:
+    return [
+        UpdateOne(rollup_filter(*rollup_key), {"$inc": {"count": count}}, upsert=True)
+        for rollup_key, count in delta.items()
+    ]
+
+async def apply_rollup_changes(db, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> None:
+    updates = rollup_updates(rollup_delta(changes))
+    if updates:
+        await db.task_rollups.bulk_write(updates, ordered=False)
+
+def count_tasks(tasks: Iterable[dict]) -> dict:
+    """Agregados calculados desde cero a partir de los documentos de tareas"""
+    return rollup_delta((None, task) for task in tasks)
+
+def set_counts_updates(expected: dict, stored: dict) -> list:
+    """Operaciones que dejan `stored` igual que `expected` (las claves sobrantes quedan a 0)"""
+    updates = []
+    for rollup_key in set(expected) | set(stored):
+        count = expected.get(rollup_key, 0)
+        if stored.get(rollup_key, 0) != count:
+            updates.append(UpdateOne(rollup_filter(*rollup_key), {"$set": {"count": count}}, upsert=True))
+    return updates
+
+async def resync_project_rollups(db, project_ids: Iterable[str]) -> None:
+    """Recalcula desde las tareas los agregados de los proyectos indicados"""
+    project_ids = list(project_ids)
+    if not project_ids:
+        return
+    projection = {field: 1 for field in ROLLUP_FIELDS}
+    expected = count_tasks([
+        task async for task in db.tasks.find({"project_id": {"$in": project_ids}}, projection)
+    ])
+    stored = {
+        (row["project_id"], row["dimension"], row["key"]): row["count"]
+        async for row in db.task_rollups.find({"project_id": {"$in": project_ids}})
+    }
+    updates = set_counts_updates(expected, stored)
+    if updates:
+        await db.task_rollups.bulk_write(updates, ordered=False)
+
+async def delete_project_rollups(db, project_id: str) -> None:
+    await db.task_rollups.delete_many({"project_id": project_id})
+
+def summarize(rows: Iterable[dict], today: str, group=lambda row: row["project_id"]) -> dict:
+    """Agrupa documentos de `task_rollups` (por defecto, por proyecto) en el formato de los reportes"""
+    summaries = defaultdict(lambda: {
+        "by_status": {}, "by_priority": {}, "by_user": {},
+        "created_per_day": {}, "completed_per_day": {}, "overdue_tasks": 0
+    })
+    fields = {
+        ESTADO: "by_status",
+        PRIORIDAD: "by_priority",
+        USUARIO: "by_user",
+        CREATED: "created_per_day",
+        COMPLETED: "completed_per_day",
+    }
+    for row in rows:
+        if not row.get("count"):
+            continue
+        summary = summaries[group(row)]
+        if row["dimension"] == OPEN_DUE:
+            if row["key"] < today:
+                summary["overdue_tasks"] += row["count"]
+        elif row["dimension"] in fields:
+            values = summary[fields[row["dimension"]]]
+            values[row["key"]] = values.get(row["key"], 0) + row["count"]
+    return summaries
+
+def stored_rollups(db) -> dict:
+    return {
+        (row["project_id"], row["dimension"], row["key"]): row["count"]
+        for row in db.task_rollups.find({})
+    }
+
+def verify_rollups(db) -> list:
+    """Devuelve las claves cuyos agregados no coinciden con un recálculo completo."""
+    expected = count_tasks(db.tasks.find({}, {field: 1 for field in ROLLUP_FIELDS}))
+    stored = stored_rollups(db)
+    return [
+        {
+            "project_id": rollup_key[0],
+            "dimension": rollup_key[1],
+            "key": rollup_key[2],
+            "stored": stored.get(rollup_key, 0),
+            "expected": expected.get(rollup_key, 0)
+        }
+        for rollup_key in sorted(set(expected) | set(stored))
+        if stored.get(rollup_key, 0) != expected.get(rollup_key, 0)
+    ]
+
+def rebuild_rollups(db) -> int:
+    """Recalcula los agregados desde cero y corrige los que no coinciden.
+
+    Devuelve el número de claves corregidas.
+    """
+    expected = count_tasks(db.tasks.find({}, {field: 1 for field in ROLLUP_FIELDS}))
+    updates = set_counts_updates(expected, stored_rollups(db))
+    if updates:
+        db.task_rollups.bulk_write(updates, ordered=False)
+    db.task_rollups.delete_many({"count": 0})
+    return len(updates)
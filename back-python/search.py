@@ -0,0 +1,151 @@
+"""
+Búsqueda sobre tareas, proyectos y usuarios.
+
+Dos modos:
+
+- `text`: búsqueda de texto completo con los índices de texto de cada
+  colección (`indexes.py`), en español (con raíces: "tareas" encuentra
+  "tarea"). Los resultados se ordenan por relevancia (`textScore`) y se
+  paginan por cursor sobre (relevancia, tipo, `_id`), de modo que cada página
+  pide a cada colección como mucho `limit + 1` documentos.
+- `prefix`: autocompletado. Busca los valores que empiezan por `q` con un
+  rango sobre un índice con collation española de fuerza 1 (sin distinguir
+  mayúsculas ni acentos: "proy" encuentra "Proyecto" y "próximo"). Devuelve
+  las `limit` mejores sugerencias, primero las más cercanas a `q`; no se
+  pagina.
+
+Cada resultado es `{"type", "score", "document"}`, con el documento en su
+vista `summary` (la de las tareas incluye `project_id`, para poder abrir su proyecto).
+Las tareas se limitan a los proyectos de `project_ids`, que el llamador
+resuelve a los visibles: las de un proyecto en borrado no aparecen.
+"""
+
+from typing import Iterable, Optional, Tuple
+
+from indexes import SEARCH_COLLATION
+from pagination import decode_cursor, encode_cursor
+from projections import SUMMARY, VIEWS, projection_of
+from repositories import VISIBLE_PROJECTS
+
+TEXT = "text"
+PREFIX = "prefix"
+MODES = (TEXT, PREFIX)
+
+# Orden de los tipos entre resultados con la misma relevancia
+SEARCH_TYPES = ("projects", "tasks", "users")
+
+# Campos por los que se autocompleta
+PREFIX_FIELDS = {
+    "projects": ("name",),
+    "tasks": ("descripcion",),
+    "users": ("name", "email"),
+}
+
+RESULT_FIELDS = {search_type: projection_of(VIEWS[search_type][SUMMARY]) for search_type in SEARCH_TYPES}
+
+# Límite superior de un rango de prefijo: U+FFFF ordena después de cualquier carácter en ICU
+PREFIX_END = "\uffff"
+
+def parse_types(types: Optional[str]) -> list:
+    """Tipos pedidos (`types=tasks,users`); todos si no se indica ninguno"""
+    if not types:
+        return list(SEARCH_TYPES)
+    requested = [search_type.strip() for search_type in types.split(",") if search_type.strip()]
+    unknown = [search_type for search_type in requested if search_type not in SEARCH_TYPES]
+    if unknown:
+        raise ValueError(f"Tipos de búsqueda desconocidos: {', '.join(unknown)}")
+    return [search_type for search_type in SEARCH_TYPES if search_type in requested]
+
+def base_filter(search_type: str, project_ids: Iterable[str]) -> dict:
+    """Filtro fijo de cada colección; `project_ids` solo limita las tareas"""
+    if search_type == "projects":
+        return dict(VISIBLE_PROJECTS)
+    if search_type == "tasks":
+        return {"project_id": {"$in": list(project_ids)}}
+    return {}
+
+def after_filter(search_type: str, after: tuple) -> dict:
+    """Documentos de `search_type` posteriores al último resultado de la página anterior.
+
+    El orden global es relevancia descendente, luego tipo y luego `_id`; como
+    el tipo es fijo en cada colección, la condición se reduce a una sobre la
+    relevancia y, en la colección del último resultado, sobre el `_id`.
+    """
+    score, after_type, after_id = after
+    rank, after_rank = SEARCH_TYPES.index(search_type), SEARCH_TYPES.index(after_type)
+    if rank > after_rank:
+        return {"score": {"$lte": score}}
+    if rank < after_rank:
+        return {"score": {"$lt": score}}
+    return {"$or": [{"score": {"$lt": score}}, {"score": score, "_id": {"$gt": after_id}}]}
+
+def text_pipeline(search_type: str, q: str, query: dict, limit: int,
+                  after: Optional[tuple]) -> list:
+    pipeline = [
+        {"$match": {"$text": {"$search": q}, **query}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+    if after is not None:
+        pipeline.append({"$match": after_filter(search_type, after)})
+    pipeline.extend([
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$limit": limit + 1},
+        {"$project": {**RESULT_FIELDS[search_type], "score": 1}},
+    ])
+    return pipeline
+
+def result(search_type: str, document: dict) -> dict:
+    # Sin redondear: el cursor compara con la relevancia exacta que calcula MongoDB
+    return {"type": search_type, "score": document.pop("score"), "document": document}
+
+def result_order(item: dict) -> tuple:
+    return (-item["score"], SEARCH_TYPES.index(item["type"]), item["document"]["_id"])
+
+async def text_search(db, q: str, types: Iterable[str], limit: int, after: Optional[str] = None,
+                      project_ids: Iterable[str] = ()) -> Tuple[list, Optional[str]]:
+    """Resultados de una página de la búsqueda de texto y el cursor de la siguiente (o None)"""
+    cursor = None
+    if after:
+        score, after_type, after_id = decode_cursor(after, 3)
+        if after_type not in SEARCH_TYPES:
+            raise ValueError("Cursor de búsqueda inválido")
+        cursor = (score, after_type, after_id)
+
+    items = []
+    for search_type in types:
+        pipeline = text_pipeline(search_type, q, base_filter(search_type, project_ids), limit, cursor)
+        documents = await db[search_type].aggregate(pipeline).to_list(limit + 1)
+        items.extend(result(search_type, document) for document in documents)
+
+    items.sort(key=result_order)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([last["score"], last["type"], last["document"]["_id"]])
+    return items, next_cursor
+
+def prefix_score(q: str, value) -> float:
+    """Proporción del valor que cubre el prefijo: 1.0 si coincide entero"""
+    return round(len(q) / len(value), 4) if isinstance(value, str) and value else 0.0
+
+async def prefix_search(db, q: str, types: Iterable[str], limit: int,
+                        project_ids: Iterable[str] = ()) -> list:
+    """Sugerencias de autocompletado: valores que empiezan por `q`, sin distinguir mayúsculas ni acentos"""
+    items = []
+    for search_type in types:
+        found = {}
+        for field in PREFIX_FIELDS[search_type]:
+            query = {**base_filter(search_type, project_ids), field: {"$gte": q, "$lt": q + PREFIX_END}}
+            cursor = db[search_type].find(
+                query, RESULT_FIELDS[search_type],
+                collation=SEARCH_COLLATION, sort=[(field, 1)], limit=limit
+            )
+            async for document in cursor:
+                score = prefix_score(q, document.get(field))
+                previous = found.get(document["_id"])
+                if previous is None or previous["score"] < score:
+                    found[document["_id"]] = {"type": search_type, "score": score, "document": document}
+        items.extend(found.values())
+    items.sort(key=result_order)
+    return items[:limit]
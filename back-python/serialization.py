@@ -0,0 +1,39 @@
+"""
+Codificación JSON de documentos de MongoDB directamente a bytes con orjson.
+
+`ObjectId` se escribe como texto y las fechas en ISO 8601 (igual que
+`datetime.isoformat()`), así que los documentos leídos de la base de datos se
+pueden devolver tal cual: sin `jsonable_encoder`, sin validar contra un
+modelo de respuesta y sin reescribir cada documento en Python para convertir
+sus ids.
+"""
+
+from typing import Any, Mapping, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse, Response
+
+MEDIA_TYPE = "application/json"
+
+def mongo_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+def encode_json(content: Any) -> bytes:
+    return orjson.dumps(content, default=mongo_default)
+
+class MongoJSONResponse(JSONResponse):
+    """Respuesta por defecto de la API: orjson con soporte de ObjectId y datetime"""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Devuelve `content` sin pasar por `jsonable_encoder` ni por el `response_model` del endpoint"""
+    return MongoJSONResponse(content, headers=dict(headers or {}))
+
+def encoded_response(body: bytes, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Respuesta con un cuerpo ya codificado (por ejemplo, guardado en la caché)"""
+    return Response(content=body, media_type=MEDIA_TYPE, headers=dict(headers or {}))
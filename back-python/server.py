@@ -0,0 +1,97 @@
+"""
+Servidor de producción: uvicorn con varios workers, configurado desde
+`config.Settings`.
+
+    python server.py
+
+- `WORKERS` procesos (0 = uno por núcleo) que comparten el socket; cada uno
+  tiene su propio pool de MongoDB, caché y suscriptores SSE.
+- `SERVER_LOOP` / `SERVER_HTTP`: "auto" usa uvloop y httptools si están
+  instalados (`pip install uvloop httptools`) y asyncio y h11 si no; con
+  "uvloop" o "httptools" explícitos el arranque falla si faltan.
+- Cada worker crea el cliente de MongoDB sin esperar a la red y lo calienta
+  en el lifespan (ping e índices) durante `STARTUP_WARMUP_SECONDS` como
+  mucho: con MongoDB caído el worker arranca igual, responde 503 y sigue
+  reintentando en segundo plano.
+- Apagado ordenado: con SIGTERM cada worker deja de aceptar conexiones,
+  cierra los streams SSE (los navegadores se reconectan a otro worker) y
+  espera a las peticiones en curso hasta `GRACEFUL_SHUTDOWN_SECONDS`.
+"""
+
+import importlib.util
+import os
+import sys
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from config import settings
+
+LOOPS = ("auto", "asyncio", "uvloop")
+HTTP_PARSERS = ("auto", "h11", "httptools")
+
+def worker_count() -> int:
+    return settings.WORKERS if settings.WORKERS > 0 else (os.cpu_count() or 1)
+
+def resolve_option(name: str, value: str, choices: tuple, optional_module: str) -> str:
+    """Valor efectivo de SERVER_LOOP / SERVER_HTTP; "auto" elige el módulo opcional si está instalado"""
+    if value not in choices:
+        raise SystemExit(f"{name} debe ser uno de {', '.join(choices)}: {value!r}")
+    installed = importlib.util.find_spec(optional_module) is not None
+    if value == "auto":
+        return optional_module if installed else choices[1]
+    if value == optional_module and not installed:
+        raise SystemExit(f"{name}={value} necesita el paquete {optional_module}: pip install {optional_module}")
+    return value
+
+def process_memory_kb(pid="self") -> dict:
+    """Memoria residente actual (`rss_kb`) y máxima (`peak_rss_kb`) de un proceso; vacío fuera de Linux"""
+    fields = {"VmRSS:": "rss_kb", "VmHWM:": "peak_rss_kb"}
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                key = line.split(None, 1)[0]
+                if key in fields:
+                    memory[fields[key]] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+class DrainingServer(uvicorn.Server):
+    """Servidor de uvicorn que, antes de esperar a las conexiones abiertas, cierra los streams SSE"""
+
+    async def shutdown(self, sockets=None) -> None:
+        # La aplicación ya está importada en este worker (uvicorn la cargó como "main:app")
+        main = sys.modules.get("main")
+        if main is not None:
+            main.begin_drain()
+        await super().shutdown(sockets=sockets)
+
+def build_config() -> uvicorn.Config:
+    return uvicorn.Config(
+        "main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=worker_count(),
+        loop=resolve_option("SERVER_LOOP", settings.SERVER_LOOP, LOOPS, "uvloop"),
+        http=resolve_option("SERVER_HTTP", settings.SERVER_HTTP, HTTP_PARSERS, "httptools"),
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        proxy_headers=True,
+    )
+
+def run() -> None:
+    config = build_config()
+    server = DrainingServer(config)
+    print(f"🏭 {config.workers} workers en {config.host}:{config.port} "
+          f"(loop {config.loop}, http {config.http})")
+    if config.workers > 1:
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+if __name__ == "__main__":
+    run()
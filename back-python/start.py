@@ -7,6 +7,9 @@ import sys
 import subprocess
 import os
 
+BENCHMARK_BASELINE = os.path.join("benchmarks", "baseline.json")
+BENCHMARK_RESULT = os.path.join("benchmarks", "last_run.json")
+
 def print_banner():
     print("=" * 60)
     print("🚀 Backend Python - Gestión de Proyectos")
@@ -20,6 +23,11 @@ def print_menu():
     print("4. 📚 Ver documentación de la API")
     print("5. 🏥 Verificar estado de salud")
     print("6. 📦 Instalar dependencias")
+    print("7. 🔢 Reconstruir contadores de tareas")
+    print("8. 🔎 Verificar índices y planes de consulta")
+    print("9. 📊 Reconstruir agregados de reportes")
+    print("10. ⏱️  Ejecutar benchmark de la API")
+    print("11. 🏭 Ejecutar servidor de producción")
     print("0. ❌ Salir")
     print("-" * 60)
 
@@ -53,6 +61,14 @@ def run_reload_server():
     except KeyboardInterrupt:
         print("\n🛑 Servidor detenido")
 
+def run_production_server():
+    """Varios workers según WORKERS y el resto de ajustes del servidor en config.py"""
+    print("🏭 Iniciando servidor de producción...")
+    try:
+        subprocess.run([sys.executable, "server.py"])
+    except KeyboardInterrupt:
+        print("\n🛑 Servidor detenido")
+
 def init_database():
     print("🗄️ Inicializando base de datos...")
     try:
@@ -60,6 +76,42 @@ def init_database():
     except subprocess.CalledProcessError as e:
         print(f"❌ Error inicializando base de datos: {e}")
 
+def rebuild_counters():
+    print("🔢 Reconstruyendo contadores de tareas...")
+    try:
+        subprocess.run([sys.executable, "init_db.py", "--rebuild-counters"], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Error reconstruyendo contadores: {e}")
+
+def check_indexes():
+    print("🔎 Verificando índices y planes de consulta...")
+    try:
+        subprocess.run([sys.executable, "init_db.py", "--check-indexes"], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Hay consultas sin índice: {e}")
+
+def rebuild_rollups():
+    print("📊 Reconstruyendo agregados de reportes...")
+    try:
+        subprocess.run([sys.executable, "init_db.py", "--rebuild-rollups"], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Error reconstruyendo agregados: {e}")
+
+def run_benchmark():
+    """Benchmark de todos los endpoints; la primera ejecución queda como baseline de las siguientes"""
+    print("⏱️ Ejecutando benchmark de la API...")
+    command = [sys.executable, "-m", "benchmarks.api", "--output", BENCHMARK_RESULT]
+    if os.path.exists(BENCHMARK_BASELINE):
+        command.extend(["--baseline", BENCHMARK_BASELINE])
+    else:
+        print(f"📌 No hay baseline: el resultado se guardará en {BENCHMARK_BASELINE}")
+        command.extend(["--save-baseline", BENCHMARK_BASELINE])
+    try:
+        subprocess.run(command, check=True)
+        print(f"✅ Resultado guardado en {BENCHMARK_RESULT}")
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Error ejecutando el benchmark: {e}")
+
 def show_documentation():
     print("📚 Documentación de la API:")
     print("   • Swagger UI: http://localhost:8000/docs")
@@ -121,6 +173,16 @@ def main():
                 health_check()
             elif choice == "6":
                 install_dependencies()
+            elif choice == "7":
+                rebuild_counters()
+            elif choice == "8":
+                check_indexes()
+            elif choice == "9":
+                rebuild_rollups()
+            elif choice == "10":
+                run_benchmark()
+            elif choice == "11":
+                run_production_server()
             else:
                 print("❌ Opción no válida. Intenta de nuevo.")
                 
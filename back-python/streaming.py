@@ -0,0 +1,63 @@
+"""
+Respuestas en streaming para exportaciones masivas.
+
+Los documentos se leen del cursor de la base de datos y se escriben a medida
+que llegan, como NDJSON (un documento por línea) o como un array JSON enviado
+por trozos, sin construir nunca la lista completa ni un único cuerpo JSON en
+memoria.
+"""
+
+from typing import AsyncIterable, AsyncIterator, Callable
+
+from fastapi.responses import StreamingResponse
+
+from serialization import encode_json
+
+EXPORT_BATCH_SIZE = 1000
+# Documentos agrupados en cada escritura al socket
+CHUNK_DOCUMENTS = 200
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+def encode_document(document: dict) -> bytes:
+    return encode_json(document)
+
+async def batched(documents: AsyncIterable, size: int) -> AsyncIterator[list]:
+    batch = []
+    async for document in documents:
+        batch.append(document)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def ndjson_chunks(documents: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    async for batch in batched(documents, CHUNK_DOCUMENTS):
+        yield b"".join(encode_document(document) + b"\n" for document in batch)
+
+async def json_array_chunks(documents: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    yield b"["
+    separator = b""
+    async for batch in batched(documents, CHUNK_DOCUMENTS):
+        yield separator + b",".join(encode_document(document) for document in batch)
+        separator = b","
+    yield b"]"
+
+async def transformed(documents: AsyncIterable[dict], transform: Callable[[dict], dict]) -> AsyncIterator[dict]:
+    async for document in documents:
+        yield transform(document)
+
+def stream_documents(
+    documents: AsyncIterable[dict],
+    format: str = "ndjson",
+    transform: Callable[[dict], dict] = None
+) -> StreamingResponse:
+    """Construye un StreamingResponse a partir de un cursor o generador asíncrono."""
+    if transform is not None:
+        documents = transformed(documents, transform)
+    chunks = ndjson_chunks(documents) if format == "ndjson" else json_array_chunks(documents)
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format])
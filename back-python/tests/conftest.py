@@ -0,0 +1,43 @@
+"""
+Fixtures comunes de las pruebas.
+
+Las pruebas corren sobre mongomock en memoria: la base de datos síncrona se
+usa para las comprobaciones (`verify_project_counters`, `verify_rollups`) y
+la misma envuelta en `SyncDatabase` para los repositorios, igual que el
+servidor de `benchmarks.api --stand-in`.
+"""
+
+import mongomock
+import pytest
+
+from database import SyncDatabase
+from repositories import Repositories
+
+@pytest.fixture
+def mongo():
+    client = mongomock.MongoClient()
+    yield client["gestion_proyectos_test"]
+    client.close()
+
+@pytest.fixture
+def repositories(mongo):
+    return Repositories(SyncDatabase(mongo))
+
+@pytest.fixture
+def api(mongo, monkeypatch):
+    """Cliente HTTP de la API sobre `mongo`, con la caché y los sellos de versión vacíos"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    def connect():
+        main.database.client = mongo.client
+        main.database.db = SyncDatabase(mongo)
+
+    # mongomock no admite change streams: la invalidación es la local de cada escritura
+    monkeypatch.setattr(main.settings, "CHANGE_STREAMS_ENABLED", False)
+    monkeypatch.setattr(main.database, "connect", connect)
+    main.response_cache.clear()
+    main.version_stamps.bump_all()
+    with TestClient(main.app) as client:
+        yield client
@@ -0,0 +1,68 @@
+"""
+Escrituras de tareas al azar para comprobar el estado derivado (contadores y
+agregados) contra un recálculo completo.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+ESTADOS = ("pendiente", "en_progreso", "completada")
+PRIORIDADES = ("baja", "media", "alta")
+
+def random_task(rng: random.Random, project_ids: list) -> dict:
+    return {
+        "descripcion": f"Tarea {rng.randrange(10 ** 6)}",
+        "prioridad": rng.choice(PRIORIDADES),
+        "estado": rng.choice(ESTADOS),
+        "completada": rng.random() < 0.3,
+        "usuario": rng.choice([None, "ana@example.com", "luis@example.com"]),
+        "project_id": rng.choice(project_ids),
+        "fecha_limite": rng.choice([None, "2024-01-15", "2030-06-01"]),
+        "creada_en": datetime(2024, 1, 1) + timedelta(hours=rng.randrange(24 * 90))
+    }
+
+def random_fields(rng: random.Random, project_ids: list) -> dict:
+    """Campos de un PATCH: a veces mueve la tarea de proyecto o cambia `completada`"""
+    choices = {
+        "completada": rng.random() < 0.5,
+        "estado": rng.choice(ESTADOS),
+        "prioridad": rng.choice(PRIORIDADES),
+        "project_id": rng.choice(project_ids),
+        "usuario": rng.choice([None, "ana@example.com"]),
+        "descripcion": "Editada",
+    }
+    fields = rng.sample(sorted(choices), rng.randint(1, 3))
+    return {field: choices[field] for field in fields}
+
+async def random_writes(repositories, rng: random.Random, project_ids: list, operations: int) -> list:
+    """Creaciones, PUT, PATCH, borrados y lotes al azar a través de los repositorios"""
+    task_ids = []
+    for _ in range(operations):
+        operation = rng.choice(("create", "replace", "patch", "delete", "create_many", "update_many"))
+        if operation == "create" or not task_ids:
+            task_ids.append(await repositories.tasks.create(random_task(rng, project_ids)))
+        elif operation == "replace":
+            task = random_task(rng, project_ids)
+            del task["creada_en"]
+            await repositories.tasks.replace(rng.choice(task_ids), task)
+        elif operation == "patch":
+            await repositories.tasks.patch(rng.choice(task_ids), random_fields(rng, project_ids))
+        elif operation == "delete":
+            await repositories.tasks.delete(task_ids.pop(rng.randrange(len(task_ids))))
+        elif operation == "create_many":
+            tasks = [random_task(rng, project_ids) for _ in range(rng.randint(1, 10))]
+            await repositories.tasks.create_many(tasks)
+            task_ids.extend(task["_id"] for task in tasks)
+        else:
+            chosen = rng.sample(task_ids, min(len(task_ids), rng.randint(1, 10)))
+            # Incluye ids repetidos e inexistentes, que el lote rechaza por elemento
+            chosen += [chosen[0], ObjectId()]
+            await repositories.tasks.update_many([
+                (task_id, random_fields(rng, project_ids), None) for task_id in chosen
+            ])
+    return task_ids
+
+async def create_projects(repositories, count: int) -> list:
+    return [str(await repositories.projects.create({"name": f"Proyecto {i}"})) for i in range(count)]
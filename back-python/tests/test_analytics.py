@@ -0,0 +1,33 @@
+import asyncio
+
+import analytics
+import main
+from analytics import AnalyticsEngine, TaskFrame
+
+def test_frame_is_reused_until_max_age(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(analytics.time, "monotonic", lambda: now[0])
+    engine = AnalyticsEngine(max_age_seconds=60)
+
+    async def load():
+        return TaskFrame.from_documents([])
+
+    first = asyncio.run(engine.frame(load))
+    now[0] += 59
+    assert asyncio.run(engine.frame(load)) is first
+    now[0] += 1
+    assert asyncio.run(engine.frame(load)) is not first
+    assert engine.loads == 2
+
+def test_task_writes_do_not_reload_the_frame(api, mongo):
+    api.post("/api/projects", json={"name": "Web", "description": "-"})
+    project_id = str(mongo.projects.find_one({})["_id"])
+    main.analytics.invalidate()
+    assert api.get("/api/reports/burndown").status_code == 200
+    loads = main.analytics.loads
+
+    for i in range(3):
+        api.post("/api/tasks", json={"descripcion": f"Tarea {i}", "project_id": project_id})
+        assert api.get("/api/reports/throughput").status_code == 200
+
+    assert main.analytics.loads == loads
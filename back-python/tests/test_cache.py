@@ -0,0 +1,93 @@
+import pytest
+
+import main
+
+CACHED_ROUTES = ("/api/projects", "/api/users/simple", "/api/reports/project-stats")
+
+def uncached(api, path: str) -> bytes:
+    main.response_cache.enabled = False
+    try:
+        response = api.get(path)
+    finally:
+        main.response_cache.enabled = True
+    assert response.status_code == 200
+    return response.content
+
+def cached(api, path: str) -> bytes:
+    response = api.get(path)
+    assert response.status_code == 200
+    return response.content
+
+def assert_fresh(api):
+    """Cada ruta en caché devuelve exactamente los mismos bytes que sin caché"""
+    for path in CACHED_ROUTES:
+        assert cached(api, path) == uncached(api, path), path
+
+@pytest.fixture
+def seeded(api):
+    project = api.post("/api/projects", json={"name": "Web", "description": "Sitio"}).json()["_id"]
+    other = api.post("/api/projects", json={"name": "App", "description": "Móvil"}).json()["_id"]
+    user = api.post("/api/users", json={"name": "Ana", "email": "ana@example.com"}).json()["_id"]
+    task = api.post("/api/tasks", json={
+        "descripcion": "Diseño", "project_id": project, "usuario": "ana@example.com", "fecha_limite": "2024-01-01"
+    }).json()
+    return {"project": project, "other": other, "user": user, "task": task["_id"]}
+
+def test_cached_payloads_match_uncached(api, seeded):
+    for path in CACHED_ROUTES:
+        first = cached(api, path)
+        hits = main.response_cache.hits
+        assert cached(api, path) == first
+        assert main.response_cache.hits == hits + 1, path
+        assert first == uncached(api, path), path
+
+WRITES = {
+    "create_project": lambda api, ids: api.post("/api/projects", json={"name": "Nuevo", "description": "-"}),
+    "update_project": lambda api, ids: api.put(f"/api/projects/{ids['project']}", json={"name": "Web 2", "description": "-"}),
+    "patch_project": lambda api, ids: api.patch(f"/api/projects/{ids['project']}", json={"status": "Pausado"}),
+    "delete_project": lambda api, ids: api.delete(f"/api/projects/{ids['other']}"),
+    "create_task": lambda api, ids: api.post("/api/tasks", json={"descripcion": "Otra", "project_id": ids["project"]}),
+    "update_task": lambda api, ids: api.put(f"/api/tasks/{ids['task']}", json={
+        "descripcion": "Diseño", "project_id": ids["other"], "completada": True
+    }),
+    "patch_task": lambda api, ids: api.patch(f"/api/tasks/{ids['task']}", json={"completada": True, "estado": "completada"}),
+    "delete_task": lambda api, ids: api.delete(f"/api/tasks/{ids['task']}"),
+    "create_tasks_bulk": lambda api, ids: api.post("/api/tasks/bulk", json=[
+        {"descripcion": "Lote", "project_id": ids["project"], "prioridad": "alta"}
+    ]),
+    "update_tasks_bulk": lambda api, ids: api.patch("/api/tasks/bulk", json=[
+        {"id": ids["task"], "usuario": "luis@example.com"}
+    ]),
+    "create_user": lambda api, ids: api.post("/api/users", json={"name": "Luis", "email": "luis@example.com"}),
+    "create_users_bulk": lambda api, ids: api.post("/api/users/bulk", json=[{"name": "Eva", "email": "eva@example.com"}]),
+    "update_user": lambda api, ids: api.put(f"/api/users/{ids['user']}", json={"name": "Ana B", "email": "ana@example.com"}),
+    "patch_user": lambda api, ids: api.patch(f"/api/users/{ids['user']}", json={"email": "ana.b@example.com"}),
+    "delete_user": lambda api, ids: api.delete(f"/api/users/{ids['user']}"),
+}
+
+@pytest.mark.parametrize("write", sorted(WRITES))
+def test_write_invalidates_cached_payloads(api, seeded, write):
+    before = {path: cached(api, path) for path in CACHED_ROUTES}
+
+    response = WRITES[write](api, seeded)
+
+    assert response.status_code < 300, response.text
+    after = {path: cached(api, path) for path in CACHED_ROUTES}
+    # La escritura cambia al menos una de las respuestas, y ninguna se sirve obsoleta
+    assert after != before
+    assert_fresh(api)
+
+@pytest.mark.parametrize("path", ["/api/users/simple", "/api/reports/project-stats"])
+def test_cached_payloads_are_compressed_once(api, path):
+    for i in range(30):
+        api.post("/api/projects", json={"name": f"Proyecto {i}", "description": "-"})
+    api.post("/api/users/bulk", json=[{"name": f"Usuario {i}", "email": f"u{i}@example.com"} for i in range(30)])
+    gzip = {"Accept-Encoding": "gzip"}
+
+    first = api.get(path, headers=gzip)
+    second = api.get(path, headers=gzip)
+
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert first.content == second.content == uncached(api, path)
+    stats = main.compressor.stats()["routes"][f"GET {path}"]
+    assert stats["from_cache"] >= 1
@@ -0,0 +1,256 @@
+"""
+`ChangeListener` contra un change stream simulado con un guion de eventos y
+errores, y contra un replica set real cuando se indica uno en
+`TEST_MONGODB_URI` (sin esa variable, esa prueba se omite).
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from changes import LISTENING, RECONNECTING, STARTING, UNAVAILABLE, ChangeListener
+
+TEST_MONGODB_URI = os.getenv("TEST_MONGODB_URI")
+
+class FakeStream:
+    """Devuelve en orden los elementos del guion: eventos, `None` (sin cambios) o excepciones que lanza"""
+
+    def __init__(self, script: list):
+        self.script = list(script)
+        self.resume_token = None
+        self.closed = False
+
+    async def try_next(self):
+        await asyncio.sleep(0)
+        if not self.script:
+            return None
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        if item is not None:
+            self.resume_token = item["_id"]
+        return item
+
+    async def close(self):
+        self.closed = True
+
+class FakeDatabase:
+    """Abre un `FakeStream` por cada `watch`, con el siguiente guion de `streams`"""
+
+    def __init__(self, *streams: list, coll_mod_error: Exception = None):
+        self.streams = list(streams)
+        self.coll_mod_error = coll_mod_error
+        self.watches = []
+
+    def watch(self, pipeline, **options):
+        self.watches.append(options)
+        return FakeStream(self.streams.pop(0) if self.streams else [])
+
+    async def command(self, *args, **kwargs):
+        if self.coll_mod_error is not None:
+            raise self.coll_mod_error
+
+def task_insert(token: str, project_id: str) -> dict:
+    task_id = ObjectId()
+    return {
+        "_id": {"_data": token},
+        "operationType": "insert",
+        "ns": {"db": "test", "coll": "tasks"},
+        "documentKey": {"_id": task_id},
+        "fullDocument": {"_id": task_id, "project_id": project_id},
+    }
+
+def task_delete_without_pre_image(token: str) -> dict:
+    return {
+        "_id": {"_data": token},
+        "operationType": "delete",
+        "ns": {"db": "test", "coll": "tasks"},
+        "documentKey": {"_id": ObjectId()},
+    }
+
+class Recorder:
+    def __init__(self):
+        self.scopes = []
+        self.resets = 0
+        self.events = []
+
+    def listener(self, db, **options) -> ChangeListener:
+        return ChangeListener(
+            db,
+            on_change=lambda *scopes: self.scopes.append(sorted(scopes)),
+            on_reset=self.reset,
+            on_event=self.events.append,
+            retry_seconds=options.pop("retry_seconds", 0.01),
+            reconnect_seconds=0,
+            **options
+        )
+
+    def reset(self):
+        self.resets += 1
+
+def run_until(listener: ChangeListener, condition, timeout: float = 2.0) -> None:
+    async def scenario():
+        listener.start()
+        deadline = time.monotonic() + timeout
+        try:
+            while not condition():
+                assert time.monotonic() < deadline, f"condición no alcanzada (estado {listener.state})"
+                await asyncio.sleep(0.001)
+        finally:
+            await listener.stop()
+
+    asyncio.run(scenario())
+
+def test_resumes_from_last_token_after_disconnect():
+    recorder = Recorder()
+    db = FakeDatabase([task_insert("t1", "p1"), AutoReconnect("conexión cerrada")], [task_insert("t2", "p2")])
+    listener = recorder.listener(db)
+
+    run_until(listener, lambda: len(recorder.scopes) == 2)
+
+    assert db.watches[1]["resume_after"] == {"_data": "t1"}
+    assert recorder.scopes == [
+        ["project:p1", "projects", "tasks:p1"],
+        ["project:p2", "projects", "tasks:p2"],
+    ]
+    assert recorder.resets == 0
+    assert [event["_id"]["_data"] for event in recorder.events] == ["t1", "t2"]
+
+def test_history_lost_resets_derived_state():
+    recorder = Recorder()
+    db = FakeDatabase(
+        [task_insert("t1", "p1"), OperationFailure("resume token perdido", code=286)],
+        [task_insert("t2", "p1")]
+    )
+    listener = recorder.listener(db)
+
+    run_until(listener, lambda: len(recorder.scopes) == 2)
+
+    assert "resume_after" not in db.watches[1]
+    assert recorder.resets == 1
+    assert listener.stats()["resets"] == 1
+
+def test_falls_back_without_pre_images_before_mongodb_6():
+    recorder = Recorder()
+    db = FakeDatabase(
+        [OperationFailure("campo desconocido fullDocumentBeforeChange", code=40415)],
+        [task_delete_without_pre_image("t1")]
+    )
+    listener = recorder.listener(db)
+
+    run_until(listener, lambda: listener.events == 1)
+
+    assert db.watches[0]["full_document_before_change"] == "whenAvailable"
+    assert "full_document_before_change" not in db.watches[1]
+    assert listener.pre_images is False
+    # Sin imagen previa no se sabe el proyecto de la tarea borrada: se descarta todo
+    assert recorder.scopes == []
+    assert recorder.resets >= 1
+
+def test_pre_images_disabled_when_coll_mod_fails():
+    recorder = Recorder()
+    db = FakeDatabase([task_insert("t1", "p1")], coll_mod_error=OperationFailure("no autorizado", code=13))
+    listener = recorder.listener(db)
+
+    run_until(listener, lambda: recorder.scopes)
+
+    assert listener.pre_images is False
+    assert "full_document_before_change" not in db.watches[0]
+
+def test_unavailable_on_standalone_server_and_retries():
+    recorder = Recorder()
+    db = FakeDatabase(
+        [OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)],
+        [OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)],
+        [task_insert("t1", "p1")]
+    )
+    listener = recorder.listener(db)
+    states = []
+    original_unavailable = listener._unavailable
+
+    def unavailable(error):
+        original_unavailable(error)
+        states.append(listener.state)
+
+    listener._unavailable = unavailable
+
+    run_until(listener, lambda: recorder.scopes)
+
+    assert states == [UNAVAILABLE, UNAVAILABLE]
+    assert len(db.watches) == 3
+    assert listener.stats()["last_error"] is None
+
+def test_state_goes_through_reconnecting():
+    recorder = Recorder()
+    db = FakeDatabase([task_insert("t1", "p1"), AutoReconnect("caída")], [None])
+    listener = recorder.listener(db)
+    states = []
+    watch = db.watch
+
+    def recording_watch(pipeline, **options):
+        states.append(listener.state)
+        return watch(pipeline, **options)
+
+    db.watch = recording_watch
+
+    run_until(listener, lambda: len(db.watches) == 2 and listener.state == LISTENING)
+
+    assert states == [STARTING, RECONNECTING]
+    assert listener.last_error is None
+
+def replica_set_name():
+    """Nombre del replica set de `TEST_MONGODB_URI`, o `None` si es un servidor standalone"""
+    from pymongo import MongoClient
+
+    client = MongoClient(TEST_MONGODB_URI, serverSelectionTimeoutMS=5000)
+    try:
+        return client.admin.command("hello").get("setName")
+    finally:
+        client.close()
+
+@pytest.mark.skipif(not TEST_MONGODB_URI, reason="TEST_MONGODB_URI no está definida")
+def test_listener_against_replica_set():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    # Con la variable definida la prueba se ejecuta siempre: un servidor caído
+    # o standalone es un fallo, no un motivo para omitirla
+    assert replica_set_name(), f"{TEST_MONGODB_URI} no es un replica set"
+    recorder = Recorder()
+
+    async def scenario():
+        client = AsyncIOMotorClient(TEST_MONGODB_URI)
+        db = client["gestion_proyectos_test_changes"]
+        await client.drop_database(db.name)
+        listener = recorder.listener(db, retry_seconds=1)
+        listener.start()
+        try:
+            deadline = time.monotonic() + 10
+            while listener.state != LISTENING:
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.05)
+            project_id = (await db.projects.insert_one({"name": "Web"})).inserted_id
+            task_id = (await db.tasks.insert_one({"project_id": str(project_id)})).inserted_id
+            await db.tasks.delete_one({"_id": task_id})
+            while len(recorder.events) < 3:
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.05)
+        finally:
+            await listener.stop()
+            await client.drop_database(db.name)
+            client.close()
+        return str(project_id), listener.pre_images
+
+    project_id, pre_images = asyncio.run(scenario())
+
+    task_scopes = ["project:" + project_id, "projects", "tasks:" + project_id]
+    assert recorder.scopes[0] == ["project:" + project_id, "projects"]
+    assert recorder.scopes[1] == task_scopes
+    if pre_images:
+        # MongoDB 6.0+: el borrado trae la imagen previa y se sabe su proyecto
+        assert recorder.scopes[2] == task_scopes
+    else:
+        assert recorder.resets >= 1
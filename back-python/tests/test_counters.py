@@ -0,0 +1,41 @@
+import asyncio
+import random
+
+from bson import ObjectId
+
+from counters import verify_project_counters
+from random_writes import create_projects, random_task, random_writes
+
+def test_counters_match_recount_after_random_writes(mongo, repositories):
+    rng = random.Random(7)
+
+    async def scenario():
+        project_ids = await create_projects(repositories, 4)
+        await random_writes(repositories, rng, project_ids, 400)
+
+    asyncio.run(scenario())
+
+    assert mongo.tasks.count_documents({}) > 0
+    assert verify_project_counters(mongo) == []
+
+def test_counters_follow_tasks_moved_between_projects(mongo, repositories):
+    async def scenario():
+        source, target = await create_projects(repositories, 2)
+        task_id = await repositories.tasks.create(random_task(random.Random(1), [source]))
+        await repositories.tasks.patch(task_id, {"project_id": target, "completada": True})
+        return source, target
+
+    source, target = asyncio.run(scenario())
+
+    assert mongo.projects.find_one({"_id": ObjectId(source)})["total"] == 0
+    assert mongo.projects.find_one({"_id": ObjectId(target)})["completadas"] == 1
+    assert verify_project_counters(mongo) == []
+
+def test_verify_reports_drifted_counters(mongo, repositories):
+    project_id = asyncio.run(create_projects(repositories, 1))[0]
+    mongo.projects.update_one({"_id": ObjectId(project_id)}, {"$set": {"total": 3}})
+
+    mismatches = verify_project_counters(mongo)
+
+    assert [mismatch["project_id"] for mismatch in mismatches] == [project_id]
+    assert mismatches[0]["expected"] == {"total": 0, "completadas": 0, "pendientes": 0}
@@ -0,0 +1,36 @@
+import asyncio
+
+from bson import ObjectId
+
+from jobs import JobRunner
+from metrics import Metrics, RequestStats, _current_request
+
+def test_deletion_job_commands_are_not_attributed_to_the_request(repositories, mongo):
+    project_id = mongo.projects.insert_one({"name": "Web"}).inserted_id
+    mongo.tasks.insert_many([{"descripcion": f"Tarea {i}", "project_id": str(project_id)} for i in range(5)])
+    metrics = Metrics()
+    delete_chunk = repositories.tasks.delete_chunk
+
+    async def recorded_delete_chunk(*args):
+        # Lo que hace `CommandMetrics`: el listener corre en el contexto de quien lanza el comando
+        metrics.record_command("delete", 0.001, 0)
+        return await delete_chunk(*args)
+
+    repositories.tasks.delete_chunk = recorded_delete_chunk
+    runner = JobRunner(repositories, chunk_size=2)
+    request = RequestStats()
+
+    async def scenario():
+        # La petición DELETE programa el trabajo y responde sin esperarlo
+        token = _current_request.set(request)
+        try:
+            await runner.delete_project(str(project_id))
+        finally:
+            _current_request.reset(token)
+        await asyncio.gather(*runner._tasks)
+
+    asyncio.run(scenario())
+
+    assert mongo.tasks.count_documents({}) == 0
+    assert metrics.commands.count("delete") >= 3
+    assert request.commands == 0
@@ -0,0 +1,21 @@
+"""
+Un id que no existe responde 404 en los handlers de escritura, no el 500 del
+`except Exception` que envuelve a cada uno.
+"""
+
+import pytest
+from bson import ObjectId
+
+PROJECT = {"name": "Web", "description": "-"}
+USER = {"name": "Ana", "email": "ana@example.com"}
+
+@pytest.mark.parametrize("method, path, body", [
+    ("PUT", "/api/projects/{id}", PROJECT),
+    ("DELETE", "/api/tasks/{id}", None),
+    ("PUT", "/api/users/{id}", USER),
+    ("DELETE", "/api/users/{id}", None),
+])
+def test_write_handlers_return_404_for_unknown_ids(api, method, path, body):
+    response = api.request(method, path.format(id=ObjectId()), json=body)
+
+    assert response.status_code == 404
@@ -0,0 +1,31 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from pagination import keyset_filter
+
+def test_keyset_filter_after_null_sort_key():
+    assert keyset_filter(["creada_en", "_id"], [None, 5]) == {"$or": [
+        {"creada_en": {"$ne": None}},
+        {"creada_en": None, "_id": {"$gt": 5}}
+    ]}
+
+def test_task_pages_cover_tasks_without_creada_en(mongo, repositories):
+    created = datetime(2024, 1, 1)
+    mongo.tasks.insert_many(
+        [{"project_id": "p", "descripcion": f"Legacy {i}"} for i in range(3)]
+        + [{"project_id": "p", "descripcion": f"Nula {i}", "creada_en": None} for i in range(2)]
+        + [{"project_id": "p", "descripcion": f"Tarea {i}", "creada_en": created + timedelta(days=i)} for i in range(5)]
+    )
+
+    async def all_pages():
+        seen, after = [], None
+        while True:
+            tasks, after = await repositories.tasks.page({"project_id": "p"}, 2, after)
+            seen.extend(task["_id"] for task in tasks)
+            if after is None:
+                return seen
+
+    seen = asyncio.run(all_pages())
+
+    assert len(seen) == len(set(seen)) == 10
+    assert set(seen) == {task["_id"] for task in mongo.tasks.find({})}
@@ -0,0 +1,52 @@
+import asyncio
+
+from bson import ObjectId
+
+def test_task_writes_reject_projects_being_deleted(api, mongo, repositories):
+    api.post("/api/projects", json={"name": "Web", "description": "-"})
+    api.post("/api/projects", json={"name": "Viejo", "description": "-"})
+    visible, deleting = [str(project["_id"]) for project in mongo.projects.find({}, {"_id": 1})]
+    task_id = api.post("/api/tasks", json={"descripcion": "Diseño", "project_id": visible}).json()["_id"]
+    # Borrado en curso: el proyecto está marcado pero el trabajo aún no ha terminado
+    assert asyncio.run(repositories.projects.mark_deleting(ObjectId(deleting), ObjectId()))
+
+    new_task = {"descripcion": "Tarde", "project_id": deleting}
+    assert api.post("/api/tasks", json=new_task).status_code == 404
+    assert api.put(f"/api/tasks/{task_id}", json=new_task).status_code == 404
+    assert api.patch(f"/api/tasks/{task_id}", json={"project_id": deleting}).status_code == 404
+
+    created = api.post("/api/tasks/bulk", json=[new_task, {"descripcion": "Bien", "project_id": visible}]).json()
+    assert created["inserted"] == 1
+    assert created["errors"] == [{"index": 0, "detail": "Proyecto no encontrado"}]
+
+    updated = api.patch("/api/tasks/bulk", json=[{"id": task_id, "project_id": deleting}]).json()
+    assert updated["updated"] == 0
+    assert updated["errors"] == [{"index": 0, "detail": "Proyecto no encontrado"}]
+
+    assert mongo.tasks.count_documents({"project_id": deleting}) == 0
+    assert mongo.task_rollups.count_documents({"project_id": deleting}) == 0
+
+def test_task_writes_reject_unknown_projects(api):
+    response = api.post("/api/tasks", json={"descripcion": "Sin proyecto", "project_id": str(ObjectId())})
+
+    assert response.status_code == 404
+
+def test_tasks_of_projects_being_deleted_are_hidden(api, mongo, repositories):
+    api.post("/api/projects", json={"name": "Web", "description": "-"})
+    api.post("/api/projects", json={"name": "Viejo", "description": "-"})
+    visible, deleting = [str(project["_id"]) for project in mongo.projects.find({}, {"_id": 1})]
+    for project_id in (visible, deleting):
+        api.post("/api/tasks", json={"descripcion": "Diseño", "project_id": project_id})
+    # Listado y exportación en caché antes de marcar el proyecto
+    assert len(api.get(f"/api/projects/{deleting}/tasks").json()) == 1
+    assert asyncio.run(repositories.projects.mark_deleting(ObjectId(deleting), ObjectId()))
+
+    assert api.get(f"/api/projects/{deleting}/tasks").status_code == 404
+    assert api.get(f"/api/projects/{deleting}/tasks", params={"limit": 10}).status_code == 404
+    assert api.get(f"/api/export/projects/{deleting}/tasks").status_code == 404
+
+    # La búsqueda de texto necesita los índices de texto de MongoDB, que mongomock no tiene
+    found = api.get("/api/search", params={"q": "Dis", "mode": "prefix", "types": "tasks"}).json()["items"]
+    assert [item["document"]["project_id"] for item in found] == [visible]
+    only_deleting = {"q": "Dis", "mode": "prefix", "project_id": deleting}
+    assert api.get("/api/search", params=only_deleting).json()["items"] == []
@@ -0,0 +1,43 @@
+from events import deleted_task_event_data, task_event_data
+
+def test_task_has_the_same_shape_in_every_response(api, mongo):
+    project_id = api.post("/api/projects", json={"name": "Web", "description": "-"}).json()["_id"]
+    assert project_id == str(mongo.projects.find_one({})["_id"])
+
+    created = api.post("/api/tasks", json={"descripcion": "Diseño", "project_id": project_id}).json()
+    task_id = created["_id"]
+    replaced = api.put(f"/api/tasks/{task_id}", json={"descripcion": "Diseño", "project_id": project_id}).json()
+    patched = api.patch(f"/api/tasks/{task_id}", json={"completada": True}).json()
+    listed = api.get(f"/api/projects/{project_id}/tasks").json()[0]
+    summary = api.get(f"/api/projects/{project_id}/tasks?view=summary").json()[0]
+    exported = api.get(f"/api/export/projects/{project_id}/tasks", params={"format": "json"}).json()[0]
+    event = task_event_data(mongo.tasks.find_one({}))
+
+    for task in (created, replaced, patched, listed, summary, exported, event):
+        assert task["_id"] == task_id
+        assert "id" not in task
+    assert set(exported) == set(listed) == set(event)
+    assert deleted_task_event_data(mongo.tasks.find_one({})) == {"_id": task_id, "project_id": project_id}
+
+def test_summary_views_keep_what_the_frontend_edits_with(api, mongo):
+    api.post("/api/projects", json={"name": "Web", "description": "-"})
+    project_id = str(mongo.projects.find_one({})["_id"])
+    api.post("/api/tasks", json={"descripcion": "Diseño", "project_id": project_id})
+
+    project = api.get("/api/projects?view=summary").json()[0]
+    task = api.get(f"/api/projects/{project_id}/tasks?view=summary").json()[0]
+    event = task_event_data(mongo.tasks.find_one({}))
+
+    assert {"total", "completadas", "pendientes", "version"} <= set(project)
+    # Las tareas de la lista y las de los eventos SSE conviven en el mismo estado
+    assert {"project_id", "creada_en", "version"} <= set(task) <= set(event)
+
+def test_created_projects_and_users_include_their_id(api, mongo):
+    project = api.post("/api/projects", json={"name": "Web", "description": "-"}).json()
+    replaced = api.put(f"/api/projects/{project['_id']}", json={"name": "Web 2", "description": "-"}).json()
+    user = api.post("/api/users", json={"name": "Ana", "email": "ana@example.com"}).json()
+
+    assert project["_id"] == replaced["_id"] == str(mongo.projects.find_one({})["_id"])
+    assert user["_id"] == str(mongo.users.find_one({})["_id"])
+    for document in (project, replaced, user):
+        assert "id" not in document
@@ -0,0 +1,32 @@
+import versions
+from versions import VersionStamps, etag_matches
+
+import main
+
+def test_etag_changes_with_each_max_age_interval(monkeypatch):
+    stamps = VersionStamps()
+    monkeypatch.setattr(versions.time, "time", lambda: 1000.0)
+    etag = stamps.etag("projects", max_age=5)
+
+    assert stamps.etag("projects", max_age=5) == etag
+    monkeypatch.setattr(versions.time, "time", lambda: 1005.0)
+    assert stamps.etag("projects", max_age=5) != etag
+    assert stamps.etag("projects") == stamps.etag("projects")
+
+def test_validator_expires_after_write_seen_by_another_worker(api, mongo, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(versions.time, "time", lambda: now[0])
+    api.post("/api/users", json={"name": "Ana", "email": "ana@example.com"})
+    etag = api.get("/api/users").headers["etag"]
+    assert api.get("/api/users", headers={"If-None-Match": etag}).status_code == 304
+
+    # Escritura atendida por otro worker: este no incrementa su sello
+    mongo.users.update_one({}, {"$set": {"name": "Ana B"}})
+    now[0] += main.response_cache.ttl("users")
+    # Pasado el TTL también ha caducado la respuesta en caché
+    main.response_cache.clear()
+
+    response = api.get("/api/users", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Ana B"
+    assert not etag_matches(etag, response.headers["etag"])
@@ -0,0 +1,74 @@
+"""
+Sellos de versión para las respuestas condicionales (ETag / If-None-Match).
+
+Cada escritura incrementa un contador monótono y lo registra en los ámbitos
+que modifica ("projects", "project:<id>", "tasks:<id>", "users"). La versión
+de una lectura es el mayor sello de sus ámbitos, así que responder con 304 no
+requiere consultar la base de datos ni serializar el cuerpo.
+
+Los sellos viven en memoria: el ETag incluye un identificador del proceso para
+que un reinicio, u otro worker, nunca produzca un ETag coincidente con datos
+distintos. Un worker no ve las escrituras que atienden los demás si no hay
+change streams (ver `changes.py`); en ese caso el ETag incluye además el
+intervalo de tiempo en curso (`max_age`), de modo que un validador obsoleto
+deja de coincidir como mucho cuando caduca la entrada de la caché.
+"""
+
+import os
+import time
+from typing import Optional
+
+class VersionStamps:
+    def __init__(self):
+        self.epoch = os.urandom(4).hex()
+        self._counter = 0
+        self._versions = {}
+        # Versión mínima de cualquier ámbito, tras cambios de los que no se conocen los ámbitos
+        self._floor = 0
+
+    def bump(self, *scopes: str) -> int:
+        self._counter += 1
+        for scope in scopes:
+            self._versions[scope] = self._counter
+        return self._counter
+
+    def bump_all(self) -> int:
+        self._counter += 1
+        self._floor = self._counter
+        return self._counter
+
+    def version(self, *scopes: str) -> int:
+        return max([self._floor, *(self._versions.get(scope, 0) for scope in scopes)])
+
+    def etag(self, *scopes: str, variant: Optional[str] = None, max_age: Optional[float] = None) -> str:
+        """ETag de los ámbitos; `variant` distingue representaciones de un mismo recurso (p. ej. proyecciones).
+
+        Con `max_age` (segundos) el ETag cambia al empezar cada intervalo de
+        `max_age` segundos del reloj, igual en todos los workers.
+        """
+        bucket = f"-{int(time.time() // max_age)}" if max_age else ""
+        suffix = f"-{variant}" if variant else ""
+        return f'"{self.epoch}-{self.version(*scopes)}{bucket}{suffix}"'
+
+def task_scopes(*tasks: Optional[dict]) -> list:
+    """Ámbitos afectados por una escritura de tareas (incluye los contadores del proyecto)"""
+    scopes = {"projects"}
+    for task in tasks:
+        if task and task.get("project_id"):
+            scopes.add(f"project:{task['project_id']}")
+            scopes.add(f"tasks:{task['project_id']}")
+    return sorted(scopes)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110): acepta `*` y listas de ETags"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
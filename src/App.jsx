@@ -110,7 +110,7 @@ function App() {
       <div className="flex h-screen bg-gray-50">
         <Sidebar setView={setView} />
         <div className="flex flex-col flex-1 overflow-hidden">
-          <Header />
+          <Header onSelectProject={handleSelectProject} setView={setView} />
           <main className="flex-1 overflow-y-auto p-4 md:p-6">
             <div className="bg-red-50 border border-red-200 rounded-lg p-6 max-w-2xl mx-auto">
               <div className="flex items-center">
@@ -155,7 +155,7 @@ function App() {
       <Sidebar setView={setView} />
       
       <div className="flex flex-col flex-1 overflow-hidden">
-        <Header />
+        <Header onSelectProject={handleSelectProject} setView={setView} />
         
         <main className="flex-1 overflow-y-auto p-4 md:p-6">
           {error && (
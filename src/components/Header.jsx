@@ -1,8 +1,49 @@
 // src/components/Header.jsx
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { FaBell, FaSearch, FaUserCircle } from 'react-icons/fa';
+import { searchSuggestions } from '../services/api';
+
+const resultLabels = {
+  projects: 'Proyecto',
+  tasks: 'Tarea',
+  users: 'Usuario'
+};
+
+const Header = ({ onSelectProject, setView }) => {
+  const [query, setQuery] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
+
+  // Autocompletado en el servidor, con una espera corta entre pulsaciones
+  useEffect(() => {
+    const text = query.trim();
+    if (!text) {
+      setSuggestions([]);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      searchSuggestions(text)
+        .then((items) => { if (!cancelled) setSuggestions(items); })
+        .catch(() => { if (!cancelled) setSuggestions([]); });
+    }, 200);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
+
+  const handleSelect = ({ type, document }) => {
+    setQuery('');
+    setSuggestions([]);
+    if (type === 'projects' && onSelectProject) {
+      onSelectProject(document._id);
+    } else if (type === 'tasks' && onSelectProject) {
+      onSelectProject(document.project_id);
+    } else if (type === 'users' && setView) {
+      setView('users');
+    }
+  };
 
-const Header = () => {
   return (
     <header className="bg-white shadow-sm">
       <div className="flex items-center justify-between p-4">
@@ -14,7 +55,25 @@ const Header = () => {
             type="text"
             className="block w-full pl-10 pr-3 py-2 border border-gray-300 rounded-md leading-5 bg-gray-50 placeholder-gray-500 focus:outline-none focus:placeholder-gray-400 focus:ring-1 focus:ring-blue-500 focus:border-blue-500 sm:text-sm"
             placeholder="Buscar proyectos, tareas..."
+            value={query}
+            onChange={(e) => setQuery(e.target.value)}
           />
+          {suggestions.length > 0 && (
+            <ul className="absolute z-10 mt-1 w-full bg-white border border-gray-200 rounded-md shadow-lg max-h-80 overflow-y-auto">
+              {suggestions.map((item) => (
+                <li key={`${item.type}-${item.document._id}`}>
+                  <button
+                    type="button"
+                    onClick={() => handleSelect(item)}
+                    className="w-full text-left px-3 py-2 hover:bg-gray-50 text-sm"
+                  >
+                    <span className="text-xs text-gray-500 mr-2">{resultLabels[item.type]}</span>
+                    {item.document.name || item.document.descripcion}
+                  </button>
+                </li>
+              ))}
+            </ul>
+          )}
         </div>
         
         <div className="flex items-center space-x-4">
@@ -3,7 +3,7 @@ import React, { useState, useEffect } from 'react';
 import TaskList from './TaskList';
 import AddTaskForm from './AddTaskForm';
 import { FaArrowLeft, FaPlus, FaEdit, FaTrash, FaCheck, FaUserAlt, FaTimes, FaSave } from 'react-icons/fa';
-import { createTask, updateTask, deleteTask, updateProject } from '../services/api';
+import { createTask, patchTask, deleteTask, updateProject, fetchProjectTasks, subscribeToProjectEvents } from '../services/api';
 
 const ProjectDetail = ({ project, onBack, onDeleteProject }) => {
   
@@ -13,6 +13,34 @@ const ProjectDetail = ({ project, onBack, onDeleteProject }) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   
+  // Aplicar los cambios que envía el servidor en lugar de volver a pedir la lista completa
+  useEffect(() => {
+    const sameTask = (a, b) => a._id === b._id;
+    const reloadTasks = () => {
+      fetchProjectTasks(project._id).then(setTasks).catch((error) => setError(error.message));
+    };
+
+    return subscribeToProjectEvents(project._id, (type, data) => {
+      switch (type) {
+        case 'task.created':
+          setTasks((current) => current.some((t) => sameTask(t, data)) ? current : [...current, data]);
+          break;
+        case 'task.updated':
+          setTasks((current) => current.map((t) => sameTask(t, data) ? data : t));
+          break;
+        case 'task.deleted':
+          setTasks((current) => current.filter((t) => !sameTask(t, data)));
+          break;
+        case 'tasks.changed':
+        case 'resync':
+          reloadTasks();
+          break;
+        default:
+          break;
+      }
+    });
+  }, [project._id]);
+
   // Calcular estadísticas para este proyecto
   const completedTasks = tasks.filter(task => task.completada).length;
   const completionPercentage = tasks.length > 0 
@@ -50,18 +78,16 @@ const ProjectDetail = ({ project, onBack, onDeleteProject }) => {
     setLoading(true);
     setError(null);
     try {
-      const task = tasks.find(t => t.id === taskId || t._id === taskId);
+      const task = tasks.find(t => t._id === taskId);
       if (!task) return;
 
-      const updatedTaskData = {
-        ...task,
+      const updatedTask = await patchTask(taskId, {
         completada: true,
-        estado: 'completada'
-      };
-
-      const updatedTask = await updateTask(taskId, updatedTaskData);
+        estado: 'completada',
+        version: task.version ?? 0
+      });
       setTasks(tasks.map(t => 
-        (t.id === taskId || t._id === taskId) ? updatedTask : t
+        t._id === taskId ? updatedTask : t
       ));
     } catch (error) {
       setError(error.message);
@@ -79,7 +105,7 @@ const ProjectDetail = ({ project, onBack, onDeleteProject }) => {
     setError(null);
     try {
       await deleteTask(taskId);
-      setTasks(tasks.filter(t => t.id !== taskId && t._id !== taskId));
+      setTasks(tasks.filter(t => t._id !== taskId));
     } catch (error) {
       setError(error.message);
     } finally {
@@ -344,7 +370,7 @@ const ProjectDetail = ({ project, onBack, onDeleteProject }) => {
           
           <div className="divide-y">
             {tasks.map(task => (
-              <div key={task.id || task._id} className="grid grid-cols-12 px-4 py-3 items-center">
+              <div key={task._id} className="grid grid-cols-12 px-4 py-3 items-center">
                 <div className="col-span-1">
                   {task.completada ? (
                     <span className="bg-green-100 text-green-800 text-xs px-2 py-1 rounded-full">
@@ -377,7 +403,7 @@ const ProjectDetail = ({ project, onBack, onDeleteProject }) => {
                 <div className="col-span-3 flex space-x-2">
                   {!task.completada && (
                     <button 
-                      onClick={() => handleCompleteTask(task.id || task._id)}
+                      onClick={() => handleCompleteTask(task._id)}
                       disabled={loading}
                       className="bg-green-100 hover:bg-green-200 disabled:bg-gray-100 text-green-700 px-3 py-1 rounded-md flex items-center text-sm"
                     >
@@ -385,7 +411,7 @@ const ProjectDetail = ({ project, onBack, onDeleteProject }) => {
                     </button>
                   )}
                   <button 
-                    onClick={() => handleDeleteTask(task.id || task._id)}
+                    onClick={() => handleDeleteTask(task._id)}
                     disabled={loading}
                     className="bg-red-100 hover:bg-red-200 disabled:bg-gray-100 text-red-700 px-3 py-1 rounded-md flex items-center text-sm"
                   >
@@ -9,6 +9,13 @@ const Reports = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [activeTab, setActiveTab] = useState('pie');
+  const [timelineFilters, setTimelineFilters] = useState({
+    project_id: '',
+    status: '',
+    priority: '',
+    created_from: '',
+    created_to: ''
+  });
 
   const COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#8884D8', '#82CA9D'];
 
@@ -22,7 +29,7 @@ const Reports = () => {
     try {
       const [stats, timeline] = await Promise.all([
         fetchProjectStats(),
-        fetchTaskTimeline()
+        fetchTaskTimeline(timelineQuery(timelineFilters))
       ]);
       console.log('Datos originales del backend:', stats);
       setProjectStats(stats);
@@ -34,6 +41,24 @@ const Reports = () => {
     }
   };
 
+  // Las fechas del formulario cubren el día completo seleccionado
+  const timelineQuery = (filters) => ({
+    ...filters,
+    created_from: filters.created_from ? `${filters.created_from}T00:00:00` : '',
+    created_to: filters.created_to ? `${filters.created_to}T23:59:59` : ''
+  });
+
+  const handleTimelineFilterChange = async (e) => {
+    const { name, value } = e.target;
+    const filters = { ...timelineFilters, [name]: value };
+    setTimelineFilters(filters);
+    try {
+      setTaskTimeline(await fetchTaskTimeline(timelineQuery(filters)));
+    } catch (error) {
+      setError(error.message);
+    }
+  };
+
   const pieData = projectStats
     .map(project => {
       const data = {
@@ -85,6 +110,56 @@ const Reports = () => {
           <FaCalendarAlt className="mr-2" />
           Cronograma de Tareas (Gantt)
         </h3>
+
+        <div className="grid grid-cols-1 md:grid-cols-5 gap-3 mb-4">
+          <select
+            name="project_id"
+            value={timelineFilters.project_id}
+            onChange={handleTimelineFilterChange}
+            className="border border-gray-300 rounded-md px-2 py-1 text-sm"
+          >
+            <option value="">Todos los proyectos</option>
+            {projectStats.map(project => (
+              <option key={project.project_id} value={project.project_id}>{project.name}</option>
+            ))}
+          </select>
+          <select
+            name="status"
+            value={timelineFilters.status}
+            onChange={handleTimelineFilterChange}
+            className="border border-gray-300 rounded-md px-2 py-1 text-sm"
+          >
+            <option value="">Todos los estados</option>
+            <option value="pendiente">Pendiente</option>
+            <option value="en progreso">En progreso</option>
+            <option value="completada">Completada</option>
+          </select>
+          <select
+            name="priority"
+            value={timelineFilters.priority}
+            onChange={handleTimelineFilterChange}
+            className="border border-gray-300 rounded-md px-2 py-1 text-sm"
+          >
+            <option value="">Todas las prioridades</option>
+            <option value="baja">Baja</option>
+            <option value="media">Media</option>
+            <option value="alta">Alta</option>
+          </select>
+          <input
+            type="date"
+            name="created_from"
+            value={timelineFilters.created_from}
+            onChange={handleTimelineFilterChange}
+            className="border border-gray-300 rounded-md px-2 py-1 text-sm"
+          />
+          <input
+            type="date"
+            name="created_to"
+            value={timelineFilters.created_to}
+            onChange={handleTimelineFilterChange}
+            className="border border-gray-300 rounded-md px-2 py-1 text-sm"
+          />
+        </div>
         
         <div className="overflow-x-auto">
           <div className="min-w-[800px]">
@@ -41,7 +41,7 @@ const TaskList = ({
       ) : (
         <div className="divide-y">
           {tasks.map(task => (
-            <div key={task.id} className="grid grid-cols-12 px-4 py-3 items-center hover:bg-gray-50 transition-colors">
+            <div key={task._id} className="grid grid-cols-12 px-4 py-3 items-center hover:bg-gray-50 transition-colors">
             
               <div className="col-span-1">
                 <span className={`${statusClasses[task.estado]} text-xs px-2 py-1 rounded-full`}>
@@ -76,7 +76,7 @@ const TaskList = ({
                   </div>
                 ) : (
                   <button 
-                    onClick={() => onAssignTask(task.id)}
+                    onClick={() => onAssignTask(task._id)}
                     className="text-blue-500 hover:text-blue-700 text-sm"
                   >
                     Asignar usuario
@@ -88,7 +88,7 @@ const TaskList = ({
               <div className="col-span-2 flex space-x-2">
                 {!task.completada && (
                   <button 
-                    onClick={() => onCompleteTask(task.id)}
+                    onClick={() => onCompleteTask(task._id)}
                     className="p-2 text-green-500 hover:text-green-700"
                     title="Marcar como completada"
                   >
@@ -97,7 +97,7 @@ const TaskList = ({
                 )}
                 
                 <button 
-                  onClick={() => onEditTask(task.id)}
+                  onClick={() => onEditTask(task._id)}
                   className="p-2 text-blue-500 hover:text-blue-700"
                   title="Editar tarea"
                 >
@@ -105,7 +105,7 @@ const TaskList = ({
                 </button>
                 
                 <button 
-                  onClick={() => onDeleteTask(task.id)}
+                  onClick={() => onDeleteTask(task._id)}
                   className="p-2 text-red-500 hover:text-red-700"
                   title="Eliminar tarea"
                 >
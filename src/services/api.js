@@ -39,7 +39,7 @@ const apiRequest = async (endpoint, options = {}) => {
 
 export const fetchProjects = async () => {
   try {
-    const projects = await apiRequest('/projects');
+    const projects = await apiRequest('/projects?view=summary');
     return projects;
   } catch (error) {
     throw error;
@@ -49,7 +49,7 @@ export const fetchProjects = async () => {
 export const fetchProjectStatus = async (projectId) => {
   try {
     const project = await apiRequest(`/projects/${projectId}`);
-    const tasks = await apiRequest(`/projects/${projectId}/tasks`);
+    const tasks = await apiRequest(`/projects/${projectId}/tasks?view=summary`);
     
     const result = {
       ...project,
@@ -109,7 +109,7 @@ export const deleteProject = async (projectId) => {
 
 export const fetchProjectTasks = async (projectId) => {
   try {
-    const tasks = await apiRequest(`/projects/${projectId}/tasks`);
+    const tasks = await apiRequest(`/projects/${projectId}/tasks?view=summary`);
     return tasks;
   } catch (error) {
     throw error;
@@ -157,6 +157,18 @@ export const updateTask = async (taskId, taskData) => {
   }
 };
 
+export const patchTask = async (taskId, fields) => {
+  try {
+    const updatedTask = await apiRequest(`/tasks/${taskId}`, {
+      method: 'PATCH',
+      body: JSON.stringify(fields),
+    });
+    return updatedTask;
+  } catch (error) {
+    throw error;
+  }
+};
+
 export const deleteTask = async (taskId) => {
   try {
     await apiRequest(`/tasks/${taskId}`, {
@@ -168,9 +180,22 @@ export const deleteTask = async (taskId) => {
   }
 };
 
+// Eventos del servidor (SSE) con los cambios de tareas de un proyecto; devuelve la función para cerrar la conexión
+export const subscribeToProjectEvents = (projectId, onEvent) => {
+  const source = new EventSource(`${API_BASE_URL}/events?project_id=${projectId}`);
+  const eventTypes = [
+    'task.created', 'task.updated', 'task.deleted', 'tasks.changed',
+    'project.counters', 'project.deleted', 'resync'
+  ];
+  eventTypes.forEach((type) => {
+    source.addEventListener(type, (event) => onEvent(type, JSON.parse(event.data)));
+  });
+  return () => source.close();
+};
+
 export const fetchUsers = async () => {
   try {
-    const users = await apiRequest('/users');
+    const users = await apiRequest('/users?view=summary');
     return users;
   } catch (error) {
     throw error;
@@ -251,11 +276,27 @@ export const fetchProjectStats = async () => {
   }
 };
 
-export const fetchTaskTimeline = async () => {
+export const fetchTaskTimeline = async (filters = {}) => {
   try {
-    const timeline = await apiRequest('/reports/task-timeline');
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        params.append(key, value);
+      }
+    });
+    const query = params.toString();
+    const timeline = await apiRequest(`/reports/task-timeline${query ? `?${query}` : ''}`);
     return timeline;
   } catch (error) {
     throw error;
   }
-};
\ No newline at end of file
+};
+export const searchSuggestions = async (query, limit = 8) => {
+  try {
+    const params = new URLSearchParams({ q: query, mode: 'prefix', limit });
+    const results = await apiRequest(`/search?${params.toString()}`);
+    return results.items;
+  } catch (error) {
+    throw error;
+  }
+};